@@ -1,14 +1,44 @@
 """MediRoute AI - LangGraph Graph Definition"""
+import asyncio
+import inspect
+import logging
+import os
+import time
+
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Hashable
+
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.memory import InMemorySaver
 
 from agents.state import AgentState
 from agents.nodes.orchestrator_agent import orchestrator_agent_node
-from agents.nodes.verification_agent import verification_agent_node
+from agents.nodes.verification_agent import (
+    verification_agent_node,
+    predict_verification_inputs,
+    verification_inputs,
+    speculate_verification,
+)
 from agents.nodes.classification_agent import classification_agent_node
-from agents.nodes.match_agent import match_agent_node
-from agents.nodes.loa_agent import loa_agent_node
+from agents.nodes.match_agent import (
+    match_agent_node,
+    predict_match_inputs,
+    match_inputs,
+    speculate_match,
+)
+from agents.nodes.loa_agent import (
+    loa_agent_node,
+    predict_loa_inputs,
+    loa_inputs,
+    speculate_loa,
+)
 from agents.nodes.report_agent import report_agent_node
 from agents.nodes.response_agent import response_agent_node
+from agents.nodes.selection_agent import selection_agent_node
+from data.reference import REFERENCE
+
+logger = logging.getLogger(__name__)
 
 
 async def _get_routing_decision(state: AgentState) -> str:
@@ -16,17 +46,319 @@ async def _get_routing_decision(state: AgentState) -> str:
     return state["next_agent"]
 
 
+# ── Speculative execution ──────────────────────────────────────
+# A node declares a Speculation: after the trigger node runs, a cheap predictor
+# guesses the node's inputs and the work starts in a background task. When the
+# node itself runs, its real inputs are computed; the work for a matching
+# prediction is committed (passed to the node as `speculated`), everything else
+# is cancelled. Hit rate and wasted work are tracked per speculation, so each
+# one is enabled (SPECULATION_ENABLED) only where it pays off.
+
+@dataclass(frozen=True)
+class Speculation:
+    name: str
+    node: str                                       # node that consumes the result
+    trigger: str                                    # node after which to predict (START = run start)
+    predict: Callable[[dict], dict[Hashable, Any]]  # state → {predicted inputs: work argument}
+    actual: Callable[[dict], Hashable | None]       # state → real inputs, when `node` runs
+    work: Callable[[Any], Awaitable[Any]]
+    timeout_seconds: float = 60.0
+
+
+@dataclass
+class SpeculationMetrics:
+    started: int = 0
+    committed: int = 0
+    discarded: int = 0
+    failed: int = 0
+    committed_seconds: float = 0.0  # work time whose result was used
+    wasted_seconds: float = 0.0     # work time thrown away (discarded or failed)
+
+    def as_dict(self) -> dict:
+        resolved = self.committed + self.discarded + self.failed
+        return {
+            **asdict(self),
+            "hit_rate": round(self.committed / resolved, 3) if resolved else None,
+        }
+
+
+@dataclass
+class _Run:
+    task: asyncio.Task | None = None
+    started: float | None = None    # set once the cost budget admits the work
+    finished: float | None = None
+
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # Discarded work may fail unobserved — read the exception so it is not logged as lost
+    if not task.cancelled():
+        task.exception()
+
+
+class _Speculator:
+    """Starts, commits and discards speculative work per session (thread_id)."""
+
+    def __init__(
+        self,
+        speculations: list[Speculation],
+        enabled: set[str],
+        max_concurrency: int,
+        ttl_seconds: float,
+    ):
+        self._active = [s for s in speculations if s.name in enabled]
+        self._by_node = {s.node: s for s in self._active}
+        self._budget = asyncio.Semaphore(max_concurrency)
+        self._ttl_seconds = ttl_seconds
+        # (session_key, speculation name) → (created_at, {predicted inputs: run})
+        self._pending: dict[tuple[str, str], tuple[float, dict[Hashable, _Run]]] = {}
+        self.metrics = {s.name: SpeculationMetrics() for s in speculations}
+
+        for name in enabled - {s.name for s in speculations}:
+            logger.warning("Unknown speculation in SPECULATION_ENABLED: %s", name)
+
+    def fire(self, trigger: str, state: dict, session_key: str | None) -> None:
+        """Runs the predictors triggered by `trigger` and starts their work."""
+        if not session_key:
+            return
+        self._expire()
+
+        for spec in self._active:
+            if spec.trigger != trigger:
+                continue
+
+            self._discard(spec, session_key)
+
+            try:
+                predictions = spec.predict(state) or {}
+            except Exception as e:  # a broken predictor must never break the run
+                logger.warning("Speculation %s: predictor failed: %s", spec.name, e)
+                continue
+
+            if not predictions:
+                continue
+
+            self._pending[(session_key, spec.name)] = (
+                time.monotonic(),
+                {key: self._start(spec, arg) for key, arg in predictions.items()},
+            )
+            self.metrics[spec.name].started += len(predictions)
+            logger.info("Speculation %s: started %s prediction(s)", spec.name, len(predictions))
+
+    async def take(self, node: str, state: dict, session_key: str | None) -> Any:
+        """
+        Returns the speculative result for `node` if one of the predictions equals
+        its real inputs, otherwise None. Every other prediction is discarded.
+        """
+        spec = self._by_node.get(node)
+        if not spec or not session_key:
+            return None
+
+        entry = self._pending.pop((session_key, spec.name), None)
+        if not entry:
+            return None
+
+        runs = entry[1]
+        try:
+            actual = spec.actual(state)
+        except Exception as e:
+            logger.warning("Speculation %s: actual inputs failed: %s", spec.name, e)
+            actual = None
+
+        run = runs.pop(actual, None) if actual is not None else None
+        self._cancel(spec, runs.values())
+
+        if run is None:
+            logger.info("Speculation %s: miss — real inputs differ from the prediction.", spec.name)
+            return None
+
+        # Still queued on the budget: waiting would be slower than doing the work inline
+        if run.started is None:
+            self._cancel(spec, [run])
+            logger.info("Speculation %s: hit, but never started — computing inline.", spec.name)
+            return None
+
+        metrics = self.metrics[spec.name]
+        try:
+            result = await run.task
+        except Exception as e:
+            metrics.failed += 1
+            metrics.wasted_seconds += run.elapsed()
+            logger.warning("Speculation %s: work failed: %s", spec.name, e)
+            return None
+
+        metrics.committed += 1
+        metrics.committed_seconds += run.elapsed()
+        logger.info("Speculation %s: hit — committed.", spec.name)
+        return result
+
+    def _start(self, spec: Speculation, arg: Any) -> _Run:
+        run = _Run()
+
+        async def execute():
+            async with self._budget:
+                run.started = time.monotonic()
+                try:
+                    return await asyncio.wait_for(spec.work(arg), spec.timeout_seconds)
+                finally:
+                    run.finished = time.monotonic()
+
+        run.task = asyncio.create_task(execute())
+        run.task.add_done_callback(_retrieve_exception)
+        return run
+
+    def _cancel(self, spec: Speculation, runs) -> None:
+        metrics = self.metrics[spec.name]
+        for run in runs:
+            run.task.cancel()
+            metrics.discarded += 1
+            metrics.wasted_seconds += run.elapsed()
+
+    def _discard(self, spec: Speculation, session_key: str) -> None:
+        entry = self._pending.pop((session_key, spec.name), None)
+        if entry:
+            self._cancel(spec, entry[1].values())
+
+    def _expire(self) -> None:
+        """Discards work nobody claimed in time (e.g. the patient never chose)."""
+        now = time.monotonic()
+        for session_key, name in [
+            key for key, (created, _) in self._pending.items()
+            if now - created > self._ttl_seconds
+        ]:
+            self._discard(self._by_name(name), session_key)
+
+    def _by_name(self, name: str) -> Speculation:
+        return next(s for s in self._active if s.name == name)
+
+
+SPECULATIONS = [
+    # Verification lookup while the orchestrator LLM decides whether to verify
+    Speculation(
+        name="verification_lookup",
+        node="verification_agent",
+        trigger=START,
+        predict=predict_verification_inputs,
+        actual=verification_inputs,
+        work=speculate_verification,
+        timeout_seconds=10.0,
+    ),
+    # Ranking + service selection on red flags while the classifier LLM runs
+    Speculation(
+        name="red_flag_match",
+        node="match_agent",
+        trigger="verification_agent",
+        predict=predict_match_inputs,
+        actual=match_inputs,
+        work=speculate_match,
+    ),
+    # LOA preparation for the auto-selected hospital, or each of the top 3
+    Speculation(
+        name="loa_prefetch",
+        node="loa_agent",
+        trigger="match_agent",
+        predict=predict_loa_inputs,
+        actual=loa_inputs,
+        work=speculate_loa,
+    ),
+]
+
+_speculator = _Speculator(
+    SPECULATIONS,
+    enabled={
+        name.strip()
+        for name in os.getenv("SPECULATION_ENABLED", "red_flag_match,loa_prefetch").split(",")
+        if name.strip()
+    },
+    max_concurrency=int(os.getenv("SPECULATION_MAX_CONCURRENCY", "3")),
+    ttl_seconds=float(os.getenv("SPECULATION_TTL_SECONDS", str(30 * 60))),
+)
+
+
+def speculation_metrics() -> dict:
+    """Per-speculation counters: started, committed, discarded, failed, hit rate, time."""
+    return {
+        name: {**metrics.as_dict(), "enabled": name in {s.name for s in _speculator._active}}
+        for name, metrics in _speculator.metrics.items()
+    }
+
+
+def _merged(state: dict, update: dict) -> dict:
+    """State as the next node will see it (messages are appended, not replaced)."""
+    return {
+        **state,
+        **update,
+        "messages": list(state.get("messages", [])) + list(update.get("messages", [])),
+    }
+
+
+def _with_speculation(name: str, node_fn: Callable, is_entry: bool = False) -> Callable:
+    """
+    Wraps a node so speculations can trigger on it and be consumed by it.
+    Nodes opt in through keyword parameters:
+      speculated — the committed speculative result, or None
+      publish    — callable(update) to trigger dependent speculations before the
+                   node returns, once the parts of its output they read are final
+
+    The entry node pins the current reference data version in the state; every
+    node of the run (and speculative work it starts) reads that version.
+    """
+    params = inspect.signature(node_fn).parameters
+
+    async def run(state: AgentState, config: RunnableConfig, session_key: str | None) -> AgentState:
+        if is_entry:
+            _speculator.fire(START, state, session_key)
+
+        kwargs = {}
+        if "config" in params:
+            kwargs["config"] = config
+        if "speculated" in params:
+            kwargs["speculated"] = await _speculator.take(name, state, session_key)
+
+        published = False
+
+        def publish(update: dict) -> None:
+            nonlocal published
+            published = True
+            _speculator.fire(name, _merged(state, update), session_key)
+
+        if "publish" in params:
+            kwargs["publish"] = publish
+
+        update = await node_fn(state, **kwargs)
+
+        if not published and isinstance(update, dict):
+            _speculator.fire(name, _merged(state, update), session_key)
+        return update
+
+    async def node(state: AgentState, config: RunnableConfig) -> AgentState:
+        session_key = (config or {}).get("configurable", {}).get("thread_id")
+        with REFERENCE.pinned(None if is_entry else state.get("reference_version")) as reference:
+            update = await run(state, config, session_key)
+        if is_entry and isinstance(update, dict):
+            update = {**update, "reference_version": reference.version}
+        return update
+
+    node.__name__ = node_fn.__name__
+    return node
+
+
 # ── Build Graph ────────────────────────────────────────────────
 builder = StateGraph(AgentState)
 
 # ── Nodes ─────────────────────────────────────────────────────
-builder.add_node("orchestrator_agent", orchestrator_agent_node)
-builder.add_node("verification_agent", verification_agent_node)
-builder.add_node("classification_agent", classification_agent_node)
-builder.add_node("match_agent", match_agent_node)
-builder.add_node("loa_agent", loa_agent_node)
-builder.add_node("report_agent", report_agent_node)
-builder.add_node("response_agent", response_agent_node)
+builder.add_node("orchestrator_agent", _with_speculation("orchestrator_agent", orchestrator_agent_node, is_entry=True))
+builder.add_node("verification_agent", _with_speculation("verification_agent", verification_agent_node))
+builder.add_node("classification_agent", _with_speculation("classification_agent", classification_agent_node))
+builder.add_node("match_agent", _with_speculation("match_agent", match_agent_node))
+builder.add_node("loa_agent", _with_speculation("loa_agent", loa_agent_node))
+builder.add_node("report_agent", _with_speculation("report_agent", report_agent_node))
+builder.add_node("response_agent", _with_speculation("response_agent", response_agent_node))
+builder.add_node("selection_agent", _with_speculation("selection_agent", selection_agent_node))
 
 # ── Edges ────────────────────────────────────────────────
 builder.add_edge(START, "orchestrator_agent")
@@ -35,11 +367,38 @@ builder.add_edge(START, "orchestrator_agent")
 builder.add_edge("classification_agent", "match_agent")
 
 # Second Phase
-builder.add_edge("loa_agent", "report_agent")
 builder.add_edge("report_agent", "response_agent")
 
-# Terminal
-builder.add_edge("response_agent", END)
+# An LOA whose hospital has no bed left to hold goes back to matching
+builder.add_conditional_edges(
+    "loa_agent",
+    _get_routing_decision,
+    {
+        "report_agent": "report_agent",
+        "end": "report_agent",       # LOA not generated; the report says why
+        "match_agent": "match_agent",
+    }
+)
+
+# Terminal, or suspend for hospital selection after the top 3 are presented
+builder.add_conditional_edges(
+    "response_agent",
+    _get_routing_decision,
+    {
+        "END": END,
+        "selection_agent": "selection_agent",
+    }
+)
+
+# Resumed selection goes straight to LOA; unclear replies go back to the orchestrator
+builder.add_conditional_edges(
+    "selection_agent",
+    _get_routing_decision,
+    {
+        "loa_agent": "loa_agent",
+        "orchestrator_agent": "orchestrator_agent",
+    }
+)
 
 # Orchestrator either answers directly (FINISH) or routes to intake
 builder.add_conditional_edges(
@@ -58,6 +417,7 @@ builder.add_conditional_edges(
     {
         "response_agent": "response_agent",
         "loa_agent": "loa_agent",
+        "END": END,                  # no eligible hospital, nothing to present
     }
 )
 
@@ -70,4 +430,5 @@ builder.add_conditional_edges(
     }
 )
 
-graph = builder.compile()
+# Checkpointer keeps suspended runs per session (thread_id) so they can be resumed
+graph = builder.compile(checkpointer=InMemorySaver())
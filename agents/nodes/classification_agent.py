@@ -2,24 +2,125 @@
 import logging
 import json
 
-from langchain_core.messages import AIMessage
+from collections import Counter
+from langchain_core.messages import AIMessage, HumanMessage
 
-from agents.state import AgentState
+from agents.state import AgentState, PatientIntake
 from agents.prompts import classification_agent_prompts as ca_prompts
-from utils.llm_util import call_llm
+from data.red_flags import RED_FLAG_LEXICON
+from utils.aho_corasick_util import AhoCorasick, normalize_text
+from utils.llm_util import call_llm, PRIORITY_NORMAL, PRIORITY_CRITICAL
 
 logger = logging.getLogger(__name__)
 
 
+# ── Red-flag triage ───────────────────────────────────────────────────────────
+
+# Compiled once — matching is a single pass over the text
+_RED_FLAG_MATCHER = AhoCorasick(RED_FLAG_LEXICON)
+
+_NEGATIONS = {"no", "not", "without", "never", "denies", "hindi"}
+
+_NO_PREFERENCE = {"none", "no", "no preference", "no preferred hospital", "n a", "wala"}
+
+
+def detect_red_flags(text: str) -> list[tuple[str, str]]:
+    """
+    Returns (phrase, classification_type) for every red-flag phrase in the text,
+    skipping phrases negated by one of the two preceding words ("not unconscious").
+    """
+    normalized = normalize_text(text)
+    hits = []
+    for match in _RED_FLAG_MATCHER.iter_normalized(normalized):
+        preceding = normalized[:match.start].split()[-2:]
+        if _NEGATIONS.intersection(preceding):
+            continue
+        hits.append((match.pattern, match.payload))
+    return hits
+
+
+def provisional_type(red_flags: list[tuple[str, str]]) -> str:
+    """Most frequent classification type among the red-flag hits."""
+    return Counter(t for _, t in red_flags).most_common(1)[0][0]
+
+
+def current_case_text(state_messages: list) -> str:
+    """User messages since the last patient-facing response, i.e. the current case."""
+    texts = []
+    for msg in reversed(state_messages):
+        if isinstance(msg, AIMessage) and msg.name == "response_agent":
+            break
+        if isinstance(msg, HumanMessage):
+            texts.append(msg.content)
+    return "\n".join(reversed(texts))
+
+
+# ── Structured intake ─────────────────────────────────────────────────────────
+# Facts the client sent with the request (ChatRequest) — taken as given, so
+# nobody has to ask for them.
+
+def intake_facts(intake: PatientIntake | None) -> list[str]:
+    """The known intake facts, one line each."""
+    intake = intake or {}
+    facts = []
+    coordinates = intake.get("coordinates")
+    if coordinates:
+        accuracy = coordinates.get("accuracy_m")
+        fix = f"{coordinates['lat']:.5f}, {coordinates['lng']:.5f}"
+        facts.append(f"Device location: {fix}" + (f" (±{accuracy:.0f} m)" if accuracy is not None else ""))
+    if intake.get("location"):
+        facts.append(f"Location: {intake['location']}")
+    if intake.get("symptoms"):
+        facts.append(f"Symptoms: {intake['symptoms']}")
+    if intake.get("preferred_hospital"):
+        facts.append(f"Preferred hospital: {intake['preferred_hospital']}")
+    return facts
+
+
+def case_text(state: AgentState) -> str:
+    """The current case as the patient described it: intake symptoms and messages."""
+    symptoms = (state.get("intake") or {}).get("symptoms")
+    text = current_case_text(state["messages"])
+    return f"{symptoms}\n{text}" if symptoms else text
+
+
+def _apply_intake(extracted: dict, intake: PatientIntake) -> None:
+    """Fills what the LLM left unknown from the intake fields."""
+    if intake.get("location") and extracted.get("location", "unknown") == "unknown":
+        extracted["location"] = intake["location"]
+    if intake.get("coordinates") and extracted.get("location", "unknown") == "unknown":
+        extracted["location"] = "device location"
+    preferred = intake.get("preferred_hospital")
+    if preferred and not extracted.get("preferred_hospital"):
+        if normalize_text(preferred) not in _NO_PREFERENCE:
+            extracted["preferred_hospital"] = preferred
+
+
 async def classification_agent_node(state: AgentState) -> AgentState:
     """
     Intake agent node — single pass extraction of patient info into structured JSON.
+
+    Before the LLM call, the user text is scanned for red-flag phrases. A hit marks
+    the case provisionally CRITICAL and raises its LLM scheduling priority (hospital
+    matching may already be running speculatively — see predict_match_inputs);
+    the LLM classification, severity included, is final.
     """
     logger.info("="*30)
     logger.info("Classification Agent Node")
     logger.info("="*30)
 
     state_messages = state["messages"]
+    intake = state.get("intake") or {}
+
+    # ── Red-flag triage (rule-based, runs before the LLM) ─────────────────────
+    red_flags = detect_red_flags(case_text(state))
+    priority = PRIORITY_CRITICAL if red_flags else PRIORITY_NORMAL
+
+    if red_flags:
+        logger.warning(
+            "Red flags detected: %s — provisionally CRITICAL (%s)",
+            [p for p, _ in red_flags], provisional_type(red_flags)
+        )
 
     # Build messages for LLM call
     messages = [
@@ -31,10 +132,18 @@ async def classification_agent_node(state: AgentState) -> AgentState:
         content = msg.content
         messages.append({"role": role, "content": content})
 
+    facts = intake_facts(intake)
+    if facts:
+        messages.append({
+            "role": "system",
+            "content": ca_prompts.CLASSIFICATION_AGENT_INTAKE_PROMPT.format(facts="\n".join(facts)),
+        })
+
     logger.info("Calling LLM with messages: %s", json.dumps(messages, indent=2))
 
     response = await call_llm(
         messages=messages,
+        priority=priority,
         response_format={
             "type": "json_schema",
             "json_schema": {
@@ -122,11 +231,26 @@ async def classification_agent_node(state: AgentState) -> AgentState:
             "insurance_provider": "unknown"
         }
 
+    _apply_intake(extracted, intake)
+
+    # ── Reconcile with red-flag triage ────────────────────────────────────────
+    # The LLM decides type, severity and location; a red flag only ever set the
+    # provisional priority (a phrase can be idiomatic or historical).
+    if red_flags:
+        phrases = sorted({p for p, _ in red_flags})
+        extracted["red_flags"] = phrases
+        if extracted.get("severity") != "CRITICAL":
+            logger.info(
+                "LLM classified severity as %s despite red flags %s — keeping the LLM severity",
+                extracted.get("severity"), phrases
+            )
+
     summary = extracted.pop("summary", "Classification complete. Routing to hospital matching.")
 
     # Store as stringified JSON in the message so match_agent can parse it
     return {
         "messages": [AIMessage(content=summary, name="classification_agent")],
         "classification_agent_output": extracted,
+        "triage_priority": priority,
         "next_agent": "match_agent"
     }
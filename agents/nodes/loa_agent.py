@@ -1,5 +1,6 @@
 """LOA Agent - Creates LOA for the patient."""
 import logging
+import os
 import uuid
 import json
 
@@ -8,37 +9,195 @@ from langchain_core.messages import AIMessage
 
 from agents.state import AgentState
 from agents.prompts import loa_agent_prompts as loa_prompts
-from data.hospitals import HOSPITALS, EMERGENCY_LOA_SERVICES_MAP
-from data.doctors import DOCTORS
-from utils.llm_util import call_llm
+from data.hospitals import EMERGENCY_LOA_SERVICES_MAP
+from data.reference import REFERENCE
+from data.reservations import ARRIVAL_GRACE_SECONDS, RESERVATIONS
+from utils.llm_util import call_llm, PRIORITY_NORMAL, PRIORITY_SPECULATIVE
 
 logger = logging.getLogger(__name__)
 
 
-def _get_assigned_doctor(hospital_id: str, classification_type: str) -> dict | None:
+def _prepare_loa_fields(hospital_raw: dict, classification_type: str, selected_labels: list[str]) -> dict:
     """
-    Returns the best available doctor for the given hospital and classification type.
-    Prefers 24h available doctors. Returns None if no match found.
+    Deterministic LOA fields for a hospital: likely doctor, approved services,
+    room type and exclusions. No I/O and no case recorded — safe to compute
+    speculatively; the node claims the doctor when the LOA is issued.
     """
-    matches = [
-        d for d in DOCTORS
-        if d["hospital_id"] == hospital_id
-        and d["specialization"] == classification_type
+    assigned_doctor = REFERENCE.get().doctors.peek(hospital_raw["id"], classification_type)
+
+    loa_map = EMERGENCY_LOA_SERVICES_MAP.get(
+        classification_type,
+        EMERGENCY_LOA_SERVICES_MAP["GENERAL"]
+    )
+
+    label_to_requires = {
+        svc["label"]: svc["requires"]
+        for svc in loa_map["services"]
+    }
+
+    hospital_caps = hospital_raw.get("capabilities", {})
+
+    approved_services = [
+        label for label in selected_labels
+        if label_to_requires.get(label) is None
+        or hospital_caps.get(label_to_requires[label], False)
     ]
 
-    if not matches:
-        # Fallback: any doctor at that hospital
-        matches = [d for d in DOCTORS if d["hospital_id"] == hospital_id]
+    return {
+        "assigned_doctor": assigned_doctor,
+        "approved_services": approved_services,
+        "room_type": loa_map["room_type"],
+        "exclusions": loa_map["typical_exclusions"],
+    }
 
-    if not matches:
+
+async def _generate_soft_fields(
+    context: dict,
+    hospital_name: str,
+    prepared: dict,
+    priority: int = PRIORITY_NORMAL,
+) -> tuple[str, str]:
+    """LLM call for clinical_justification + remarks. Returns (clinical_justification, remarks)."""
+    assigned_doctor = prepared["assigned_doctor"]
+
+    messages = [
+        {"role": "system", "content": loa_prompts.LOA_SYSTEM_PROMPT},
+        {"role": "user", "content": loa_prompts.LOA_QUERY_PROMPT.format(
+            symptoms=context["symptoms"],
+            current_situation=context["current_situation"],
+            classification_type=context["classification_type"],
+            severity=context["severity"],
+            recommended_action=context["recommended_action"],
+            insurance_provider=context["insurance_provider"],
+            hospital_name=hospital_name,
+            assigned_doctor_name=assigned_doctor["name"] if assigned_doctor else "Not assigned",
+            assigned_doctor_title=assigned_doctor["title"] if assigned_doctor else "N/A",
+            approved_services=json.dumps(prepared["approved_services"], indent=2),
+        )}
+    ]
+
+    response = await call_llm(
+        messages=messages,
+        priority=priority,
+        response_format={
+            "type": "json_schema",
+            "json_schema": {
+                "name": "loa_soft_fields",
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "clinical_justification": {"type": "string"},
+                        "remarks": {"type": "string"},
+                    },
+                    "required": ["clinical_justification", "remarks"],
+                },
+            },
+        }
+    )
+
+    raw_content = response.choices[0].message.content or ""
+
+    try:
+        soft_fields = json.loads(raw_content)
+        return soft_fields.get("clinical_justification", ""), soft_fields.get("remarks", "")
+    except json.JSONDecodeError as e:
+        logger.error("Failed to parse LOA soft fields: %s | Raw: %s", e, raw_content)
+        return (
+            f"Patient presents with {context['symptoms']} requiring {context['classification_type']} "
+            f"emergency admission and treatment.",
+            "Please prioritize emergency assessment upon arrival.",
+        )
+
+
+_BED_LABELS = {"bed": "bed", "icu_bed": "ICU bed"}
+
+
+def _bed_to_reserve(recommended_action: str, classification_type: str, approved_services: list[str]) -> str | None:
+    """The bed an admission holds: an ICU bed if an approved service needs the ICU. None for outpatients."""
+    if recommended_action == "OUTPATIENT_CONSULTATION":
         return None
+    loa_map = EMERGENCY_LOA_SERVICES_MAP.get(classification_type, EMERGENCY_LOA_SERVICES_MAP["GENERAL"])
+    requires = {svc["label"]: svc["requires"] for svc in loa_map["services"]}
+    return "icu_bed" if any(requires.get(label) == "icu" for label in approved_services) else "bed"
+
+
+# ── Speculative preparation (see agents/graph.py) ────────────────────────────
+# Triggered when the match agent publishes its result: the LOA is prepared for
+# the auto-selected/preferred hospital while the match summary is generated, or
+# for each of the top 3 while the patient decides. Only the chosen one is kept.
+
+_PREFETCH_SOFT_FIELDS = os.getenv("LOA_PREFETCH_SOFT_FIELDS", "true").lower() == "true"
+
+
+def _loa_context(state: AgentState) -> dict:
+    """Everything the LOA fields depend on besides the hospital itself."""
+    ca_output = state["classification_agent_output"]
+    return {
+        "classification_type": ca_output.get("classification_type", "GENERAL"),
+        "symptoms": ca_output.get("symptoms", state.get("symptoms", "unknown")),
+        "severity": ca_output.get("severity", "URGENT"),
+        "recommended_action": ca_output.get("recommended_action", "HOSPITAL_ADMISSION"),
+        "insurance_provider": ca_output.get("insurance_provider", state.get("insurance", "unknown")),
+        "current_situation": state.get("current_situation") or "Not provided",
+        "selected_labels": state["selected_loa_services"],
+    }
+
+
+def _context_key(hospital_id: str, context: dict) -> tuple:
+    return (
+        hospital_id,
+        context["classification_type"],
+        context["symptoms"],
+        context["severity"],
+        context["recommended_action"],
+        context["insurance_provider"],
+        context["current_situation"],
+        tuple(context["selected_labels"]),
+    )
+
+
+def loa_inputs(state: AgentState) -> tuple | None:
+    hospital_raw = state["match_agent_output"].get("hospital_raw")
+    if not hospital_raw and state.get("chosen_hospital"):
+        hospital_raw = REFERENCE.get().hospitals.resolve_name(state["chosen_hospital"]).hospital
+    if not hospital_raw:
+        return None
+    return _context_key(hospital_raw["id"], _loa_context(state))
+
+
+def predict_loa_inputs(state: AgentState) -> dict:
+    ma_output = state.get("match_agent_output") or {}
+
+    if state.get("next_agent") == "loa_agent" and ma_output.get("hospital_raw"):
+        hospitals = [ma_output["hospital_raw"]]
+        priority = state.get("triage_priority", PRIORITY_NORMAL)
+    elif state.get("next_agent") == "response_agent" and ma_output.get("top_hospitals"):
+        hospitals = [REFERENCE.get().hospitals.get(h["hospital_id"]) for h in ma_output["top_hospitals"]]
+        priority = PRIORITY_SPECULATIVE
+    else:
+        return {}
+
+    context = _loa_context(state)
+    return {
+        _context_key(h["id"], context): (context, h, priority)
+        for h in hospitals if h
+    }
 
-    # Prefer 24h available
-    available = [d for d in matches if d["available_24h"]]
-    return available[0] if available else matches[0]
+
+async def speculate_loa(inputs: tuple) -> dict:
+    context, hospital_raw, priority = inputs
+    prepared = _prepare_loa_fields(
+        hospital_raw, context["classification_type"], context["selected_labels"]
+    )
+    if _PREFETCH_SOFT_FIELDS:
+        prepared["clinical_justification"], prepared["remarks"] = await _generate_soft_fields(
+            context, hospital_raw["name"], prepared, priority
+        )
+    logger.info("Speculative LOA prepared for %s", hospital_raw["name"])
+    return prepared
 
 
-async def loa_agent_node(state: AgentState) -> AgentState:
+async def loa_agent_node(state: AgentState, speculated: dict | None = None) -> AgentState:
     """
     LOA agent node — generates a Letter of Authorization for the matched hospital.
 
@@ -46,6 +205,8 @@ async def loa_agent_node(state: AgentState) -> AgentState:
     1. Preferred hospital passed checks → hospital_raw already in match_agent_output
     2. CRITICAL auto-select → hospital_raw already in match_agent_output
     3. User chose from top 3 → resolve hospital_raw from chosen_hospital in state
+
+    `speculated` holds fields prepared ahead of time for this hospital, if any.
     """
     logger.info("=" * 30)
     logger.info("LOA Agent Node")
@@ -80,34 +241,32 @@ async def loa_agent_node(state: AgentState) -> AgentState:
 
         logger.info("Resolving hospital_raw from chosen_hospital: %s", chosen_hospital)
 
-        hospital_raw = next(
-            (h for h in HOSPITALS if h["name"].lower() == chosen_hospital.lower()),
-            None
-        )
+        resolution = REFERENCE.get().hospitals.resolve_name(chosen_hospital)
+        hospital_raw = resolution.hospital
 
         if not hospital_raw:
             logger.error("Chosen hospital '%s' not found in registry.", chosen_hospital)
+            suggestions = ", ".join(c.payload["name"] for c in resolution.candidates)
             return {
                 "loa_output": {
                     "generated": False,
-                    "reason": f"Chosen hospital '{chosen_hospital}' could not be found in the hospital registry."
+                    "reason": (
+                        f"Chosen hospital '{chosen_hospital}' could not be found in the hospital registry."
+                        + (f" Did you mean: {suggestions}?" if suggestions else "")
+                    )
                 },
                 "next_agent": "end"
             }
 
-        top_hospitals = ma_output.get("top_hospitals", [])
-        matched_top = next(
-            (h for h in top_hospitals if h["hospital_name"].lower() == chosen_hospital.lower()),
-            None
-        )
-
-        resolved_hospital_details = matched_top or {}
+        top_hospitals_by_id = {h["hospital_id"]: h for h in ma_output.get("top_hospitals", [])}
+        resolved_hospital_details = top_hospitals_by_id.get(hospital_raw["id"], {})
         hospital_name = hospital_raw["name"]
         hospital_id = hospital_raw["id"]
         address = hospital_raw["address"]
         contact = hospital_raw["contact"]
         emergency_contact = hospital_raw["emergency_contact"]
         distance_km = resolved_hospital_details.get("distance_km", ma_output.get("distance_km", 0.0))
+        eta_minutes = resolved_hospital_details.get("eta_minutes")
 
         logger.info("Resolved hospital from user selection: %s", hospital_name)
 
@@ -119,6 +278,7 @@ async def loa_agent_node(state: AgentState) -> AgentState:
         contact = ma_output["contact"]
         emergency_contact = ma_output["emergency_contact"]
         distance_km = ma_output["distance_km"]
+        eta_minutes = ma_output.get("eta_minutes")
 
         logger.info(
             "Hospital resolved from match_agent_output (%s): %s",
@@ -126,102 +286,98 @@ async def loa_agent_node(state: AgentState) -> AgentState:
             hospital_name
         )
 
-    # ── Resolve assigned doctor ───────────────────────────────────────────────
-    assigned_doctor = _get_assigned_doctor(hospital_id, classification_type)
+    # ── Resolve doctor, services, room type and exclusions ────────────────────
+    context = _loa_context(state)
+    prepared = speculated
 
-    if assigned_doctor:
-        logger.info(
-            "Assigned doctor: %s — %s (24h available: %s)",
-            assigned_doctor["name"],
-            assigned_doctor["title"],
-            assigned_doctor["available_24h"]
-        )
+    if prepared:
+        logger.info("Using speculatively prepared LOA fields for %s", hospital_name)
     else:
-        logger.warning(
-            "No doctor found for hospital %s with specialization %s",
-            hospital_id, classification_type
-        )
-
-    # ── Resolve approved services ─────────────────────────────────────────────
-    loa_map = EMERGENCY_LOA_SERVICES_MAP.get(
-        classification_type,
-        EMERGENCY_LOA_SERVICES_MAP["GENERAL"]
-    )
+        prepared = _prepare_loa_fields(hospital_raw, classification_type, selected_labels)
 
-    label_to_requires = {
-        svc["label"]: svc["requires"]
-        for svc in loa_map["services"]
-    }
-
-    hospital_caps = hospital_raw.get("capabilities", {})
-
-    approved_services = [
-        label for label in selected_labels
-        if label_to_requires.get(label) is None
-        or hospital_caps.get(label_to_requires[label], False)
-    ]
-
-    room_type = loa_map["room_type"]
-    exclusions = loa_map["typical_exclusions"]
-
-    logger.info("Approved services: %s", approved_services)
-
-    # ── LLM Call: clinical_justification + remarks ────────────────────────────
-    messages = [
-        {"role": "system", "content": loa_prompts.LOA_SYSTEM_PROMPT},
-        {"role": "user", "content": loa_prompts.LOA_QUERY_PROMPT.format(
-            symptoms=symptoms,
-            current_situation=current_situation,
-            classification_type=classification_type,
-            severity=severity,
-            recommended_action=recommended_action,
-            insurance_provider=insurance_provider,
-            hospital_name=hospital_name,
-            assigned_doctor_name=assigned_doctor["name"] if assigned_doctor else "Not assigned",
-            assigned_doctor_title=assigned_doctor["title"] if assigned_doctor else "N/A",
-            approved_services=json.dumps(approved_services, indent=2),
-        )}
-    ]
-
-    logger.info("Calling LLM for clinical justification and remarks...")
-
-    response = await call_llm(
-        messages=messages,
-        response_format={
-            "type": "json_schema",
-            "json_schema": {
-                "name": "loa_soft_fields",
-                "schema": {
-                    "type": "object",
-                    "properties": {
-                        "clinical_justification": {"type": "string"},
-                        "remarks": {"type": "string"},
-                    },
-                    "required": ["clinical_justification", "remarks"],
-                },
-            },
-        }
-    )
-
-    raw_content = response.choices[0].message.content or ""
+    # ── Claim the least-loaded on-duty doctor for this LOA ────────────────────
+    now = datetime.now()
+    loa_number = f"LOA-{now.strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
+    expires_at = now + timedelta(hours=48)
+
+    # ── Hold a bed until the patient arrives ──────────────────────────────────
+    # Refused when concurrent LOAs took the hospital's last beds: matching runs
+    # again, and now leaves this hospital out (see data/reservations.py)
+    bed = _bed_to_reserve(recommended_action, classification_type, prepared["approved_services"])
+    reservation = None
+    if bed:
+        reservation = RESERVATIONS.reserve(
+            loa_number, hospital_id, bed,
+            expires_at=expires_at.timestamp(),
+            arrive_by=now.timestamp() + (eta_minutes or 0) * 60 + ARRIVAL_GRACE_SECONDS,
+        )
+        if reservation is None:
+            logger.warning("No %s left at %s — matching again.", _BED_LABELS[bed], hospital_name)
+            return {
+                "messages": [AIMessage(
+                    content=f"{hospital_name} has no {_BED_LABELS[bed]} left — looking for another hospital.",
+                    name="loa_agent",
+                )],
+                "rematch": True,
+                "next_agent": "match_agent",
+            }
+        logger.info("%s held at %s for %s", _BED_LABELS[bed], hospital_name, loa_number)
 
+    # Nothing below may leave the bed or the doctor claimed for an LOA never issued
     try:
-        soft_fields = json.loads(raw_content)
-        clinical_justification = soft_fields.get("clinical_justification", "")
-        remarks = soft_fields.get("remarks", "")
-    except json.JSONDecodeError as e:
-        logger.error("Failed to parse LOA soft fields: %s | Raw: %s", e, raw_content)
-        clinical_justification = (
-            f"Patient presents with {symptoms} requiring {classification_type} "
-            f"emergency admission and treatment."
+        assigned_doctor = REFERENCE.get().doctors.assign(
+            hospital_id, classification_type,
+            case_id=loa_number,
+            until=expires_at.timestamp(),
+            prefer=prepared["assigned_doctor"],
         )
-        remarks = "Please prioritize emergency assessment upon arrival."
+        if assigned_doctor is not prepared["assigned_doctor"]:
+            # Soft fields drafted for another doctor are stale
+            prepared = {**prepared, "assigned_doctor": assigned_doctor}
+            prepared.pop("clinical_justification", None)
+            prepared.pop("remarks", None)
+
+        approved_services = prepared["approved_services"]
+        room_type = prepared["room_type"]
+        exclusions = prepared["exclusions"]
+
+        if assigned_doctor:
+            logger.info(
+                "Assigned doctor: %s — %s (24h available: %s)",
+                assigned_doctor["name"],
+                assigned_doctor["title"],
+                assigned_doctor["available_24h"]
+            )
+        else:
+            logger.warning(
+                "No doctor found for hospital %s with specialization %s",
+                hospital_id, classification_type
+            )
+
+        logger.info("Approved services: %s", approved_services)
+
+        # ── LLM Call: clinical_justification + remarks ────────────────────────
+        if "clinical_justification" in prepared:
+            clinical_justification = prepared["clinical_justification"]
+            remarks = prepared["remarks"]
+        else:
+            logger.info("Calling LLM for clinical justification and remarks...")
+            clinical_justification, remarks = await _generate_soft_fields(
+                context, hospital_name, prepared, state.get("triage_priority", PRIORITY_NORMAL)
+            )
+    except BaseException:
+        if reservation:
+            RESERVATIONS.release(loa_number)
+        REFERENCE.get().doctors.release_case(loa_number)
+        logger.warning("LOA %s not issued — bed and doctor released.", loa_number)
+        raise
 
     # ── Build deterministic LOA fields ────────────────────────────────────────
-    now = datetime.now()
-    loa_number = f"LOA-{now.strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
     date_issued = now.strftime("%B %d, %Y %I:%M %p")
-    valid_until = (now + timedelta(hours=48)).strftime("%B %d, %Y %I:%M %p")
+    valid_until = expires_at.strftime("%B %d, %Y %I:%M %p")
+    bed_held_until = (
+        datetime.fromtimestamp(reservation.arrive_by).strftime("%B %d, %Y %I:%M %p") if reservation else None
+    )
 
     # ── Assemble full LOA ─────────────────────────────────────────────────────
     loa_output = {
@@ -241,6 +397,8 @@ async def loa_agent_node(state: AgentState) -> AgentState:
         "contact": contact,
         "emergency_contact": emergency_contact,
         "distance_km": distance_km,
+        "reserved_bed": bed if reservation else None,
+        "bed_held_until": bed_held_until,
         "approved_services": approved_services,
         "room_type": room_type,
         "exclusions": exclusions,
@@ -261,6 +419,12 @@ async def loa_agent_node(state: AgentState) -> AgentState:
         else "Assigned Doctor: Not available"
     )
 
+    bed_line = (
+        f"Bed Held: {_BED_LABELS[bed]} until {bed_held_until} (released if the patient has not arrived by then)\n"
+        if reservation
+        else ""
+    )
+
     action_line = (
         "Authorization Type: OUTPATIENT CONSULTATION"
         if recommended_action == "OUTPATIENT_CONSULTATION"
@@ -276,7 +440,8 @@ async def loa_agent_node(state: AgentState) -> AgentState:
         f"Hospital: {hospital_name}\n"
         f"Address: {address}\n"
         f"Emergency Contact: {emergency_contact} | Distance: {distance_km} km\n"
-        f"{doctor_line}\n\n"
+        f"{doctor_line}\n"
+        f"{bed_line}\n"
         f"Approved Services: {', '.join(approved_services)}\n"
         f"Room Type: {room_type}\n"
         f"Exclusions: {', '.join(exclusions) if exclusions else 'None'}\n\n"
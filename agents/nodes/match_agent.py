@@ -1,65 +1,279 @@
-"""Match agent node — filters and ranks hospitals by insurance, capability, and distance."""
+"""Match agent node — filters and ranks hospitals by insurance, capability, and road ETA or distance."""
 import logging
 import json
-from math import radians, sin, cos, sqrt, atan2
+import os
+import time
+
+import numpy as np
+
+from collections import Counter
+from math import inf
 
 from langchain_core.messages import AIMessage
 
 from agents.state import AgentState
 from agents.prompts import match_agent_prompts as ma_prompts
-from data.hospitals import HOSPITALS, EMERGENCY_LOA_SERVICES_MAP
-from utils.llm_util import call_llm
+from agents.nodes.classification_agent import detect_red_flags, case_text, provisional_type
+from data.capacity import CAPACITY
+from data.gazetteer import Geocode
+from data.geocoder import GEOCODER
+from data.hospitals import EMERGENCY_LOA_SERVICES_MAP
+from data.reference import REFERENCE, ReferenceSnapshot
+from data.reservations import RESERVATIONS
+from data.road_network import MAX_ETA_SECONDS, ROUTER, current_period
+from utils.bitset_util import BitVocabulary
+from utils.cache_util import LRUCache
+from utils.geo_util import SpatialIndex, CoordinateArray, CellShortlists, haversine_distance
+from utils.llm_util import call_llm, PRIORITY_NORMAL, PRIORITY_CRITICAL
 
 logger = logging.getLogger(__name__)
 
 
-# ── Haversine Distance ────────────────────────────────────────────────────────
+# ── Geocoding ─────────────────────────────────────────────────────────────────
+# Through the geocoding provider, if configured, else offline against the
+# gazetteer (data/geocoder.py). A location that is not recognized, or matches
+# several far-apart places, goes back to the patient to clarify instead of
+# being guessed.
+
+# A device fix (ChatRequest.coordinates) is used as is, unless it is coarser
+# than this and the patient also named a place.
+_MAX_FIX_ACCURACY_M = 5_000
+
+
+def _device_fix(state: AgentState, location: str) -> tuple[float, float] | None:
+    """Coordinates from the device location fix, if there is one worth using."""
+    coordinates = (state.get("intake") or {}).get("coordinates")
+    if not coordinates:
+        return None
+    accuracy = coordinates.get("accuracy_m")
+    named = location not in ("unknown", "device location", "")
+    if accuracy is not None and accuracy > _MAX_FIX_ACCURACY_M and named:
+        logger.info("Device fix too coarse (±%.0f m) — geocoding '%s' instead", accuracy, location)
+        return None
+    return coordinates["lat"], coordinates["lng"]
+
+
+def _location_clarification(location: str, geocode: Geocode) -> AgentState:
+    candidates = [GEOCODER.label(place) for place in geocode.candidates]
+    if candidates:
+        summary = f"Location '{location}' matches several places ({'; '.join(candidates)}) — asking the patient which one."
+    else:
+        summary = f"Location '{location}' was not recognized — asking the patient for their barangay and city."
+    logger.warning(summary)
+
+    match_output = {
+        "matched": False,
+        "top_hospitals": [],
+        "preferred_hospital_used": False,
+        "auto_selected": False,
+        "location_clarification": {"location": location, "candidates": candidates},
+    }
+    return {
+        "messages": [AIMessage(content=summary, name="match_agent")],
+        "match_agent_output": match_output,
+        "next_agent": "response_agent",
+    }
+
+
+# ── Registry Indexes ──────────────────────────────────────────────────────────
+# Built per reference-data version (see data/reference.py) before it is
+# published, so a reload swaps them together with the registry.
+#
+# Eligibility: insurers, emergency types and capabilities are precompiled into
+# one bit each, and every hospital into a mask, so a full eligibility check is
+# a single AND/compare — or one NumPy operation over the whole registry.
+
+def _hospital_mask(bits: BitVocabulary, hospital: dict) -> int:
+    mask = 0
+    for insurer in hospital["insurance_accepted"]:
+        mask |= bits.add("insurer", insurer)
+    for emergency_type in hospital["emergency_types_supported"]:
+        mask |= bits.add("emergency_type", emergency_type)
+    for capability, available in hospital["capabilities"].items():
+        bit = bits.add("capability", capability)
+        if available:
+            mask |= bit
+    return mask
+
+
+class _MatchIndexes:
+    def __init__(self, reference: ReferenceSnapshot):
+        self.hospitals = reference.hospitals.hospitals
+
+        # Nearest-neighbor search over the registry; queries stop once k eligible
+        # hospitals are found and nothing unvisited can be closer
+        self.spatial = SpatialIndex(self.hospitals)
+
+        # Columnar coordinates for ranking many patient points in one vectorized call
+        self.coords = CoordinateArray(self.hospitals)
+
+        self.bits = BitVocabulary()
+        self.masks = {h["id"]: _hospital_mask(self.bits, h) for h in self.hospitals}
+
+        # Road node each hospital is reached from (see _nearest)
+        self.road_nodes = {
+            h["id"]: ROUTER.snap(h["lat"], h["lng"], max_snap_m=inf) for h in self.hospitals
+        } if ROUTER else {}
+
+        # Row i holds the mask of the i-th registry hospital as uint64 words
+        self.mask_words = np.array(
+            [self.bits.to_words(self.masks[h["id"]]) for h in self.hospitals],
+            dtype=np.uint64,
+        ).reshape(len(self.hospitals), self.bits.words)
+
+        # Nearest eligible hospitals per grid cell (see Cell Cache below)
+        self.cells = CellShortlists(self.coords, _CELL_DEG, _CELL_SHORTLIST)
+        self.cell_cache = LRUCache(_CELL_CACHE_SIZE)
+        previous = REFERENCE.current()
+        _warm_cell_cache(self, previous.peek("match_indexes") if previous is not reference else None)
+
+
+def _match_indexes() -> _MatchIndexes:
+    """Indexes for the reference data version the current run is pinned to."""
+    return REFERENCE.get().derived("match_indexes", _MatchIndexes)
+
+
+class _Requirement:
+    """Compiled eligibility requirement for one request."""
+
+    def __init__(
+        self,
+        insurance_provider: str,
+        classification_type: str,
+        capability_keys: list[str],
+        indexes: _MatchIndexes | None = None,
+    ):
+        self._indexes = indexes or _match_indexes()
+        self.insurance_provider = insurance_provider
+        self.classification_type = classification_type
+        self.capability_keys = capability_keys
+        # Pairs without a bit are held by no hospital — nothing can be eligible
+        self.mask, unknown = self._indexes.bits.encode(
+            [("insurer", insurance_provider), ("emergency_type", classification_type)]
+            + [("capability", cap) for cap in capability_keys]
+        )
+        self.capability_mask, _ = self._indexes.bits.encode([("capability", cap) for cap in capability_keys])
+        self.unknown = set(unknown)
+
+    def eligible(self, hospital: dict) -> bool:
+        return not self.unknown and (self._indexes.masks[hospital["id"]] & self.mask) == self.mask
+
+    def eligible_array(self) -> np.ndarray:
+        """Boolean eligibility over the registry, in registry order."""
+        if self.unknown:
+            return np.zeros(len(self._indexes.hospitals), dtype=bool)
+        required = self._indexes.bits.to_words(self.mask)
+        return np.all((self._indexes.mask_words & required) == required, axis=1)
+
+    def rejection_reason(self, hospital: dict) -> str | None:
+        """Why the hospital fails, checked in order: insurance, type, capabilities."""
+        missing = self._indexes.bits.decode(self.mask & ~self._indexes.masks[hospital["id"]]) | self.unknown
+        if not missing:
+            return None
+
+        if ("insurer", self.insurance_provider) in missing:
+            return f"does not accept {self.insurance_provider} insurance"
+
+        if ("emergency_type", self.classification_type) in missing:
+            return f"does not support {self.classification_type} emergencies"
+
+        missing_caps = [cap for cap in self.capability_keys if ("capability", cap) in missing]
+        return f"missing required capabilities: {', '.join(missing_caps)}"
 
-def _haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
-    """Calculate distance in km between two coordinates."""
-    r = 6371  # Earth radius in km
-    lat1, lng1, lat2, lng2 = map(radians, [lat1, lng1, lat2, lng2])
-    dlat = lat2 - lat1
-    dlng = lng2 - lng1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlng/2)**2
-    return r * 2 * atan2(sqrt(a), sqrt(1 - a))
 
+# ── Cell Cache ────────────────────────────────────────────────────────────────
+# Patients in the same small grid cell share their nearest eligible hospitals.
+# Per (cell, insurer, emergency type, capability mask) the cache keeps a
+# shortlist of hospitals that holds the CELL_CACHE_SHORTLIST nearest eligible
+# ones for every point of the cell (utils/geo_util.py: CellShortlists). A
+# query ranks only the shortlist by exact distance from the patient, so
+# results match an uncached search. Least recently used entries are evicted.
+#
+# The cache belongs to the indexes of one reference data version: a reload
+# builds a new one, warmed before it is published with the cells holding the
+# most hospitals and the keys most recently used on the previous version.
 
-# ── Geocoding (mock) ──────────────────────────────────────────────────────────
+_CELL_DEG = float(os.getenv("CELL_CACHE_DEG", "0.01"))
+_CELL_SHORTLIST = int(os.getenv("CELL_CACHE_SHORTLIST", "24"))
+_CELL_CACHE_SIZE = int(os.getenv("CELL_CACHE_SIZE", "50000"))
+_CELL_WARM_CELLS = int(os.getenv("CELL_CACHE_WARM_CELLS", "64"))
+_CELL_WARM_KEYS = int(os.getenv("CELL_CACHE_WARM_KEYS", "2000"))
 
-def _get_patient_coordinates(location: str) -> tuple:
+
+def _cell_key(cell: tuple[int, int], requirement: _Requirement) -> tuple:
+    return cell, requirement.insurance_provider, requirement.classification_type, requirement.capability_mask
+
+
+def _warm_cell_cache(indexes: _MatchIndexes, previous: _MatchIndexes | None) -> None:
     """
-    Mock geocoding — maps known PH locations to lat/lng.
-    In production replace with Nominatim or Google Maps API.
+    Fills the cache ahead of traffic: the densest cells for every insurer and
+    emergency type offered together (no capability required), plus the keys
+    most recently used on the previous version.
     """
-    location_lower = location.lower()
-
-    location_map = {
-        "bgc": (14.5494, 121.0509),
-        "bonifacio global city": (14.5494, 121.0509),
-        "taguig": (14.5243, 121.0792),
-        "makati": (14.5547, 121.0244),
-        "ortigas": (14.5872, 121.0674),
-        "pasig": (14.5764, 121.0851),
-        "quezon city": (14.6760, 121.0437),
-        "qc": (14.6760, 121.0437),
-        "manila": (14.5995, 120.9842),
-        "malate": (14.5649, 120.9904),
-        "ermita": (14.5831, 120.9794),
-        "alabang": (14.4195, 121.0347),
-        "muntinlupa": (14.4081, 121.0415),
-        "san juan": (14.5997, 121.0382),
-        "greenhills": (14.5997, 121.0382),
-        "mandaluyong": (14.5794, 121.0359),
+    started = time.perf_counter()
+    wanted: dict[tuple[str, str, tuple[str, ...]], set[tuple[int, int]]] = {}
+
+    dense = [cell for cell, _ in Counter(
+        indexes.cells.cell_of(h["lat"], h["lng"]) for h in indexes.hospitals
+    ).most_common(_CELL_WARM_CELLS)]
+    offered = {
+        (insurer, emergency_type)
+        for h in indexes.hospitals
+        for insurer in h["insurance_accepted"]
+        for emergency_type in h["emergency_types_supported"]
     }
+    for insurer, emergency_type in offered:
+        wanted.setdefault((insurer, emergency_type, ()), set()).update(dense)
+
+    if previous:
+        # Capability masks are per version: carried over by name
+        for cell, insurer, emergency_type, capability_mask in previous.cell_cache.keys()[:_CELL_WARM_KEYS]:
+            capabilities = tuple(sorted(name for _, name in previous.bits.decode(capability_mask)))
+            wanted.setdefault((insurer, emergency_type, capabilities), set()).add(cell)
+
+    entries = 0
+    for (insurer, emergency_type, capabilities), cells in wanted.items():
+        requirement = _Requirement(insurer, emergency_type, list(capabilities), indexes)
+        if requirement.unknown:
+            continue
+        cells = sorted(cells)
+        for cell, shortlist in zip(cells, indexes.cells.shortlists(cells, requirement.eligible_array())):
+            indexes.cell_cache.put(_cell_key(cell, requirement), shortlist)
+            entries += 1
+
+    logger.info("Cell cache warmed with %d entries in %.0f ms", entries, (time.perf_counter() - started) * 1000)
+
+
+def _shortlist(
+    indexes: _MatchIndexes,
+    requirement: _Requirement,
+    lat: float,
+    lng: float,
+    n: int,
+) -> list[tuple[float, dict]]:
+    """The n nearest eligible hospitals, (distance_km, hospital) closest first."""
+    if requirement.unknown:
+        return []
+    cell = indexes.cells.cell_of(lat, lng)
+    key = _cell_key(cell, requirement)
+    shortlist = indexes.cell_cache.get(key)
+    if shortlist is None:
+        shortlist = indexes.cells.shortlists([cell], requirement.eligible_array())[0]
+        indexes.cell_cache.put(key, shortlist)
+    ranked = indexes.cells.nearest(shortlist, lat, lng, n)
+    if ranked is None:  # more than the shortlist covers
+        ranked = indexes.spatial.nearest(lat, lng, n, requirement.eligible)
+    return ranked
+
+
+def cell_cache_stats() -> dict:
+    """Hit rate and size of the current version's cell cache."""
+    snapshot = REFERENCE.current()
+    return {"reference_version": snapshot.version, **snapshot.derived("match_indexes", _MatchIndexes).cell_cache.stats()}
+
+
+REFERENCE.register("match_indexes", _MatchIndexes)
 
-    for key, coords in location_map.items():
-        if key in location_lower:
-            return coords
-
-    # Default to Metro Manila center if location not recognized
-    logger.warning("Location not recognized: %s - defaulting to Metro Manila center", location)
-    return (14.5995, 120.9842)
 
 async def _summarize_match(
     classification_type: str,
@@ -70,6 +284,7 @@ async def _summarize_match(
     selected_labels: list,
     match_output: dict,
     next_agent: str,
+    priority: int = PRIORITY_NORMAL,
 ) -> str:
     summary_messages = [
         {"role": "system", "content": ma_prompts.MATCH_SUMMARY_SYSTEM_PROMPT},
@@ -88,36 +303,17 @@ async def _summarize_match(
         )}
     ]
 
-    summary_response = await call_llm(messages=summary_messages)
+    summary_response = await call_llm(messages=summary_messages, priority=priority)
     return summary_response.choices[0].message.content or "Hospital matching complete."
 
-# ── Match Agent Node ──────────────────────────────────────────────────────────
-
-async def match_agent_node(state: AgentState) -> AgentState:
-    """
-    Match agent node — Filters hospitals by insurance and capability, ranks by distance.
-    """
-    logger.info("="*30)
-    logger.info("Match Agent Node")
-    logger.info("="*30)
-
-    ca_output = state["classification_agent_output"]
-    classification_type = ca_output.get("classification_type", "GENERAL")
-    location = ca_output.get("location", "unknown")
-    insurance_provider = ca_output.get("insurance_provider", "unknown")
-    symptoms = ca_output.get("symptoms")
-    severity = ca_output.get("severity", "URGENT")
-    recommended_action = ca_output.get("recommended_action", "HOSPITAL_ADMISSION")
-    preferred_hospital = ca_output.get("preferred_hospital")  # may be None
-
-    # ── LLM Call: Select required services from LOA map ───────────────────────
-    loa_services = EMERGENCY_LOA_SERVICES_MAP.get(
-        classification_type,
-        EMERGENCY_LOA_SERVICES_MAP["GENERAL"]
-    )
-
-    all_labels = [svc["label"] for svc in loa_services["services"]]
-
+async def _select_services(
+    classification_type: str,
+    severity: str,
+    symptoms: str,
+    recommended_action: str,
+    all_labels: list[str],
+    priority: int = PRIORITY_NORMAL,
+) -> list[str]:
     messages = [
         {"role": "system", "content": ma_prompts.SERVICES_SELECTION_SYSTEM_PROMPT},
         {"role": "user", "content": ma_prompts.SERVICES_SELECTION_QUERY_PROMPT.format(
@@ -133,6 +329,7 @@ async def match_agent_node(state: AgentState) -> AgentState:
 
     response = await call_llm(
         messages=messages,
+        priority=priority,
         response_format={
             "type": "json_schema",
             "json_schema": {
@@ -168,9 +365,274 @@ async def match_agent_node(state: AgentState) -> AgentState:
         logger.error("Failed to parse services selection: %s | Raw: %s", e, raw_content)
         selected_labels = all_labels
 
-    logger.info("LLM selected service labels: %s", selected_labels)
+    return selected_labels
+
+
+async def _resolve_services(
+    eligible_hospitals: list[dict],
+    classification_type: str,
+    severity: str,
+    symptoms: str,
+    recommended_action: str,
+    priority: int = PRIORITY_NORMAL,
+) -> list[str]:
+    """
+    Service labels to authorize. The LLM selection is skipped only when there
+    is no eligible hospital: the labels both filter hospitals and become the
+    LOA's approved services, so they are chosen from the symptoms otherwise.
+    """
+    loa_services = EMERGENCY_LOA_SERVICES_MAP.get(
+        classification_type,
+        EMERGENCY_LOA_SERVICES_MAP["GENERAL"]
+    )
+
+    all_labels = [svc["label"] for svc in loa_services["services"]]
+
+    if not eligible_hospitals:
+        logger.info("No eligible hospitals — skipping services selection LLM call.")
+        return []
+
+    return await _select_services(
+        classification_type, severity, symptoms, recommended_action, all_labels, priority
+    )
+
+
+# ── Ranking ──────────────────────────────────────────────────────────────────
+# By road ETA when a road graph is loaded (data/road_network.py), else by
+# straight-line distance. Haversine still picks the candidates: the nearest
+# few are searched by road, widened until nothing further away could be
+# reached sooner (see Router.fastest).
+#
+# Live capacity (data/capacity.py): hospitals that would turn the patient away
+# right now — on diversion, no bed or no ICU bed left once the beds reserved
+# for patients on their way are counted (data/reservations.py) — are skipped,
+# and ones whose ER is busy are ranked after those that are not among the 2k
+# best.
+
+def _nearest(
+    patient_lat: float,
+    patient_lng: float,
+    k: int,
+    requirement: _Requirement,
+    needs_icu: bool = False,
+) -> list[dict]:
+    """Returns up to k [{hospital, distance_km, eta_minutes, er_busy}] meeting requirement, fastest first."""
+    indexes = _match_indexes()
+    source = ROUTER.snap(patient_lat, patient_lng) if ROUTER else None
+    wanted = 2 * k
+
+    def shortlist(n: int) -> list[tuple[float, dict]]:
+        """The n nearest eligible hospitals that would admit the patient."""
+        size = n
+        while True:
+            candidates = _shortlist(indexes, requirement, patient_lat, patient_lng, size)
+            admitting = [c for c in candidates if RESERVATIONS.admission_issue(c[1]["id"], needs_icu) is None]
+            if len(admitting) >= n or len(candidates) < size:
+                return admitting[:n]
+            size *= 2
+
+    ranked = None
+    if source is not None:
+        period = current_period(ROUTER)
+        by_road, tree = ROUTER.fastest(
+            source,
+            wanted,
+            shortlist=shortlist,
+            snapped=lambda h: indexes.road_nodes[h["id"]],
+            period=period,
+            max_seconds=MAX_ETA_SECONDS,
+        )
+        logger.info("Hospitals ranked by road (%s speeds), %d nodes searched", period, len(tree.settled))
+        if by_road:
+            ranked = [
+                {"hospital": h, "distance_km": round(distance_km, 2), "eta_minutes": round(seconds / 60, 1)}
+                for seconds, distance_km, h in by_road
+            ]
+        else:
+            logger.warning("No hospital reachable by road — ranking by distance")
+    elif ROUTER:
+        logger.warning("Patient is off the road network — ranking by distance")
+
+    if ranked is None:
+        ranked = [
+            {"hospital": h, "distance_km": round(distance_km, 2), "eta_minutes": None}
+            for distance_km, h in shortlist(wanted)
+        ]
+
+    for r in ranked:
+        r["er_busy"] = CAPACITY.busy(r["hospital"]["id"])
+    return sorted(ranked, key=lambda r: bool(r["er_busy"]))[:k]
+
+
+def _eta_minutes(patient_lat: float, patient_lng: float, hospital: dict) -> float | None:
+    """Road ETA to one hospital; None without a road graph or route."""
+    source = ROUTER.snap(patient_lat, patient_lng) if ROUTER else None
+    if source is None:
+        return None
+    seconds = ROUTER.travel_time(source, _match_indexes().road_nodes[hospital["id"]], current_period(ROUTER))
+    return round(seconds / 60, 1) if seconds is not None else None
+
+
+def nearest_hospitals_bulk(
+    patient_points: list[tuple[float, float]],
+    k: int,
+    eligible: np.ndarray | None = None,
+) -> list[list[dict]]:
+    """
+    Batch form of _nearest for many patients at once (batch or mass-casualty
+    intake). `eligible` is a boolean array over the registry (see
+    _Requirement.eligible_array); distances for all points are computed in
+    vectorized chunks. Returns one [{hospital, distance_km}] list per point,
+    closest first.
+    """
+    if not patient_points:
+        return []
+
+    indexes = _match_indexes()
+    lats, lngs = zip(*patient_points)
+    indices, distances = indexes.coords.nearest(lats, lngs, k, eligible)
+
+    return [
+        [
+            {"hospital": indexes.hospitals[i], "distance_km": round(float(d), 2)}
+            for i, d in zip(row_indices, row_distances)
+            if np.isfinite(d)
+        ]
+        for row_indices, row_distances in zip(indices, distances)
+    ]
+
+
+def candidate_hospitals(
+    patient_lat: float,
+    patient_lng: float,
+    k: int,
+    insurance_provider: str,
+    classification_type: str,
+    capability_keys: list[str],
+    needs_icu: bool = False,
+) -> list[dict]:
+    """
+    Up to k [{hospital, distance_km, eta_minutes, er_busy}] that would take
+    the patient, fastest first: the same checks and ranking as a single
+    match, for callers that choose among them (services/mass_casualty_service.py).
+    """
+    requirement = _Requirement(insurance_provider, classification_type, capability_keys)
+    return _nearest(patient_lat, patient_lng, k, requirement, needs_icu)
+
+
+# ── Red-flag speculation (see agents/graph.py) ───────────────────────────────
+# Triggered after verification: when the user text has red-flag phrases, service
+# selection runs on the provisional CRITICAL classification while the
+# classifier LLM call is in flight. Committed only if the final
+# classification agrees with the prediction. Service selection does not
+# depend on where the patient is, so the location is not part of the key.
+
+def match_inputs(state: AgentState) -> tuple:
+    ca_output = state["classification_agent_output"]
+    return (
+        ca_output.get("insurance_provider", "unknown"),
+        ca_output.get("classification_type", "GENERAL"),
+        ca_output.get("severity", "URGENT"),
+        ca_output.get("recommended_action", "HOSPITAL_ADMISSION"),
+    )
+
+
+def predict_match_inputs(state: AgentState) -> dict:
+    insurance_provider = (state.get("verification_output") or {}).get("insurance_provider")
+    if not insurance_provider:
+        return {}
+
+    text = case_text(state)
+    red_flags = detect_red_flags(text)
+    if not red_flags:
+        return {}
+
+    classification_type = provisional_type(red_flags)
+    key = (insurance_provider, classification_type, "CRITICAL", "HOSPITAL_ADMISSION")
+    return {key: (insurance_provider, classification_type, text)}
+
+
+async def speculate_match(inputs: tuple) -> dict:
+    insurance_provider, classification_type, symptoms = inputs
+    eligible_hospitals = REFERENCE.get().hospitals.eligible(insurance_provider, classification_type)
+    selected_labels = await _resolve_services(
+        eligible_hospitals, classification_type, "CRITICAL", symptoms,
+        "HOSPITAL_ADMISSION", PRIORITY_CRITICAL
+    )
+    return {"selected_labels": selected_labels}
+
+# ── Match Agent Node ──────────────────────────────────────────────────────────
+
+async def match_agent_node(
+    state: AgentState,
+    speculated: dict | None = None,
+    publish=None,
+) -> AgentState:
+    """
+    Match agent node — Filters hospitals by insurance and capability, ranks by distance.
+
+    `speculated` is a committed red-flag speculation (selected services);
+    `publish` hands the match result to dependent speculations before the summary
+    LLM call.
+    """
+    logger.info("="*30)
+    logger.info("Match Agent Node")
+    logger.info("="*30)
+
+    ca_output = state["classification_agent_output"]
+    classification_type = ca_output.get("classification_type", "GENERAL")
+    location = ca_output.get("location", "unknown")
+    insurance_provider = ca_output.get("insurance_provider", "unknown")
+    symptoms = ca_output.get("symptoms")
+    severity = ca_output.get("severity", "URGENT")
+    recommended_action = ca_output.get("recommended_action", "HOSPITAL_ADMISSION")
+    preferred_hospital = ca_output.get("preferred_hospital")  # may be None
+
+    priority = state.get("triage_priority", PRIORITY_NORMAL)
+
+    # ── Step 1: Get patient coordinates ───────────────────────────────────────
+    fix = _device_fix(state, location)
+    if fix:
+        patient_lat, patient_lng = fix
+        logger.info("Patient location: device fix (%s, %s)", patient_lat, patient_lng)
+    else:
+        geocode = await GEOCODER.geocode(location)
+        if not geocode.resolved:
+            return _location_clarification(location, geocode)
+
+        patient_lat, patient_lng = geocode.coordinates
+        logger.info(
+            "Patient location: %s (%s, %s; confidence %.2f)",
+            GEOCODER.label(geocode.place), patient_lat, patient_lng, geocode.confidence
+        )
+
+    # ── Cheap deterministic filter: insurance + emergency type ───────────────
+    eligible_hospitals = REFERENCE.get().hospitals.eligible(insurance_provider, classification_type)
+
+    logger.info(
+        "Hospitals accepting %s and supporting %s: %s",
+        insurance_provider, classification_type, len(eligible_hospitals)
+    )
+
+    # ── Select required services from LOA map (LLM unless outcome is fixed) ──
+    if speculated:
+        selected_labels = speculated["selected_labels"]
+    elif state.get("rematch") and state.get("selected_loa_services"):
+        # Sent back after a bed refusal — keep the services already chosen
+        selected_labels = state["selected_loa_services"]
+    else:
+        selected_labels = await _resolve_services(
+            eligible_hospitals, classification_type, severity, symptoms, recommended_action, priority
+        )
+
+    logger.info("Selected service labels: %s", selected_labels)
 
     # ── Back-map labels → requires keys ───────────────────────────────────────
+    loa_services = EMERGENCY_LOA_SERVICES_MAP.get(
+        classification_type,
+        EMERGENCY_LOA_SERVICES_MAP["GENERAL"]
+    )
+
     label_to_requires = {
         svc["label"]: svc["requires"]
         for svc in loa_services["services"]
@@ -184,28 +646,15 @@ async def match_agent_node(state: AgentState) -> AgentState:
 
     logger.info("Required capability keys for hospital filter: %s", required_capability_keys)
 
-    # ── Step 1: Get patient coordinates ───────────────────────────────────────
-    patient_lat, patient_lng = _get_patient_coordinates(location)
-    logger.info("Patient coordinates: %s, %s", patient_lat, patient_lng)
-
     # ── Helper: Check if a hospital passes insurance + capability checks ───────
+    requirement = _Requirement(insurance_provider, classification_type, required_capability_keys)
+    needs_icu = "icu" in required_capability_keys
+
     def passes_checks(hospital: dict) -> tuple[bool, str | None]:
         """Returns (passed, fail_reason). fail_reason is None if passed."""
-        if insurance_provider not in hospital["insurance_accepted"]:
-            return False, f"does not accept {insurance_provider} insurance"
-
-        if classification_type not in hospital["emergency_types_supported"]:
-            return False, f"does not support {classification_type} emergencies"
-
-        hospital_caps = hospital["capabilities"]
-        missing_caps = [
-            cap for cap in required_capability_keys
-            if not hospital_caps.get(cap, False)
-        ]
-        if missing_caps:
-            return False, f"missing required capabilities: {', '.join(missing_caps)}"
-
-        return True, None
+        if requirement.eligible(hospital):
+            return True, None
+        return False, requirement.rejection_reason(hospital)
 
     # ── Step 2: Check preferred hospital first (if provided) ──────────────────
     fail_reason = None  # initialize so it's always defined for downstream steps
@@ -213,24 +662,35 @@ async def match_agent_node(state: AgentState) -> AgentState:
     if preferred_hospital:
         logger.info("Preferred hospital requested: %s", preferred_hospital)
 
-        preferred_match = next(
-            (h for h in HOSPITALS if h["name"].lower() == preferred_hospital.lower()),
-            None
-        )
+        resolution = REFERENCE.get().hospitals.resolve_name(preferred_hospital)
+        preferred_match = resolution.hospital
+
+        if preferred_match and resolution.confidence < 1.0:
+            logger.info(
+                "Preferred hospital '%s' resolved to '%s' (confidence %.2f)",
+                preferred_hospital, preferred_match["name"], resolution.confidence
+            )
 
         if not preferred_match:
             fail_reason = "not found in the hospital registry"
+            if resolution.candidates:
+                fail_reason += " (closest: " + ", ".join(
+                    c.payload["name"] for c in resolution.candidates
+                ) + ")"
             logger.warning(
                 "Preferred hospital '%s' — %s. Falling back to ranked search.",
                 preferred_hospital, fail_reason
             )
         else:
             passed, fail_reason = passes_checks(preferred_match)
+            if passed:
+                fail_reason = RESERVATIONS.admission_issue(preferred_match["id"], needs_icu)
+                passed = fail_reason is None
 
             if passed:
                 logger.info("Preferred hospital passed all checks — routing directly to LOA agent.")
 
-                distance_km = round(_haversine_distance(
+                distance_km = round(haversine_distance(
                     patient_lat, patient_lng,
                     preferred_match["lat"], preferred_match["lng"]
                 ), 2)
@@ -247,6 +707,8 @@ async def match_agent_node(state: AgentState) -> AgentState:
                     "contact": preferred_match["contact"],
                     "emergency_contact": preferred_match["emergency_contact"],
                     "distance_km": distance_km,
+                    "eta_minutes": _eta_minutes(patient_lat, patient_lng, preferred_match),
+                    "er_busy": CAPACITY.busy(preferred_match["id"]),
                     "capabilities": preferred_match["capabilities"],
                     "hospital_raw": preferred_match,
                     "preferred_hospital_used": True,
@@ -257,15 +719,24 @@ async def match_agent_node(state: AgentState) -> AgentState:
                     {k: v for k, v in match_output.items() if k != "hospital_raw"}, indent=2
                 ))
 
+                # Prepare the LOA while the summary is generated
+                if publish:
+                    publish({
+                        "selected_loa_services": selected_labels,
+                        "match_agent_output": match_output,
+                        "next_agent": next_agent,
+                    })
+
                 summary = await _summarize_match(
                     classification_type, severity, location, insurance_provider,
-                    preferred_hospital, selected_labels, match_output, next_agent
+                    preferred_hospital, selected_labels, match_output, next_agent, priority
                 )
                 logger.info("Match summary: %s", summary)
 
                 return {
                     "messages": [AIMessage(content=summary, name="match_agent")],
                     "selected_loa_services": selected_labels,
+                    "rematch": False,
                     "match_agent_output": match_output,
                     "next_agent": next_agent
                 }
@@ -275,24 +746,12 @@ async def match_agent_node(state: AgentState) -> AgentState:
                     preferred_hospital, fail_reason
                 )
 
-    # ── Step 3: Filter all hospitals by insurance + capability ────────────────
-    capable_hospitals = [h for h in HOSPITALS if passes_checks(h)[0]]  # unpack tuple, take bool only
-
-    logger.info("Hospitals after insurance + capability filter: %s", len(capable_hospitals))
+    # ── Step 3 + 4: Nearest hospitals passing insurance, capability and capacity checks
+    # Only as many as are used: the top 1 for CRITICAL, otherwise the top 3
+    k = 1 if severity == "CRITICAL" else 3
+    ranked = _nearest(patient_lat, patient_lng, k, requirement, needs_icu)
 
-    # ── Step 4: Rank by distance ───────────────────────────────────────────────
-    ranked = sorted(
-        [
-            {
-                "hospital": h,
-                "distance_km": round(_haversine_distance(
-                    patient_lat, patient_lng, h["lat"], h["lng"]
-                ), 2)
-            }
-            for h in capable_hospitals
-        ],
-        key=lambda x: x["distance_km"]
-    )
+    logger.info("Nearest hospitals after insurance + capability filter: %s", len(ranked))
 
     # ── Step 5: No hospitals found ────────────────────────────────────────────
     if not ranked:
@@ -309,13 +768,14 @@ async def match_agent_node(state: AgentState) -> AgentState:
 
         summary = await _summarize_match(
             classification_type, severity, location, insurance_provider,
-            preferred_hospital, selected_labels, match_output, next_agent
+            preferred_hospital, selected_labels, match_output, next_agent, priority
         )
         logger.info("Match summary: %s", summary)
 
         return {
             "messages": [AIMessage(content=summary, name="match_agent")],
             "selected_loa_services": selected_labels,
+            "rematch": False,
             "match_agent_output": match_output,
             "next_agent": next_agent
         }
@@ -337,6 +797,8 @@ async def match_agent_node(state: AgentState) -> AgentState:
             "contact": top["hospital"]["contact"],
             "emergency_contact": top["hospital"]["emergency_contact"],
             "distance_km": top["distance_km"],
+            "eta_minutes": top["eta_minutes"],
+            "er_busy": top["er_busy"],
             "capabilities": top["hospital"]["capabilities"],
             "hospital_raw": top["hospital"],
             "preferred_hospital_used": False,
@@ -348,15 +810,24 @@ async def match_agent_node(state: AgentState) -> AgentState:
             {k: v for k, v in match_output.items() if k != "hospital_raw"}, indent=2
         ))
 
+        # Prepare the LOA while the summary is generated
+        if publish:
+            publish({
+                "selected_loa_services": selected_labels,
+                "match_agent_output": match_output,
+                "next_agent": next_agent,
+            })
+
         summary = await _summarize_match(
             classification_type, severity, location, insurance_provider,
-            preferred_hospital, selected_labels, match_output, next_agent
+            preferred_hospital, selected_labels, match_output, next_agent, priority
         )
         logger.info("Match summary: %s", summary)
 
         return {
             "messages": [AIMessage(content=summary, name="match_agent")],
             "selected_loa_services": selected_labels,
+            "rematch": False,
             "match_agent_output": match_output,
             "next_agent": next_agent
         }
@@ -374,6 +845,8 @@ async def match_agent_node(state: AgentState) -> AgentState:
             "contact": r["hospital"]["contact"],
             "emergency_contact": r["hospital"]["emergency_contact"],
             "distance_km": r["distance_km"],
+            "eta_minutes": r["eta_minutes"],
+            "er_busy": r["er_busy"],
         }
         for r in ranked[:3]
     ]
@@ -391,15 +864,24 @@ async def match_agent_node(state: AgentState) -> AgentState:
 
     logger.info("Match output (top 3): %s", json.dumps(match_output, indent=2))
 
+    # ── Speculatively prepare the LOA for each option while the patient decides
+    if publish:
+        publish({
+            "selected_loa_services": selected_labels,
+            "match_agent_output": match_output,
+            "next_agent": next_agent,
+        })
+
     summary = await _summarize_match(
         classification_type, severity, location, insurance_provider,
-        preferred_hospital, selected_labels, match_output, next_agent
+        preferred_hospital, selected_labels, match_output, next_agent, priority
     )
     logger.info("Match summary: %s", summary)
 
     return {
         "messages": [AIMessage(content=summary, name="match_agent")],
         "selected_loa_services": selected_labels,
+        "rematch": False,
         "match_agent_output": match_output,
         "next_agent": next_agent
     }
@@ -5,6 +5,7 @@ import json
 from langchain_core.messages import AIMessage
 
 from agents.state import AgentState
+from agents.nodes.classification_agent import intake_facts
 from agents.prompts import orchestrator_agent_prompts as oa_prompts
 from agents.tools import orchestrator_agent_tools as oa_tools
 from utils.llm_util import call_llm
@@ -22,11 +23,13 @@ async def orchestrator_agent_node(state: AgentState) -> AgentState:
 
     past_messages = state["messages"]
     patient_name = state["patient_name"]
+    facts = intake_facts(state.get("intake"))
 
     # Build messages for LLM call
     messages = [
         {"role": "system", "content": oa_prompts.ORCHESTRATOR_AGENT_PROMPT.format(
             patient_name=patient_name,
+            known_facts="\n".join(f"- {fact}" for fact in facts) if facts else oa_prompts.NO_KNOWN_FACTS,
         )}
     ]
 
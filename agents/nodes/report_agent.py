@@ -5,7 +5,7 @@ from langchain_core.messages import AIMessage
 
 from agents.state import AgentState
 from agents.prompts import report_agent_prompts as ra_prompts
-from utils.llm_util import call_llm
+from utils.llm_util import call_llm, PRIORITY_NORMAL
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +59,7 @@ async def report_agent_node(state: AgentState) -> AgentState:
 
     response = await call_llm(
         messages=messages,
+        priority=state.get("triage_priority", PRIORITY_NORMAL),
         response_format={
             "type": "json_schema",
             "json_schema": {
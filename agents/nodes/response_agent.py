@@ -5,7 +5,7 @@ from langchain_core.messages import AIMessage
 
 from agents.state import AgentState
 from agents.prompts import response_agent_prompts as ra_prompts
-from utils.llm_util import call_llm
+from utils.llm_util import call_llm, PRIORITY_NORMAL
 
 logger = logging.getLogger(__name__)
 
@@ -30,11 +30,42 @@ async def _handle_phase0(state: AgentState) -> str:
 
     logger.info("Response agent Phase 0 (verification failed) — calling LLM...")
 
-    response = await call_llm(messages=messages)
+    response = await call_llm(messages=messages, priority=state.get("triage_priority", PRIORITY_NORMAL))
     return response.choices[0].message.content or "We were unable to verify your insurance. Please contact your provider."
 
 
+# ── Location clarification ───────────────────────────────────────────────────
+async def _handle_location_clarification(state: AgentState, clarification: dict) -> str:
+    ca_output = state.get("classification_agent_output", {})
+    candidates = clarification.get("candidates", [])
+
+    messages = [
+        {"role": "system", "content": ra_prompts.RESPONSE_AGENT_LOCATION_SYSTEM_PROMPT},
+        {"role": "user", "content": ra_prompts.RESPONSE_AGENT_LOCATION_QUERY_PROMPT.format(
+            symptoms=ca_output.get("symptoms", "unknown"),
+            severity=ca_output.get("severity", "URGENT"),
+            location=clarification.get("location", "unknown"),
+            candidates="\n".join(f"{i+1}. {c}" for i, c in enumerate(candidates)) or "None",
+        )}
+    ]
+
+    logger.info("Response agent (location clarification) — calling LLM...")
+
+    response = await call_llm(messages=messages, priority=state.get("triage_priority", PRIORITY_NORMAL))
+    return response.choices[0].message.content or "Could you tell me your barangay and city so I can find the nearest hospital?"
+
+
 # ── Phase 1 ───────────────────────────────────────────────────────────────────
+def _travel(hospital: dict) -> str:
+    if hospital.get("eta_minutes") is None:
+        travel = f"{hospital['distance_km']} km away"
+    else:
+        travel = f"{hospital['distance_km']} km away, about {hospital['eta_minutes']:.0f} min by road"
+    if hospital.get("er_busy"):
+        travel += " (ER currently very busy — expect a longer wait)"
+    return travel
+
+
 async def _handle_phase1(state: AgentState) -> str:
     ca_output = state.get("classification_agent_output", {})
     match_output = state.get("match_agent_output", {})
@@ -44,7 +75,7 @@ async def _handle_phase1(state: AgentState) -> str:
 
     # Format hospital list for the prompt
     hospitals_text = "\n".join([
-        f"{i+1}. {h['hospital_name']} — {h['distance_km']} km away\n"
+        f"{i+1}. {h['hospital_name']} — {_travel(h)}\n"
         f"   Address: {h['address']}\n"
         f"   Emergency Contact: {h['emergency_contact']}"
         for i, h in enumerate(top_hospitals)
@@ -68,7 +99,7 @@ async def _handle_phase1(state: AgentState) -> str:
 
     logger.info("Response agent Phase 1 — calling LLM...")
 
-    response = await call_llm(messages=messages)
+    response = await call_llm(messages=messages, priority=state.get("triage_priority", PRIORITY_NORMAL))
     return response.choices[0].message.content or "Please choose a hospital from the list above."
 
 
@@ -109,7 +140,7 @@ async def _handle_phase2(state: AgentState, report_output: dict) -> str:
 
     logger.info("Response agent Phase 2 — calling LLM...")
 
-    response = await call_llm(messages=messages)
+    response = await call_llm(messages=messages, priority=state.get("triage_priority", PRIORITY_NORMAL))
     return response.choices[0].message.content or "Your authorization is ready. Please proceed to the facility."
 
 
@@ -117,7 +148,9 @@ async def response_agent_node(state: AgentState) -> AgentState:
     """
     Response agent node.
     Phase 0 — verification failed: inform patient calmly and guide next steps.
-    Phase 1 — no report_output yet: present top 3 hospitals, give first aid guidance.
+    Location clarification — the location did not resolve: ask where the patient is.
+    Phase 1 — no report_output yet: present top 3 hospitals, give first aid guidance,
+              then suspend at selection_agent until the patient picks one.
     Phase 2 — report_output present: relay final confirmation to patient.
     """
     logger.info("="*30)
@@ -135,16 +168,25 @@ async def response_agent_node(state: AgentState) -> AgentState:
 
     is_phase2 = report_output is not None and report_output.get("generated", False)
 
+    # The match could not place the patient — ask where they are
+    clarification = (state.get("match_agent_output") or {}).get("location_clarification")
+
+    next_agent = "END"
+
     if is_phase0:
         response = await _handle_phase0(state)
     elif is_phase2:
         response = await _handle_phase2(state, report_output)
+    elif clarification:
+        response = await _handle_location_clarification(state, clarification)
     else:
         response = await _handle_phase1(state)
+        if (state.get("match_agent_output") or {}).get("top_hospitals"):
+            next_agent = "selection_agent"
 
     logger.info("Response agent message: \n%s", response)
 
     return {
         "messages": [AIMessage(content=response, name="response_agent")],
-        "next_agent": "END"
+        "next_agent": next_agent
     }
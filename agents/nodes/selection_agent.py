@@ -0,0 +1,119 @@
+"""Selection agent node — resumes a suspended run with the patient's hospital choice."""
+import logging
+import re
+
+from langchain_core.messages import HumanMessage
+from langgraph.types import interrupt
+
+from agents.state import AgentState
+from data.reference import REFERENCE
+
+logger = logging.getLogger(__name__)
+
+
+_ORDINALS = {
+    "first": 0, "1st": 0,
+    "second": 1, "2nd": 1,
+    "third": 2, "3rd": 2,
+}
+
+# Only consulted when no ordinal is present, so "the second one" stays unambiguous
+_CARDINALS = {
+    "one": 0, "1": 0,
+    "two": 1, "2": 1,
+    "three": 2, "3": 2,
+}
+
+# Words that make a reply something other than a plain pick from the list
+_NOT_A_SELECTION = {"not", "no", "none", "neither", "other", "another", "instead", "else"}
+
+# Tokens too common in hospital names to tell options apart
+_NAME_STOPWORDS = {"the", "of", "and", "st", "medical", "center", "hospital", "general", "city"}
+
+
+def _normalize(text: str) -> str:
+    text = text.lower().replace("'", "").replace("’", "")
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+
+def resolve_hospital_choice(reply: str, top_hospitals: list[dict]) -> dict | None:
+    """
+    Deterministically matches a reply against the presented options by
+    hospital id ("H004"), ordinal ("the second one", "3") or name/alias ("St. Luke's", "PGH").
+    Returns the chosen option, or None when the reply is not a clear selection.
+    """
+    if not top_hospitals or "?" in reply:
+        return None
+
+    normalized = _normalize(reply)
+    tokens = set(normalized.split())
+
+    if tokens & _NOT_A_SELECTION:
+        return None
+
+    candidates: set[int] = set()
+
+    for i, option in enumerate(top_hospitals):
+        if option["hospital_id"].lower() in tokens:
+            candidates.add(i)
+
+    positions = {_ORDINALS[t] for t in tokens if t in _ORDINALS}
+    if "last" in tokens:
+        positions.add(len(top_hospitals) - 1)
+    if not positions:
+        positions = {_CARDINALS[t] for t in tokens if t in _CARDINALS}
+    candidates.update(p for p in positions if p < len(top_hospitals))
+
+    for i, option in enumerate(top_hospitals):
+        hospital = REFERENCE.get().hospitals.get(option["hospital_id"]) or {}
+        for name in [option["hospital_name"], *hospital.get("aliases", [])]:
+            name = _normalize(name)
+            distinctive = set(name.split()) - _NAME_STOPWORDS
+            if name in normalized or distinctive & tokens:
+                candidates.add(i)
+
+    if len(candidates) != 1:
+        return None
+
+    return top_hospitals[candidates.pop()]
+
+
+async def selection_agent_node(state: AgentState) -> AgentState:
+    """
+    Selection agent node — suspends the graph after the top 3 hospitals are
+    presented and resumes with the patient's next message.
+
+    A clear pick goes straight to the LOA agent; anything else is handed back
+    to the orchestrator with the reply appended to the conversation.
+    """
+    logger.info("=" * 30)
+    logger.info("Selection Agent Node")
+    logger.info("=" * 30)
+
+    top_hospitals = state["match_agent_output"].get("top_hospitals", [])
+
+    # Suspends here on first entry; on resume, returns the patient's reply
+    reply = interrupt({
+        "type": "hospital_selection",
+        "options": [
+            {"hospital_id": h["hospital_id"], "hospital_name": h["hospital_name"]}
+            for h in top_hospitals
+        ],
+    })
+
+    user_message = HumanMessage(content=reply)
+    choice = resolve_hospital_choice(reply, top_hospitals)
+
+    if choice:
+        logger.info("Reply resolved to hospital: %s (%s)", choice["hospital_name"], choice["hospital_id"])
+        return {
+            "messages": [user_message],
+            "chosen_hospital": choice["hospital_name"],
+            "next_agent": "loa_agent",
+        }
+
+    logger.info("Reply is not a clear hospital selection — routing to orchestrator.")
+    return {
+        "messages": [user_message],
+        "next_agent": "orchestrator_agent",
+    }
@@ -5,34 +5,14 @@ from datetime import date
 from langchain_core.messages import AIMessage
 
 from agents.state import AgentState
-from data.insurance import INSURANCE_RECORDS
-from data.insurance_claims import (
-    get_claims_for_policy,
-    calculate_used_benefits,
-    calculate_remaining_benefits
-)
+from data.policy_store import POLICY_STORE
+from data.repositories import PolicyMatch, off_loop
+from data.claims_ledger import CLAIMS_LEDGER
 from utils.llm_util import call_llm
 
 logger = logging.getLogger(__name__)
 
 
-def get_insurance_record(full_name: str) -> dict | None:
-    """
-    Mock DB lookup — finds insurance record by full name (case-insensitive).
-    In production: replace with a parameterized SQL query against your policy table.
-
-    Example SQL equivalent:
-        SELECT * FROM insurance_policies
-        WHERE LOWER(full_name) = LOWER(:full_name)
-        AND status = 'ACTIVE'
-        LIMIT 1;
-    """
-    return next(
-        (r for r in INSURANCE_RECORDS if r["full_name"].lower() == full_name.lower()),
-        None
-    )
-
-
 def check_insurance_validity(record: dict) -> tuple[bool, str]:
     """
     Checks if the insurance policy is currently valid.
@@ -48,13 +28,90 @@ def check_insurance_validity(record: dict) -> tuple[bool, str]:
     return True, "Policy is active and valid"
 
 
-async def verification_agent_node(state: AgentState) -> AgentState:
+def get_insurance_record(full_name: str, date_of_birth: str | None = None) -> tuple[PolicyMatch | None, list[PolicyMatch]]:
     """
-    Verification agent node — looks up the patient's insurance record
-    by full name and validates eligibility before routing to classification.
+    Finds the policy covering the patient, as principal or dependent, via the
+    indexed policy store. Returns (match, candidates): match is None when
+    nothing is found or when several policies remain after narrowing by date
+    of birth and by validity — candidates then lists them.
+
+    Example SQL equivalent:
+        SELECT p.* FROM members m JOIN insurance_policies p USING (policy_number)
+        WHERE m.name_key = :name_key
+        AND (m.date_of_birth = :date_of_birth OR m.date_of_birth IS NULL);
+    """
+    matches = list(POLICY_STORE.find_members(full_name, date_of_birth))
+
+    # A member whose date of birth is on file beats one listed by name only
+    if date_of_birth and any(m.date_of_birth == date_of_birth for m in matches):
+        matches = [m for m in matches if m.date_of_birth == date_of_birth]
+
+    # Only a currently valid policy is usable, so others never make it ambiguous
+    valid = [m for m in matches if check_insurance_validity(m.record)[0]]
+    if valid:
+        matches = valid
+
+    if len({m.record["policy_number"] for m in matches}) == 1:
+        return matches[0], matches
+    return None, matches
+
+
+def lookup_verification(full_name: str, date_of_birth: str | None = None) -> dict:
+    """
+    Policy record, validity and benefit usage for a patient — everything the
+    verification node reads from the DB. Returns {"record": None, "candidates": [...]}
+    if not found or ambiguous.
+    """
+    match, candidates = get_insurance_record(full_name, date_of_birth)
+    if not match:
+        return {"record": None, "candidates": candidates}
+
+    record = match.record
+    is_valid, validity_reason = check_insurance_validity(record)
+    result = {
+        "record": record,
+        "member_name": match.member_name,
+        "relation": match.relation,
+        "is_valid": is_valid,
+        "validity_reason": validity_reason,
+    }
+    if not is_valid:
+        return result
+
+    # Claims history and benefit usage within the current policy period
+    usage = CLAIMS_LEDGER.usage(
+        record["policy_number"], record["max_benefit_limit"], record["valid_from"], record["valid_until"]
+    )
+    result["claims_history"] = usage.claims
+    result["used_benefits"] = usage.used
+    result["remaining_benefits"] = usage.remaining
+    return result
+
+
+# ── Speculation (see agents/graph.py) ─────────────────────────────────────────
+# patient_name is known when the run starts, so the lookup can run while the
+# orchestrator decides whether verification is needed at all.
 
-    In production: get_insurance_record() queries a relational DB.
-    For the hackathon: returns mock data directly.
+def verification_inputs(state: AgentState) -> tuple:
+    return (state.get("patient_name", "").strip().lower(), state.get("date_of_birth"))
+
+
+def predict_verification_inputs(state: AgentState) -> dict:
+    patient_name = state.get("patient_name", "").strip()
+    inputs = (patient_name, state.get("date_of_birth"))
+    return {verification_inputs(state): inputs} if patient_name else {}
+
+
+async def speculate_verification(inputs: tuple) -> dict:
+    return await off_loop(lookup_verification, *inputs)
+
+
+async def verification_agent_node(state: AgentState, speculated: dict | None = None) -> AgentState:
+    """
+    Verification agent node — looks up the patient's insurance record
+    by full name (and date of birth, if given) and validates eligibility
+    before routing to classification. Dependents are verified against the
+    principal's policy.
     """
     logger.info("="*30)
     logger.info("Verification Agent Node")
@@ -66,7 +123,27 @@ async def verification_agent_node(state: AgentState) -> AgentState:
     logger.info("Looking up insurance record for: %s", patient_name)
 
     # ── DB Lookup (mock) ──────────────────────────────────────────────────────
-    record = get_insurance_record(patient_name)
+    # The lookup may hit the database — run it off the event loop
+    lookup = speculated or await off_loop(lookup_verification, patient_name, state.get("date_of_birth"))
+    record = lookup["record"]
+
+    if not record and lookup["candidates"]:
+        policies = sorted({m.record["policy_number"] for m in lookup["candidates"]})
+        logger.warning("Several policies match '%s': %s", patient_name, policies)
+
+        summary = (
+            f"Verification failed: {len(policies)} policies match '{patient_name}'. "
+            f"The patient's date of birth is needed to tell them apart."
+        )
+
+        return {
+            "messages": [AIMessage(content=summary, name="verification_agent")],
+            "verification_output": {
+                "verified": False,
+                "reason": f"Several policies match '{patient_name}'; date of birth required.",
+            },
+            "next_agent": "response_agent"
+        }
 
     if not record:
         logger.warning("No insurance record found for: %s", patient_name)
@@ -86,7 +163,7 @@ async def verification_agent_node(state: AgentState) -> AgentState:
         }
 
     # ── Validity Check ────────────────────────────────────────────────────────
-    is_valid, validity_reason = check_insurance_validity(record)
+    is_valid, validity_reason = lookup["is_valid"], lookup["validity_reason"]
 
     if not is_valid:
         logger.warning(
@@ -122,17 +199,12 @@ async def verification_agent_node(state: AgentState) -> AgentState:
         record["valid_until"],
     )
 
-    # ── Calculate Benefit Usage ───────────────────────────────────────────────
+    # ── Benefit Usage ─────────────────────────────────────────────────────────
     policy_number = record["policy_number"]
-    valid_from = record["valid_from"]
-    valid_until = record["valid_until"]
-    max_benefit = record["max_benefit_limit"]
-    
-    # Get claims history within the current policy period
-    claims_history = get_claims_for_policy(policy_number, valid_from, valid_until)
-    used_benefits = calculate_used_benefits(policy_number, valid_from, valid_until)
-    remaining_benefits = calculate_remaining_benefits(policy_number, max_benefit, valid_from, valid_until)
-    
+    claims_history = lookup["claims_history"]
+    used_benefits = lookup["used_benefits"]
+    remaining_benefits = lookup["remaining_benefits"]
+
     logger.info(
         "Benefit tracking for policy %s: Used: PHP %,.2f | Remaining: PHP %,.2f | Claims count: %d",
         policy_number,
@@ -147,8 +219,13 @@ async def verification_agent_node(state: AgentState) -> AgentState:
         "No query found."
     )
 
+    covered_as = (
+        f"{lookup['member_name']} (dependent of {record['full_name']})"
+        if lookup["relation"] == "DEPENDENT" else record["full_name"]
+    )
+
     summary = (
-        f"Insurance verified for {record['full_name']}. "
+        f"Insurance verified for {covered_as}. "
         f"Policy {record['policy_number']} under {record['insurance_provider']} "
         f"({record['plan_name']}) is active and valid until {record['valid_until']}. "
         f"Coverage type: {record['coverage_type']}. "
@@ -170,6 +247,8 @@ async def verification_agent_node(state: AgentState) -> AgentState:
             "policy_number": record["policy_number"],
             "full_name": record["full_name"],
             "date_of_birth": record["date_of_birth"],
+            "member_name": lookup["member_name"],
+            "relation": lookup["relation"],
             "insurance_provider": record["insurance_provider"],
             "plan_name": record["plan_name"],
             "plan_type": record["plan_type"],
@@ -12,7 +12,7 @@ Your job is to extract and classify the following information from the patient's
 5. classification_rationale — one sentence explaining why you chose this classification
 6. dispatch_required — whether an ambulance should be dispatched to the patient's location: true or false
 7. dispatch_rationale — one sentence explaining why dispatch is or is not required
-8. location — city, area, landmark, or address they provided
+8. location — city, area, landmark, or address they provided, with the barangay, city and province they named (e.g. "San Isidro, Makati"); if they later clarified it, use the clarified location
 9. insurance_provider — the name of their insurance provider, normalized to the closest match below
 
 ## Classification Guide:
@@ -97,6 +97,13 @@ When in doubt, default to true. Patient safety takes priority.
 }
 """
 
+CLASSIFICATION_AGENT_INTAKE_PROMPT = """
+The patient's app also sent these intake details. Take them as given and combine them with the conversation:
+{facts}
+- If no location was named in the conversation, use the intake location (or "device location" if only the device location is known).
+- If the preferred hospital is "none" or similar, set preferred_hospital to null.
+"""
+
 # CLASSIFICATION_AGENT_QUERY_PROMPT = """
 # Patient's Submitted Information:
 # Symptoms: {symptoms}
@@ -8,6 +8,8 @@ class VerificationOutput(TypedDict):
     policy_number: Optional[str]
     full_name: Optional[str]
     date_of_birth: Optional[str]
+    member_name: Optional[str]     # the patient; differs from full_name for dependents
+    relation: Optional[str]        # PRINCIPAL | DEPENDENT
     insurance_provider: Optional[str]
     plan_name: Optional[str]
     plan_type: Optional[str]
@@ -24,6 +26,14 @@ class VerificationOutput(TypedDict):
     claims_history: Optional[list[dict]]
 
 
+class PatientIntake(TypedDict, total=False):
+    """Intake facts the client sent with the request (see ChatRequest)."""
+    coordinates: dict           # {lat, lng, accuracy_m}
+    location: str
+    symptoms: str
+    preferred_hospital: str
+
+
 class ClassificationAgentOutput(TypedDict):
     """Output model of classification agent."""
     symptoms: str
@@ -37,6 +47,7 @@ class ClassificationAgentOutput(TypedDict):
     location: str
     insurance_provider: str
     preferred_hospital: str
+    red_flags: Optional[list[str]]
 
 
 class MatchAgentAutoSelectedOutput(TypedDict):
@@ -52,6 +63,8 @@ class MatchAgentAutoSelectedOutput(TypedDict):
     contact: str
     emergency_contact: str
     distance_km: float
+    eta_minutes: Optional[float]    # by road; None without a road graph
+    er_busy: Optional[bool]         # ER load at or above CAPACITY_BUSY_ER_LOAD; None if not reported
     capabilities: dict
     hospital_raw: dict
     no_match_reason: Optional[str]
@@ -66,6 +79,8 @@ class HospitalOption(TypedDict):
     contact: str
     emergency_contact: str
     distance_km: float
+    eta_minutes: Optional[float]
+    er_busy: Optional[bool]
 
 
 class MatchTop3Output(TypedDict):
@@ -76,6 +91,7 @@ class MatchTop3Output(TypedDict):
     preferred_hospital_fail_reason: str
     preferred_hospital_used: bool
     auto_selected: bool
+    location_clarification: dict  # {location, candidates} when the location did not resolve
 
 
 class LOAOutput(TypedDict):
@@ -99,6 +115,8 @@ class LOAOutput(TypedDict):
     contact: str
     emergency_contact: str
     distance_km: float
+    reserved_bed: Optional[str]         # "bed" / "icu_bed" held until bed_held_until; None if none held
+    bed_held_until: Optional[str]
     # Coverage
     approved_services: list[str]
     room_type: str
@@ -143,6 +161,8 @@ class ReportOutput(TypedDict):
     contact: str
     emergency_contact: str
     distance_km: float
+    reserved_bed: Optional[str]         # "bed" / "icu_bed" held until bed_held_until; None if none held
+    bed_held_until: Optional[str]
     # Coverage
     approved_services: list[str]
     room_type: str
@@ -155,12 +175,17 @@ class AgentState(TypedDict):
     """State of the Agents"""
     messages: Annotated[list, add_messages]
     patient_name: str
+    date_of_birth: Optional[str]
+    intake: PatientIntake
     next_agent: str
     # Agent outputs
     verification_output: VerificationOutput
     classification_agent_output: ClassificationAgentOutput
+    triage_priority: int
     selected_loa_services: list[str]
+    rematch: bool             # set by loa_agent after a bed refusal; match_agent keeps selected_loa_services
     match_agent_output: MatchAgentAutoSelectedOutput | MatchTop3Output
     chosen_hospital: Optional[str]
     loa_output: LOAOutput
-    report_output: ReportOutput
\ No newline at end of file
+    report_output: ReportOutput
+    reference_version: int    # reference data version the run is pinned to
\ No newline at end of file
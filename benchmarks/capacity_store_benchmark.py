@@ -0,0 +1,97 @@
+"""
+Benchmark: the sharded, lock-free-read CapacityStore under a simulated feed
+vs. a single dict behind one lock.
+
+5k hospitals. First the apply rate of simulator updates in batches of 50
+alone; then writer threads apply updates as fast as they can while reader
+threads do what matching does per patient: look up the capacity status of
+12 candidate hospitals. Reports updates per second, reads per second and
+read latency with both running, for both stores. Run from the repo root:
+
+    python -m benchmarks.capacity_store_benchmark
+"""
+import random
+import threading
+import time
+
+from data.capacity import CapacityStore, HospitalStatus
+from data.capacity_simulator import CapacitySimulator
+
+
+class _LockedStore:
+    """The baseline: one dict, one lock for readers and writers alike."""
+
+    def __init__(self):
+        self._statuses: dict[str, HospitalStatus] = {}
+        self._lock = threading.Lock()
+
+    def update(self, updates: list[dict]) -> int:
+        with self._lock:
+            for update in updates:
+                status = HospitalStatus.from_update(update)
+                held = self._statuses.get(status.hospital_id)
+                if held is None or status.reported_at >= held.reported_at:
+                    self._statuses[status.hospital_id] = status
+        return len(updates)
+
+    def get(self, hospital_id: str) -> HospitalStatus | None:
+        with self._lock:
+            return self._statuses.get(hospital_id)
+
+
+def _pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+
+def run(hospitals: int = 5_000, writers: int = 2, readers: int = 4, seconds: float = 5.0, batch: int = 50) -> None:
+    ids = [f"H{i:05d}" for i in range(hospitals)]
+    batches = [CapacitySimulator(ids, seed=w).updates(batch * 400) for w in range(writers)]
+
+    for name, store in (("single lock", _LockedStore()), ("sharded", CapacityStore(shards=64))):
+        started = time.perf_counter()
+        for i in range(0, len(batches[0]), batch):
+            store.update(batches[0][i:i + batch])
+        print(f"{name:<12} alone: {len(batches[0]) / (time.perf_counter() - started):>9,.0f} updates/s")
+
+    for name, store in (("single lock", _LockedStore()), ("sharded", CapacityStore(shards=64))):
+        stop = threading.Event()
+        applied = [0] * writers
+        latencies: list[list[float]] = [[] for _ in range(readers)]
+
+        def write(w: int) -> None:
+            updates = batches[w]
+            i = 0
+            while not stop.is_set():
+                store.update(updates[i:i + batch])
+                applied[w] += batch
+                i = (i + batch) % len(updates)
+
+        def read(r: int) -> None:
+            rng = random.Random(r)
+            while not stop.is_set():
+                candidates = rng.sample(ids, 12)
+                started = time.perf_counter()
+                for hospital_id in candidates:
+                    store.get(hospital_id)
+                latencies[r].append(time.perf_counter() - started)
+
+        threads = [threading.Thread(target=write, args=(w,)) for w in range(writers)]
+        threads += [threading.Thread(target=read, args=(r,)) for r in range(readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        reads = [x for per_reader in latencies for x in per_reader]
+        print(
+            f"{name:<12} with readers: {sum(applied) / seconds:>9,.0f} updates/s   "
+            f"12-hospital read p50={_pct(reads, 0.5):6.3f} ms p99={_pct(reads, 0.99):6.3f} ms "
+            f"p99.9={_pct(reads, 0.999):6.3f} ms ({len(reads) / seconds:,.0f} reads/s)"
+        )
+
+
+if __name__ == "__main__":
+    run()
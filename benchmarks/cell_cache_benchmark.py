@@ -0,0 +1,117 @@
+"""
+Benchmark: nearest eligible hospitals from the per-cell shortlist cache vs.
+the SpatialIndex search with an eligibility predicate.
+
+A synthetic registry of 5k hospitals, 60% of them in and around Metro Manila,
+each accepting some insurers and supporting some emergency types. Patients
+are drawn mostly from Metro Manila, each with a random insurer and emergency
+type. The cache is first warmed with the cells holding the most hospitals,
+as match_agent does per reference data version. Reports the warm-up time,
+the latency of the uncached search, of a cache miss (building the cell's
+shortlist) and of a cache hit (ranking the shortlist by exact distance), the
+hit rate over the run, and checks every cached result against the uncached
+one.
+
+Run from the repo root:
+
+    python -m benchmarks.cell_cache_benchmark
+"""
+import random
+import statistics
+import time
+
+from collections import Counter
+
+import numpy as np
+
+from utils.cache_util import LRUCache
+from utils.geo_util import CellShortlists, CoordinateArray, SpatialIndex
+
+INSURERS = ["GlobalCare", "AIA Philippines Life", "Insular Life Assurance Company", "Maxicare", "Intellicare"]
+EMERGENCY_TYPES = ["CARDIAC", "TRAUMA", "NEUROLOGICAL", "RESPIRATORY", "BURNS", "GENERAL"]
+METRO_MANILA = ((14.40, 14.78), (120.95, 121.13))
+
+
+def _point(rng: random.Random, urban: float) -> tuple[float, float]:
+    if rng.random() < urban:
+        return rng.uniform(*METRO_MANILA[0]), rng.uniform(*METRO_MANILA[1])
+    return rng.uniform(5.0, 19.0), rng.uniform(117.0, 127.0)
+
+
+def _hospitals(n: int, rng: random.Random) -> list[dict]:
+    hospitals = []
+    for i in range(n):
+        lat, lng = _point(rng, 0.6)
+        hospitals.append({
+            "id": f"H{i:04d}",
+            "lat": lat,
+            "lng": lng,
+            "insurance_accepted": set(rng.sample(INSURERS, rng.randint(1, 3))),
+            "emergency_types_supported": set(rng.sample(EMERGENCY_TYPES, rng.randint(1, 4))),
+        })
+    return hospitals
+
+
+def _ms(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+
+def run(hospitals: int = 5_000, queries: int = 20_000, k: int = 3, warm_cells: int = 512, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    registry = _hospitals(hospitals, rng)
+    spatial = SpatialIndex(registry)
+    coords = CoordinateArray(registry)
+    cells = CellShortlists(coords, cell_deg=0.01, size=12)
+    cache = LRUCache(50_000)
+
+    masks = {
+        (insurer, emergency_type): np.array([
+            insurer in h["insurance_accepted"] and emergency_type in h["emergency_types_supported"]
+            for h in registry
+        ])
+        for insurer in INSURERS
+        for emergency_type in EMERGENCY_TYPES
+    }
+
+    started = time.perf_counter()
+    dense = [cell for cell, _ in Counter(cells.cell_of(h["lat"], h["lng"]) for h in registry).most_common(warm_cells)]
+    for (insurer, emergency_type), mask in masks.items():
+        for cell, shortlist in zip(dense, cells.shortlists(dense, mask)):
+            cache.put((cell, insurer, emergency_type), shortlist)
+    print(f"warm-up: {len(cache):,} entries ({len(dense)} cells) in {time.perf_counter() - started:.1f} s")
+
+    uncached, misses, hits, errors = [], [], [], 0
+    for _ in range(queries):
+        lat, lng = _point(rng, 0.9)
+        insurer, emergency_type = rng.choice(INSURERS), rng.choice(EMERGENCY_TYPES)
+
+        started = time.perf_counter()
+        expected = spatial.nearest(
+            lat, lng, k,
+            lambda h: insurer in h["insurance_accepted"] and emergency_type in h["emergency_types_supported"],
+        )
+        uncached.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        key = (cells.cell_of(lat, lng), insurer, emergency_type)
+        shortlist = cache.get(key)
+        hit = shortlist is not None
+        if not hit:
+            shortlist = cells.shortlists([key[0]], masks[(insurer, emergency_type)])[0]
+            cache.put(key, shortlist)
+        ranked = cells.nearest(shortlist, lat, lng, k)
+        (hits if hit else misses).append(time.perf_counter() - started)
+
+        errors += [h["id"] for _, h in ranked] != [h["id"] for _, h in expected]
+
+    sizes = [len(s.positions) for s in (cache.get(key) for key in cache.keys())]
+    print(f"{hospitals:,} hospitals, {queries:,} queries, top {k}; shortlist of {statistics.mean(sizes):.1f} hospitals on average")
+    print(f"uncached search  p50={_ms(uncached, 0.5):6.3f} ms  p99={_ms(uncached, 0.99):6.3f} ms")
+    print(f"cache miss       p50={_ms(misses, 0.5):6.3f} ms  p99={_ms(misses, 0.99):6.3f} ms  ({len(misses):,})")
+    print(f"cache hit        p50={_ms(hits, 0.5):6.3f} ms  p99={_ms(hits, 0.99):6.3f} ms  ({len(hits):,})")
+    print(f"hit rate {len(hits) / queries:.0%}, mean {statistics.mean(hits + misses) * 1000:.3f} ms vs. {statistics.mean(uncached) * 1000:.3f} ms uncached; differs from uncached: {errors}")
+
+
+if __name__ == "__main__":
+    run()
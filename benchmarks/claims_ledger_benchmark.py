@@ -0,0 +1,77 @@
+"""
+Benchmark: ClaimsLedger window usage vs. scanning the claims list.
+
+1M synthetic claims over 100k policies. Times a full used/remaining
+lookup both ways, plus incremental ingest of new claims. Run from the
+repo root:
+
+    python -m benchmarks.claims_ledger_benchmark
+"""
+import random
+import time
+
+from datetime import date
+
+from data.claims_ledger import ClaimsLedger
+
+
+def _claims(count: int, policies: int, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "policy_number": f"POL-{rng.randrange(policies):06d}",
+            "claim_id": f"CLM-{i:08d}",
+            "claim_date": f"{rng.randint(2024, 2026)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "claim_amount": round(rng.uniform(500, 200_000), 2),
+            "status": "APPROVED" if rng.random() < 0.9 else "DENIED",
+        }
+        for i in range(count)
+    ]
+
+
+def _scan_used(claims: list[dict], policy_number: str, valid_from: str, valid_until: str) -> float:
+    """The pre-ledger approach: every claim, every date re-parsed."""
+    from_date, until_date = date.fromisoformat(valid_from), date.fromisoformat(valid_until)
+    return sum(
+        c["claim_amount"] for c in claims
+        if c["policy_number"] == policy_number and c["status"] == "APPROVED"
+        and from_date <= date.fromisoformat(c["claim_date"]) <= until_date
+    )
+
+
+def run(count: int = 1_000_000, policies: int = 100_000) -> None:
+    rng = random.Random(9)
+    claims = _claims(count, policies, rng)
+
+    started = time.perf_counter()
+    ledger = ClaimsLedger(claims)
+    build_s = time.perf_counter() - started
+
+    window = ("2025-03-01", "2026-03-01")
+    sample = [f"POL-{rng.randrange(policies):06d}" for _ in range(10_000)]
+
+    started = time.perf_counter()
+    for policy_number in sample:
+        ledger.usage(policy_number, 500_000, *window)
+    ledger_us = (time.perf_counter() - started) * 1e6 / len(sample)
+
+    started = time.perf_counter()
+    for policy_number in sample[:3]:
+        expected = _scan_used(claims, policy_number, *window)
+        assert abs(expected - ledger.used(policy_number, *window)) < 0.01
+    scan_ms = (time.perf_counter() - started) * 1000 / 3
+
+    new_claims = _claims(100_000, policies, rng)
+    for i, claim in enumerate(new_claims):
+        claim["claim_id"] = f"NEW-{i:08d}"
+    started = time.perf_counter()
+    for claim in new_claims:
+        ledger.ingest([claim])
+    ingest_us = (time.perf_counter() - started) * 1e6 / len(new_claims)
+
+    print(f"{count:,} claims / {policies:,} policies  build={build_s:.1f} s")
+    print(f"usage: ledger={ledger_us:.1f} µs  scan={scan_ms:.0f} ms  ({scan_ms * 1000 / ledger_us:,.0f}x)")
+    print(f"ingest (one claim at a time, random dates): {ingest_us:.1f} µs/claim")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,98 @@
+"""
+Benchmark: concurrent least-loaded doctor assignment on a synthetic roster.
+
+500 hospitals x 6 specializations x 8 doctors (24k doctors) on day, night
+and 24h shifts. Worker threads issue LOAs for random hospitals and
+specializations at a fixed time. Afterwards the recorded cases are
+checked: none lost, every doctor assigned was on duty, and within each
+(hospital, specialization) the on-duty loads differ by at most one. Run
+from the repo root:
+
+    python -m benchmarks.doctor_assignment_benchmark
+"""
+import random
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from data.doctor_registry import DoctorRegistry, ROSTER_TZ
+
+SPECIALIZATIONS = ["CARDIAC", "NEUROLOGICAL", "TRAUMA", "RESPIRATORY", "OBSTETRIC", "GENERAL"]
+DAYS = ["MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"]
+SHIFTS = {
+    "day": [{"day": day, "start": "07:00", "end": "19:00"} for day in DAYS],
+    "night": [{"day": day, "start": "19:00", "end": "07:00"} for day in DAYS],
+    "office": [{"day": day, "start": "08:00", "end": "17:00"} for day in DAYS[:5]],
+}
+AT = datetime(2026, 1, 14, 10, 30, tzinfo=ROSTER_TZ)  # a Wednesday morning
+
+
+def _roster(hospitals: int, per_specialization: int, rng: random.Random) -> list[dict]:
+    doctors = []
+    for h in range(hospitals):
+        for specialization in SPECIALIZATIONS:
+            for _ in range(per_specialization):
+                kind = rng.choice(["24h", "day", "night", "office"])
+                doctors.append({
+                    "id": f"D{len(doctors):06d}",
+                    "hospital_id": f"H{h:04d}",
+                    "name": f"Dr. {len(doctors)}",
+                    "specialization": specialization,
+                    "available_24h": kind == "24h",
+                    **({} if kind == "24h" else {"shifts": SHIFTS[kind]}),
+                })
+    return doctors
+
+
+def run(hospitals: int = 500, per_specialization: int = 8, workers: int = 16, loas: int = 100_000) -> None:
+    rng = random.Random(11)
+    started = time.perf_counter()
+    registry = DoctorRegistry(_roster(hospitals, per_specialization, rng))
+    build_ms = (time.perf_counter() - started) * 1000
+
+    requests = [
+        (f"H{rng.randrange(hospitals):04d}", rng.choice(SPECIALIZATIONS), f"LOA-{i}")
+        for i in range(loas)
+    ]
+    until = time.time() + 3600
+
+    started = time.perf_counter()
+    for hospital_id, specialization, _ in requests[:10_000]:
+        registry.on_duty(hospital_id, specialization, at=AT)
+    on_duty_us = (time.perf_counter() - started) * 1e6 / 10_000
+
+    def issue(chunk):
+        return [registry.assign(h, s, case_id=c, until=until, at=AT)["id"] for h, s, c in chunk]
+
+    chunks = [requests[i::workers] for i in range(workers)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        assigned = [doctor_id for chunk in pool.map(issue, chunks) for doctor_id in chunk]
+    elapsed = time.perf_counter() - started
+
+    # ── Verify ────────────────────────────────────────────────────────────────
+    assert sum(registry.load(d["id"]) for d in registry) == loas, "lost case updates"
+    spread = 0
+    for h in range(hospitals):
+        for specialization in SPECIALIZATIONS:
+            on_duty = registry.on_duty(f"H{h:04d}", specialization, AT)
+            loads = [registry.load(d["id"]) for d in on_duty]
+            if loads:
+                spread = max(spread, max(loads) - min(loads))
+    on_duty_ids = {
+        d["id"] for h in range(hospitals) for s in SPECIALIZATIONS
+        for d in registry.on_duty(f"H{h:04d}", s, AT)
+    }
+    off_duty = sum(1 for doctor_id in assigned if doctor_id not in on_duty_ids)
+
+    print(
+        f"doctors={len(registry):,}  build={build_ms:.0f} ms  on_duty={on_duty_us:.1f} µs/query\n"
+        f"{loas:,} LOAs on {workers} threads: {loas / elapsed:,.0f} assignments/s  "
+        f"max load spread={spread}  off-duty assignments={off_duty}"
+    )
+    assert spread <= 1 and off_duty == 0
+
+
+if __name__ == "__main__":
+    run()
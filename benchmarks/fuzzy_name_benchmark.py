@@ -0,0 +1,65 @@
+"""
+Benchmark: TrigramIndex fuzzy name lookup at 10k and 100k hospitals.
+
+Synthetic names are built from a place + a facility kind ("... Medical
+Center", "... General Hospital"), so common trigrams have very long posting
+lists, and the random letters make the rest close to uniformly common — a
+worst case for IDF weighting. Queries are misspelled copies of indexed names,
+searched at the auto-accept threshold. A sample is checked against scoring
+every name. Run from the repo root:
+
+    python -m benchmarks.fuzzy_name_benchmark
+"""
+import random
+import string
+import time
+
+from utils.fuzzy_util import TrigramIndex
+
+KINDS = ["Medical Center", "General Hospital", "Hospital", "Doctors Hospital", "Specialty Center", "Infirmary"]
+MIN_SCORE = 0.65  # data.hospital_registry.NAME_MATCH_THRESHOLD
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9))).capitalize()
+
+
+def _misspell(name: str, rng: random.Random) -> str:
+    chars = list(name)
+    i = rng.randrange(len(chars))
+    chars[i] = rng.choice(string.ascii_lowercase)
+    return "".join(chars)
+
+
+def _brute_force(index: TrigramIndex, query: str) -> float:
+    """Best score with every indexed text as a candidate (no prefix filtering)."""
+    return max(m.score for m in index.search(query, min_score=1e-9, limit=1))
+
+
+def run(n: int, queries: int = 1000, seed: int = 5) -> None:
+    rng = random.Random(seed)
+    places = [_word(rng) for _ in range(n // 4)]
+    names = [f"{rng.choice(places)} {_word(rng)} {rng.choice(KINDS)}" for _ in range(n)]
+
+    started = time.perf_counter()
+    index = TrigramIndex()
+    for name in names:
+        index.add(name, {"name": name})
+    index.search(names[0])  # first search computes the per-text weights
+    build_ms = (time.perf_counter() - started) * 1000
+
+    sample = [_misspell(rng.choice(names), rng) for _ in range(queries)]
+
+    started = time.perf_counter()
+    results = [index.search(q, min_score=MIN_SCORE, limit=3) for q in sample]
+    query_ms = (time.perf_counter() - started) * 1000 / queries
+
+    for q, found in list(zip(sample, results))[:5]:
+        assert round(found[0].score, 9) == round(_brute_force(index, q), 9), "index disagrees with brute force"
+
+    print(f"n={n:>7,}  build={build_ms:8.1f} ms  search={query_ms:6.3f} ms/query")
+
+
+if __name__ == "__main__":
+    for size in (10_000, 100_000):
+        run(size)
@@ -0,0 +1,110 @@
+"""
+Benchmark: geocoding free text against a PSGC-sized gazetteer.
+
+A synthetic gazetteer shaped like the full Philippine one — 17 regions,
+~80 provinces, ~1.6k cities/municipalities and ~42k barangays, with
+barangay names drawn from a small pool so homonyms are as common as in the
+real data ("San Isidro", "Poblacion", ...). Times the automaton build, then
+geocodes short location fields and whole chat messages, against a scan
+that checks every name in turn (how the old location map worked). Queries
+left unresolved are almost all genuinely ambiguous: the barangay name
+repeats within its town, or the town name repeats.
+
+Run from the repo root:
+
+    python -m benchmarks.gazetteer_benchmark
+"""
+import random
+import statistics
+import time
+
+from data.gazetteer import Gazetteer
+from utils.aho_corasick_util import normalize_text
+
+SAINTS = ["San Isidro", "San Jose", "San Antonio", "Santa Cruz", "San Roque", "Santo Niño", "San Vicente", "Santa Maria"]
+WORDS = ["Poblacion", "Bagong Silang", "Maligaya", "Malinis", "Bagumbayan", "Mabini", "Rizal", "Del Pilar"]
+
+FILLER = (
+    "my father suddenly has chest pain and is sweating a lot, he is 67 and has high blood pressure. "
+    "we are at home right now near the church, please help us find the nearest hospital that takes our card"
+)
+
+
+def _name(rng: random.Random) -> str:
+    return "".join(rng.choice("bdgklmnprst") + rng.choice("aeiou") for _ in range(rng.randint(2, 4))).title()
+
+
+def _gazetteer(rng: random.Random) -> list[dict]:
+    places = []
+
+    def add(level: str, name: str, parent: dict | None, spread: float) -> dict:
+        lat, lng = (parent["lat"], parent["lng"]) if parent else (12.0, 122.0)
+        place = {
+            "id": f"P{len(places):06d}", "name": name, "level": level,
+            "lat": lat + rng.uniform(-spread, spread), "lng": lng + rng.uniform(-spread, spread),
+            "population": rng.randint(1_000, 200_000),
+        }
+        if parent:
+            place["parent"] = parent["id"]
+        places.append(place)
+        return place
+
+    for _ in range(17):
+        region = add("region", f"{_name(rng)} Region", None, 6.0)
+        for _ in range(5):
+            province = add("province", _name(rng), region, 1.0)
+            for _ in range(20):
+                town = add(rng.choice(["city", "municipality"]), _name(rng), province, 0.5)
+                for _ in range(26):
+                    pool = SAINTS if rng.random() < 0.3 else WORDS if rng.random() < 0.2 else None
+                    add("barangay", rng.choice(pool) if pool else _name(rng), town, 0.05)
+    return places
+
+
+def _time_us(fn, queries: list[str]) -> tuple[float, float]:
+    latencies = []
+    for text in queries:
+        started = time.perf_counter()
+        fn(text)
+        latencies.append((time.perf_counter() - started) * 1e6)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99)]
+
+
+def run(queries: int = 2_000) -> None:
+    rng = random.Random(11)
+    places = _gazetteer(rng)
+    by_id = {p["id"]: p for p in places}
+
+    started = time.perf_counter()
+    gazetteer = Gazetteer(places)
+    build_s = time.perf_counter() - started
+
+    barangays = [p for p in places if p["level"] == "barangay"]
+    short, long = [], []
+    for place in rng.sample(barangays, queries):
+        town = by_id[place["parent"]]
+        location = f"Brgy. {place['name']}, {town['name']}"
+        short.append(location)
+        long.append(f"{FILLER}, we are in {location}. {FILLER}")
+
+    resolved = sum(gazetteer.geocode(text).resolved for text in short)
+    print(f"{len(places):,} places: build {build_s:.1f} s, {resolved / queries:.0%} of '<barangay>, <town>' resolved")
+
+    names = sorted({normalize_text(p["name"]) for p in places}, key=len, reverse=True)
+
+    def scan(text: str) -> list[str]:
+        text = f" {normalize_text(text)} "
+        return [n for n in names if f" {n} " in text]
+
+    for label, texts in (("location field", short), ("whole message", long)):
+        automaton = _time_us(gazetteer.geocode, texts)
+        naive = _time_us(scan, texts[:200])
+        print(
+            f"{label:<15} ~{statistics.mean(map(len, texts)):4.0f} chars  automaton p50={automaton[0]:6.1f} µs "
+            f"p99={automaton[1]:6.1f} µs   name scan p50={naive[0] / 1000:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,112 @@
+"""
+Benchmark: what a remote geocoding provider costs per match, with and without
+the Geocoder front (cache, coalescing, bounded concurrency, batching).
+
+Runs the local stand-in provider (data/geocode_standin.py) with a fixed
+per-request latency. 60 concurrent sessions look up locations drawn from a
+skewed distribution over the gazetteer's places — popular areas repeat, in
+varying spelling and case — first straight against the provider, then
+through the Geocoder. Also compares geocoding every distinct place one by
+one vs. in one geocode_many() call, and the cost of a lookup during a
+provider outage.
+
+Run from the repo root:
+
+    python -m benchmarks.geocoder_benchmark
+"""
+import asyncio
+import random
+import statistics
+import time
+
+from data.gazetteer import GAZETTEER
+from data.geocode_standin import start_standin
+from data.geocoder import Geocoder, HttpGeocodingProvider
+from utils.aho_corasick_util import normalize_text
+
+
+def _queries(n: int, rng: random.Random) -> list[str]:
+    labels = [GAZETTEER.label(p) for p in GAZETTEER.places if p["level"] not in ("region", "province")]
+    weights = [1 / (rank + 1) for rank in range(len(labels))]  # Zipf-like popularity
+    picks = rng.choices(labels, weights, k=n)
+    return [rng.choice([q, q.lower(), q.upper(), q.replace(",", "")]) for q in picks]
+
+
+def _summary(name: str, latencies: list[float], wall: float, requests: int) -> None:
+    latencies = sorted(latencies)
+    print(
+        f"{name:<22} wall={wall:6.2f} s  provider requests={requests:4d}  "
+        f"p50={statistics.median(latencies):7.1f} ms  p99={latencies[int(len(latencies) * 0.99)]:7.1f} ms"
+    )
+
+
+async def _sessions(lookup, queries: list[str], sessions: int) -> tuple[list[float], float]:
+    latencies = []
+
+    async def session(chunk: list[str]) -> None:
+        for query in chunk:
+            started = time.perf_counter()
+            await lookup(query)
+            latencies.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(session(queries[i::sessions]) for i in range(sessions)))
+    return latencies, time.perf_counter() - started
+
+
+async def _run(lookups: int, sessions: int, latency_ms: float) -> None:
+    rng = random.Random(4)
+    queries = _queries(lookups, rng)
+    server, url = start_standin(latency_ms=latency_ms)
+    distinct = len({normalize_text(q) for q in queries})
+    print(f"stand-in provider latency {latency_ms:.0f} ms, {lookups} lookups ({distinct} distinct places) by {sessions} sessions")
+
+    provider = HttpGeocodingProvider(url, timeout_seconds=30)
+    latencies, wall = await _sessions(lambda q: provider.geocode_many([q]), queries, sessions)
+    _summary("provider direct", latencies, wall, server.requests)
+    await provider.aclose()
+
+    server.requests = 0
+    geocoder = Geocoder(GAZETTEER, HttpGeocodingProvider(url), timeout_seconds=30)
+    latencies, wall = await _sessions(geocoder.geocode, queries, sessions)
+    _summary("Geocoder", latencies, wall, server.requests)
+    print(f"{'':<22} {geocoder.stats()['coalesced']} coalesced, cache hit rate {geocoder.stats()['cache']['hit_rate']:.0%}")
+    await geocoder.aclose()
+
+    # Batch: every distinct place, cold cache
+    addresses = list({normalize_text(q): q for q in _queries(5_000, rng)}.values())
+    for name, batched in ((f"{len(addresses)} one by one", False), (f"{len(addresses)} geocode_many", True)):
+        server.requests = 0
+        geocoder = Geocoder(GAZETTEER, HttpGeocodingProvider(url), timeout_seconds=30)
+        started = time.perf_counter()
+        if batched:
+            await geocoder.geocode_many(addresses)
+        else:
+            for address in addresses:
+                await geocoder.geocode(address)
+        print(f"{name:<22} wall={time.perf_counter() - started:6.2f} s  provider requests={server.requests:4d}")
+        await geocoder.aclose()
+
+    # Outage: every request fails
+    server.fail_rate = 1.0
+    geocoder = Geocoder(GAZETTEER, HttpGeocodingProvider(url), timeout_seconds=30)
+    timings = []
+    for address in addresses[:50]:
+        started = time.perf_counter()
+        await geocoder.geocode(address)
+        timings.append((time.perf_counter() - started) * 1000)
+    print(
+        f"{'provider down':<22} first lookup={timings[0]:6.1f} ms, then p50={statistics.median(timings[1:]):.3f} ms "
+        f"(gazetteer while backing off)"
+    )
+    await geocoder.aclose()
+    server.shutdown()
+
+
+def run(lookups: int = 600, sessions: int = 60, latency_ms: float = 80.0) -> None:
+    asyncio.run(_run(lookups, sessions, latency_ms))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,191 @@
+"""
+Benchmark: mass-casualty assignment — patients matched one by one vs.
+assigned together by min-cost flow within the beds free.
+
+A synthetic registry of 200 hospitals in Metro Manila, each accepting some
+insurers, supporting some emergency types and reporting 0-12 free beds and
+0-4 free ICU beds. 500 patients (20% critical, needing an ICU bed) from
+three incident sites, each with a random insurer. Compares, by straight-line
+distance:
+
+- independent: each patient gets the nearest hospital that would take them,
+  as a single match does — all from the same capacity report;
+- first come: the same, one after the other, each taking a bed from the count;
+- min-cost flow: the patients alike for the purpose grouped into rows as
+  services/mass_casualty_service.py does, each row's 20 nearest eligible
+  hospitals as candidates (widened when short, up to 80), solved together.
+
+Reports patients placed, beds over-committed, severity-weighted km, mean km
+for critical patients and, for the flow, the time to build and solve. Then
+500 patients scattered over the city, one row each, and the same again with
+beds scarce (0-1 free per hospital, ICU beds rarer, about 120 in all): most
+rows cannot be placed, the case that decides the solve time. Run from the
+repo root:
+
+    python -m benchmarks.mass_casualty_benchmark
+"""
+import random
+import time
+
+import numpy as np
+
+from collections import Counter
+
+from utils.assignment_util import min_cost_transport
+from utils.geo_util import CoordinateArray, haversine_distances
+
+INSURERS = ["GlobalCare", "AIA Philippines Life", "Insular Life Assurance Company", "Maxicare", "Intellicare"]
+EMERGENCY_TYPES = ["CARDIAC", "TRAUMA", "NEUROLOGICAL", "RESPIRATORY", "BURNS", "GENERAL"]
+METRO_MANILA = ((14.40, 14.78), (120.95, 121.13))
+SEVERITY_WEIGHT = {"CRITICAL": 4.0, "URGENT": 2.0, "MODERATE": 1.0}
+SITE_DEG = 0.005
+
+
+def _hospitals(n: int, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "id": f"H{i:03d}",
+            "lat": rng.uniform(*METRO_MANILA[0]),
+            "lng": rng.uniform(*METRO_MANILA[1]),
+            "insurance_accepted": set(rng.sample(INSURERS, rng.randint(2, 4))),
+            "emergency_types_supported": set(rng.sample(EMERGENCY_TYPES, rng.randint(2, 5))) | {"TRAUMA"},
+            "free": {"bed": rng.randint(0, 12), "icu_bed": rng.randint(0, 4)},
+        }
+        for i in range(n)
+    ]
+
+
+def _patients(n: int, rng: random.Random, sites: list[tuple[float, float]] | None) -> list[dict]:
+    patients = []
+    for i in range(n):
+        if sites:
+            lat, lng = rng.choice(sites)
+            lat, lng = lat + rng.uniform(-0.002, 0.002), lng + rng.uniform(-0.002, 0.002)
+        else:
+            lat, lng = rng.uniform(*METRO_MANILA[0]), rng.uniform(*METRO_MANILA[1])
+        severity = rng.choices(list(SEVERITY_WEIGHT), weights=[2, 4, 4])[0]
+        patients.append({
+            "id": f"T{i:03d}", "lat": lat, "lng": lng, "severity": severity,
+            "insurer": rng.choice(INSURERS), "type": rng.choice(["TRAUMA", "TRAUMA", "BURNS"]),
+            "resource": "icu_bed" if severity == "CRITICAL" else "bed",
+        })
+    return patients
+
+
+def _eligible(hospitals: list[dict], patient: dict) -> np.ndarray:
+    return np.array([
+        patient["insurer"] in h["insurance_accepted"] and patient["type"] in h["emergency_types_supported"]
+        and h["free"][patient["resource"]] > 0
+        for h in hospitals
+    ])
+
+
+def _one_by_one(hospitals, coords, patients, count_beds: bool) -> dict[str, tuple[int, float]]:
+    """Nearest hospital that would take each patient; with count_beds, beds taken are counted down."""
+    free = {(h["id"], r): n for h in hospitals for r, n in h["free"].items()}
+    placed = {}
+    for p in patients:
+        eligible = _eligible(hospitals, p)
+        if count_beds:
+            eligible &= np.array([free[(h["id"], p["resource"])] > 0 for h in hospitals])
+        nearest = coords.nearest_items(p["lat"], p["lng"], 1, eligible)
+        if nearest:
+            distance_km, h = nearest[0]
+            free[(h["id"], p["resource"])] -= 1
+            placed[p["id"]] = (hospitals.index(h), distance_km)
+    return placed
+
+
+def _flow(hospitals, coords, patients, candidates: int = 20, max_candidates: int = 80) -> dict[str, tuple[int, float]]:
+    groups: dict[tuple, list[dict]] = {}
+    for p in patients:
+        key = (round(p["lat"] / SITE_DEG), round(p["lng"] / SITE_DEG), p["insurer"], p["type"], p["resource"], p["severity"])
+        groups.setdefault(key, []).append(p)
+    keys = sorted(groups, key=lambda key: -SEVERITY_WEIGHT[key[-1]])
+    eligible = {key: _eligible(hospitals, groups[key][0]) for key in keys}
+
+    k = {key: candidates for key in keys}
+    nearest: dict[tuple, list[tuple[float, dict]]] = {}
+    widen = keys
+    while True:
+        for key in widen:
+            nearest[key] = coords.nearest_items(groups[key][0]["lat"], groups[key][0]["lng"], k[key], eligible[key])
+        columns: dict[tuple[str, str], int] = {}
+        for key in keys:
+            for _, h in nearest[key]:
+                columns.setdefault((h["id"], key[4]), len(columns))
+        costs = np.full((len(keys), len(columns)), np.inf)
+        for row, key in enumerate(keys):
+            for distance_km, h in nearest[key]:
+                costs[row, columns[(h["id"], key[4])]] = SEVERITY_WEIGHT[key[-1]] * distance_km
+        supply = np.array([len(groups[key]) for key in keys])
+        by_id = {h["id"]: h for h in hospitals}
+        capacity = np.array([by_id[hospital_id]["free"][resource] for hospital_id, resource in columns])
+        flow = min_cost_transport(costs, supply, capacity)
+        widen = [
+            key for row, key in enumerate(keys)
+            if flow[row].sum() < supply[row] and len(nearest[key]) == k[key] < max_candidates
+        ]
+        if not widen:
+            break
+        for key in widen:
+            k[key] = min(2 * k[key], max_candidates)
+
+    index = {h["id"]: i for i, h in enumerate(hospitals)}
+    column_keys = list(columns)
+    placed = {}
+    for row, key in enumerate(keys):
+        unplaced = iter(groups[key])
+        for column in flow[row].nonzero()[0]:
+            hospital_id, _ = column_keys[column]
+            for _ in range(flow[row, column]):
+                p = next(unplaced)
+                h = hospitals[index[hospital_id]]
+                placed[p["id"]] = (index[hospital_id], float(haversine_distances(p["lat"], p["lng"], h["lat"], h["lng"])))
+    return placed
+
+
+def _report(name: str, hospitals, patients, placed: dict[str, tuple[int, float]], ms: float | None = None) -> None:
+    taken = Counter((placed[p["id"]][0], p["resource"]) for p in patients if p["id"] in placed)
+    over = sum(max(0, n - hospitals[i]["free"][resource]) for (i, resource), n in taken.items())
+    weighted = sum(SEVERITY_WEIGHT[p["severity"]] * placed[p["id"]][1] for p in patients if p["id"] in placed)
+    critical = [placed[p["id"]][1] for p in patients if p["severity"] == "CRITICAL" and p["id"] in placed]
+    print(
+        f"  {name:<14} placed {len(placed):>3}/{len(patients)}, beds over-committed {over:>3}, "
+        f"weighted km {weighted:>7,.0f}, critical mean {np.mean(critical) if critical else 0:5.2f} km"
+        + (f", {ms:6.1f} ms" if ms is not None else "")
+    )
+
+
+def run(hospitals: int = 200, patients: int = 500, seed: int = 11) -> None:
+    rng = random.Random(seed)
+    registry = _hospitals(hospitals, rng)
+    coords = CoordinateArray(registry)
+    print(
+        f"{hospitals} hospitals, {sum(h['free']['bed'] for h in registry)} beds and "
+        f"{sum(h['free']['icu_bed'] for h in registry)} ICU beds free"
+    )
+
+    scarce = [{**h, "free": {"bed": rng.randint(0, 1), "icu_bed": int(rng.random() < 0.1)}} for h in registry]
+    scarce_coords = CoordinateArray(scarce)
+
+    sites = [(rng.uniform(14.50, 14.65), rng.uniform(121.00, 121.08)) for _ in range(3)]
+    scattered = _patients(patients, rng, None)
+    for label, hs, hs_coords, batch in (
+        ("3 incident sites", registry, coords, _patients(patients, rng, sites)),
+        ("scattered", registry, coords, scattered),
+        (
+            f"scattered, {sum(h['free']['bed'] + h['free']['icu_bed'] for h in scarce)} beds free in all",
+            scarce, scarce_coords, scattered,
+        ),
+    ):
+        print(f"{patients} patients, {label}:")
+        _report("independent", hs, batch, _one_by_one(hs, hs_coords, batch, count_beds=False))
+        _report("first come", hs, batch, _one_by_one(hs, hs_coords, batch, count_beds=True))
+        started = time.perf_counter()
+        placed = _flow(hs, hs_coords, batch)
+        _report("min-cost flow", hs, batch, placed, (time.perf_counter() - started) * 1000)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,76 @@
+"""
+Benchmark: PolicyStore member lookups with ~1M members.
+
+Builds an in-memory SQLite store of 400k synthetic policies with 0-3
+dependents each, then times name (+ date of birth) lookups served by
+the SQLite indexes (cold) and by the LRU cache (warm), plus policy-number
+lookups. Run from the repo root:
+
+    python -m benchmarks.policy_store_benchmark
+"""
+import random
+import time
+
+from data.policy_store import PolicyStore
+from data.repositories import sqlite_repositories
+
+FIRST = ["Juan", "Maria", "Jose", "Ana", "Roberto", "Sofia", "Miguel", "Carmen", "Paolo", "Liza",
+         "Ramon", "Teresa", "Andres", "Isabel", "Carlo", "Bea", "Enrique", "Rosa", "Marco", "Nina"]
+
+
+def _policies(count: int, rng: random.Random) -> list[dict]:
+    surnames = [f"{rng.choice('BCDGLMNPRST')}{rng.choice('aeiou')}{rng.choice('lnrs')}{i}" for i in range(count // 4)]
+    policies = []
+    for i in range(count):
+        surname = rng.choice(surnames)
+        policies.append({
+            "policy_number": f"POL-{i:08d}",
+            "full_name": f"{rng.choice(FIRST)} {rng.choice(FIRST)} {surname}",
+            "date_of_birth": f"{rng.randint(1940, 2005)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "status": "ACTIVE",
+            "valid_from": "2026-01-01",
+            "valid_until": "2027-01-01",
+            "dependents": [f"{rng.choice(FIRST)} {surname}" for _ in range(rng.randint(0, 3))],
+        })
+    return policies
+
+
+def _time_us(fn, args: list) -> float:
+    started = time.perf_counter()
+    for a in args:
+        fn(*a)
+    return (time.perf_counter() - started) * 1e6 / len(args)
+
+
+def run(policies: int = 400_000, queries: int = 20_000) -> None:
+    rng = random.Random(3)
+    records = _policies(policies, rng)
+    store = PolicyStore(sqlite_repositories(":memory:").policies, cache_size=queries)
+
+    started = time.perf_counter()
+    store.upsert(records)
+    members = sum(1 + len(r["dependents"]) for r in records)
+    load_s = time.perf_counter() - started
+
+    sample = rng.sample(records, queries)
+    by_name = [(r["full_name"], r["date_of_birth"]) for r in sample]
+    by_dependent = [(r["dependents"][0],) for r in sample if r["dependents"]]
+    by_number = [(r["policy_number"],) for r in sample]
+
+    cold_name = _time_us(store.find_members, by_name)
+    warm_name = _time_us(store.find_members, by_name)
+    cold_dependent = _time_us(store.find_members, by_dependent)
+    cold_number = _time_us(store.get, by_number)
+    warm_number = _time_us(store.get, by_number)
+
+    for (name, dob), record in zip(by_name[:100], sample):
+        assert record["policy_number"] in {m.record["policy_number"] for m in store.find_members(name, dob)}
+
+    print(f"{policies:,} policies / {members:,} members loaded in {load_s:.1f} s")
+    print(f"name+dob:      sqlite={cold_name:6.1f} µs  cached={warm_name:5.1f} µs")
+    print(f"dependent:     sqlite={cold_dependent:6.1f} µs")
+    print(f"policy number: sqlite={cold_number:6.1f} µs  cached={warm_number:5.1f} µs")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,141 @@
+"""
+Benchmark: lookup latency on the event loop while reference data is reloaded.
+
+A synthetic registry of 2k hospitals and 48k doctors, where each
+reload changes one hospital's capabilities and one doctor's shifts. A
+loop task issues a lookup every millisecond (eligibility, name
+resolution, nearest eligible hospital and a doctor peek), and its
+latency is measured from when the lookup was due, so event-loop stalls
+count. Three phases are compared:
+- steady state
+- back-to-back background reloads (ReferenceData.reload_async)
+- the same rebuilds run inline on the loop, as a restart-free reload
+  without snapshots would
+
+Run from the repo root:
+
+    python -m benchmarks.reference_reload_benchmark
+"""
+import asyncio
+import random
+import statistics
+import time
+
+from benchmarks.doctor_assignment_benchmark import SPECIALIZATIONS, _roster
+from data.reference import ReferenceData
+from utils.geo_util import SpatialIndex
+
+INSURERS = ["GlobalCare", "AIA Philippines Life", "Insular Life Assurance Company", "Maxicare", "Intellicare"]
+CAPABILITIES = ["has_icu", "has_cathlab", "has_ct_scan", "has_mri", "has_trauma_center", "has_nicu"]
+
+
+def _name(rng: random.Random) -> str:
+    return "".join(rng.choice("bdgklmnprst") + rng.choice("aeiou") for _ in range(rng.randint(2, 4))).title()
+
+
+def _hospitals(n: int, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "id": f"H{i:04d}",
+            "name": f"{_name(rng)} {_name(rng)} {rng.choice(['Medical Center', 'General Hospital'])} {i}",
+            "aliases": [f"{_name(rng)} {i}"],
+            "lat": rng.uniform(5.0, 19.0),
+            "lng": rng.uniform(117.0, 127.0),
+            "insurance_accepted": rng.sample(INSURERS, rng.randint(1, len(INSURERS))),
+            "emergency_types_supported": rng.sample(SPECIALIZATIONS, rng.randint(2, len(SPECIALIZATIONS))),
+            "capabilities": {cap: rng.random() < 0.6 for cap in CAPABILITIES},
+        }
+        for i in range(n)
+    ]
+
+
+def _lookup(reference: ReferenceData, rng: random.Random) -> None:
+    snapshot = reference.get()
+    insurer, emergency_type = rng.choice(INSURERS), rng.choice(SPECIALIZATIONS)
+    eligible = {h["id"] for h in snapshot.hospitals.eligible(insurer, emergency_type)}
+    snapshot.hospitals.resolve_name(rng.choice(snapshot.hospitals.hospitals)["name"][:-3])
+    spatial = snapshot.derived("spatial", lambda s: SpatialIndex(s.hospitals.hospitals))
+    nearest = spatial.nearest(rng.uniform(5.0, 19.0), rng.uniform(117.0, 127.0), 3, lambda h: h["id"] in eligible)
+    if nearest:
+        snapshot.doctors.peek(nearest[0][1]["id"], emergency_type)
+
+
+async def _measure(reference: ReferenceData, seconds: float, rng: random.Random) -> list[float]:
+    latencies = []
+    due = time.perf_counter()
+    deadline = due + seconds
+    while due < deadline:
+        due = max(due + 0.001, time.perf_counter())  # skip ticks already missed
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        with reference.pinned():
+            _lookup(reference, rng)
+        latencies.append((time.perf_counter() - due) * 1000)
+    return latencies
+
+
+async def _phase(name: str, reference: ReferenceData, reloads, seconds: float = 3.0) -> None:
+    rng = random.Random(5)
+    measure = asyncio.create_task(_measure(reference, seconds, rng))
+    count = 0
+    while not measure.done():
+        if reloads is None:
+            await asyncio.sleep(0.05)
+            continue
+        await reloads()
+        count += 1
+    latencies = sorted(measure.result())
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(
+        f"{name:<22} reloads={count:3d}  p50={statistics.median(latencies):6.2f} ms  "
+        f"p99={p99:7.2f} ms  max={latencies[-1]:7.2f} ms"
+    )
+
+
+def _edited(records: list[dict], field: str, value, rng: random.Random) -> list[dict]:
+    """A fresh copy of the list, as a repository read returns, with one record changed."""
+    records = [dict(r) for r in records]
+    i = rng.randrange(len(records))
+    records[i][field] = value
+    return records
+
+
+async def _run(hospitals: int, per_specialization: int) -> None:
+    rng = random.Random(3)
+    hospital_records = _hospitals(hospitals, rng)
+    doctor_records = _roster(hospitals, per_specialization, rng)
+
+    def source():
+        capabilities = {cap: rng.random() < 0.6 for cap in CAPABILITIES}
+        shifts = [{"day": "MON", "start": f"{rng.randint(0, 11):02d}:00", "end": "20:00"}]
+        return (
+            _edited(hospital_records, "capabilities", capabilities, rng),
+            _edited(doctor_records, "shifts", shifts, rng),
+        )
+
+    started = time.perf_counter()
+    reference = ReferenceData(source)
+    reference.register("spatial", lambda s: SpatialIndex(s.hospitals.hospitals))
+    initial_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    reference.reload()
+    print(
+        f"{hospitals:,} hospitals / {len(doctor_records):,} doctors: initial build {initial_ms:.0f} ms, "
+        f"reload {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+
+    await _phase("steady", reference, None)
+    await _phase("background reload", reference, reference.reload_async)
+
+    async def inline():
+        reference.reload()
+        await asyncio.sleep(0)
+
+    await _phase("inline rebuild", reference, inline)
+
+
+def run(hospitals: int = 2_000, per_specialization: int = 4) -> None:
+    asyncio.run(_run(hospitals, per_specialization))
+
+
+if __name__ == "__main__":
+    run()
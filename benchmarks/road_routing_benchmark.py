@@ -0,0 +1,161 @@
+"""
+Benchmark: ranking hospitals by road ETA vs. straight-line distance.
+
+A synthetic city road network shaped like Metro Manila's — a ~20 x 20 km
+street grid of 40k intersections with secondary and primary arterials, an
+expressway, one-way side streets and missing blocks — and 150 hospitals on
+it. Times the preprocessing (main network + landmarks), then ranks the top
+3 hospitals for random patient points by road ETA under the free-flow and
+AM-peak speeds of data/speed_profile_ph.json. Checks the ranking against a
+search to every hospital, and reports how often the nearest hospital is not
+the fastest to reach and what picking it costs. Also compares a
+point-to-point ETA with ALT landmarks against plain Dijkstra.
+
+Run from the repo root:
+
+    python -m benchmarks.road_routing_benchmark
+"""
+import random
+import statistics
+import time
+
+from data.road_network import ROAD_CLASSES, load_profile
+from utils.geo_util import SpatialIndex
+from utils.routing_util import RoadGraph, Router
+
+ORIGIN = (14.50, 120.95)
+STEP_DEG = 0.0009   # ~100 m between intersections
+
+
+def _city(size: int, rng: random.Random) -> RoadGraph:
+    lats, lngs = [], []
+    for row in range(size):
+        for col in range(size):
+            lats.append(ORIGIN[0] + row * STEP_DEG + rng.uniform(-0.0002, 0.0002))
+            lngs.append(ORIGIN[1] + col * STEP_DEG + rng.uniform(-0.0002, 0.0002))
+
+    tails, heads, classes = [], [], []
+
+    def add(a: int, b: int, name: str, direction: int = 0) -> None:
+        code = ROAD_CLASSES.index(name)
+        if direction >= 0:
+            tails.append(a)
+            heads.append(b)
+            classes.append(code)
+        if direction <= 0:
+            tails.append(b)
+            heads.append(a)
+            classes.append(code)
+
+    def street(a: int, b: int, line: int) -> None:
+        if line % 20 == 0:
+            add(a, b, "primary")
+        elif line % 10 == 0:
+            add(a, b, "secondary")
+        elif rng.random() > 0.08:                    # else a missing block
+            add(a, b, "residential", rng.choice((1, -1)) if rng.random() < 0.3 else 0)
+
+    for row in range(size):
+        for col in range(size):
+            node = row * size + col
+            if col + 1 < size:
+                street(node, node + 1, row)
+            if row + 1 < size:
+                street(node, node + size, col)
+
+    # An expressway across the city, with ramps every ~2 km
+    row = size // 3
+    for col in range(size):
+        lats.append(ORIGIN[0] + (row + 0.5) * STEP_DEG)
+        lngs.append(ORIGIN[1] + col * STEP_DEG)
+        node = len(lats) - 1
+        if col:
+            add(node - 1, node, "motorway")
+        if col % 20 == 0:
+            add(node, row * size + col, "motorway")
+
+    return RoadGraph.from_edges(lats, lngs, tails, heads, classes, ROAD_CLASSES)
+
+
+def _pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run(size: int = 200, hospitals: int = 150, queries: int = 200, k: int = 3) -> None:
+    rng = random.Random(5)
+    profile = load_profile()
+
+    started = time.perf_counter()
+    graph = _city(size, rng).largest_component()
+    component_s = time.perf_counter() - started
+    started = time.perf_counter()
+    graph = graph.with_landmarks(profile)
+    landmarks_s = time.perf_counter() - started
+    started = time.perf_counter()
+    router = Router(graph, profile)
+    router_s = time.perf_counter() - started
+    print(
+        f"{len(graph):,} nodes, {graph.edge_count:,} edges: main network {component_s:.1f} s, "
+        f"{len(graph.landmarks)} landmarks {landmarks_s:.1f} s, router {router_s:.1f} s"
+    )
+
+    sites = [
+        {"id": f"H{i:03d}", "lat": graph.lats[n] + rng.uniform(-0.0005, 0.0005), "lng": graph.lngs[n] + rng.uniform(-0.0005, 0.0005)}
+        for i, n in enumerate(rng.sample(range(len(graph)), hospitals))
+    ]
+    index = SpatialIndex(sites)
+    snapped = {h["id"]: router.snap(h["lat"], h["lng"], max_snap_m=float("inf")) for h in sites}
+    points = [
+        (ORIGIN[0] + rng.uniform(0.02, 0.9) * size * STEP_DEG, ORIGIN[1] + rng.uniform(0.02, 0.9) * size * STEP_DEG)
+        for _ in range(queries)
+    ]
+
+    for period in ("free_flow", "am_peak"):
+        latencies, searched, mismatches, lost, errors = [], [], 0, [], 0
+        for lat, lng in points:
+            source = router.snap(lat, lng)
+            started = time.perf_counter()
+            ranked, tree = router.fastest(
+                source, k,
+                shortlist=lambda n: index.nearest(lat, lng, n),
+                snapped=lambda h: snapped[h["id"]],
+                period=period,
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            searched.append(len(tree.settled))
+
+            # Reference: search the whole network, every hospital
+            full = router.tree(source, period)
+            full.grow()
+            etas = sorted((full.settled[snapped[h["id"]][0]] + snapped[h["id"]][1], h["id"]) for h in sites)
+            errors += [round(s, 6) for s, _, _ in ranked] != [round(s, 6) for s, _ in etas[:k]]
+
+            nearest = index.nearest(lat, lng, 1)[0][1]
+            if nearest["id"] != ranked[0][2]["id"]:
+                mismatches += 1
+                nearest_eta = full.settled[snapped[nearest["id"]][0]] + snapped[nearest["id"]][1]
+                lost.append((nearest_eta - ranked[0][0]) / 60)
+
+        print(
+            f"{period:<10} top-{k} by ETA p50={statistics.median(latencies):5.1f} ms p99={_pct(latencies, 0.99):5.1f} ms, "
+            f"{statistics.mean(searched):,.0f} nodes searched; differs from full search: {errors}"
+        )
+        print(
+            f"{'':<10} nearest hospital is not the fastest for {mismatches / queries:.0%} of patients"
+            + (f", picking it costs {statistics.mean(lost):.1f} min on average (max {max(lost):.1f})" if lost else "")
+        )
+
+    # Point-to-point: ALT vs. plain Dijkstra (same graph, no landmarks)
+    plain = Router(RoadGraph(graph.lats, graph.lngs, graph.offsets, graph.heads, graph.lengths_m, graph.classes, graph.class_names), profile)
+    pairs = [(router.snap(lat, lng), snapped[rng.choice(sites)["id"]]) for lat, lng in points[:100]]
+    for name, r in (("ALT A*", router), ("Dijkstra", plain)):
+        started = time.perf_counter()
+        results = [r.travel_time(a, b, "am_peak") for a, b in pairs]
+        elapsed = (time.perf_counter() - started) * 1000 / len(pairs)
+        print(f"point-to-point {name:<9} {elapsed:6.1f} ms per route")
+    assert all(abs(x - y) < 1e-6 for x, y in zip(results, [router.travel_time(a, b, "am_peak") for a, b in pairs]))
+
+
+if __name__ == "__main__":
+    run()
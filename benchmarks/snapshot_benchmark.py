@@ -0,0 +1,85 @@
+"""
+Benchmark: cold start and lookups from a memory-mapped snapshot vs. loading records.
+
+Writes 400k synthetic policies (~1M members) to a JSON file and to a
+snapshot, then compares what a worker pays at startup: parsing the JSON
+into the in-memory repository vs. mapping the snapshot. Member lookups
+are timed on both; resident memory is read from /proc (Linux). Run from
+the repo root:
+
+    python -m benchmarks.snapshot_benchmark
+"""
+import json
+import random
+import tempfile
+import time
+
+from pathlib import Path
+
+from benchmarks.policy_store_benchmark import _policies
+from data.repositories import (
+    InMemoryClaimsRepository,
+    InMemoryDoctorRepository,
+    InMemoryHospitalRepository,
+    InMemoryPolicyRepository,
+    Repositories,
+)
+from data.snapshot import build_snapshot, snapshot_repositories
+
+
+def _rss_mb() -> float:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def run(policies: int = 400_000, queries: int = 20_000) -> None:
+    rng = random.Random(3)
+    records = _policies(policies, rng)
+    sample = [(r["full_name"], r["date_of_birth"]) for r in rng.sample(records, queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "policies.json"
+        json_path.write_text(json.dumps(records))
+        snap_path = Path(tmp) / "policies.snap"
+
+        started = time.perf_counter()
+        build_snapshot(
+            Repositories(InMemoryHospitalRepository(), InMemoryDoctorRepository(),
+                         InMemoryPolicyRepository(records), InMemoryClaimsRepository()),
+            snap_path,
+        )
+        build_s = time.perf_counter() - started
+        del records
+
+        rss = _rss_mb()
+        started = time.perf_counter()
+        mapped = snapshot_repositories(snap_path).policies
+        open_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        for name, dob in sample:
+            assert mapped.find_members(name, dob)
+        mapped_us = (time.perf_counter() - started) * 1e6 / queries
+        mapped_rss = _rss_mb() - rss
+
+        rss = _rss_mb()
+        started = time.perf_counter()
+        loaded = InMemoryPolicyRepository(json.loads(json_path.read_text()))
+        load_s = time.perf_counter() - started
+        started = time.perf_counter()
+        for name, dob in sample:
+            loaded.find_members(name, dob)
+        loaded_us = (time.perf_counter() - started) * 1e6 / queries
+        loaded_rss = _rss_mb() - rss
+
+        print(f"{policies:,} policies  snapshot build={build_s:.1f} s  size={snap_path.stat().st_size / 1e6:.0f} MB")
+        print(f"snapshot: open={open_ms:7.1f} ms  lookup={mapped_us:5.1f} µs  RSS +{mapped_rss:.0f} MB (file pages, shared)")
+        print(f"json:     load={load_s * 1000:7.0f} ms  lookup={loaded_us:5.1f} µs  RSS +{loaded_rss:.0f} MB (per worker)")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,73 @@
+"""
+Benchmark: SpatialIndex k-nearest vs. a full haversine scan + sort.
+
+Synthetic registries of 10k and 100k hospitals spread over the Philippines,
+each accepting a random subset of insurers. Results are checked against the
+full scan. Run from the repo root:
+
+    python -m benchmarks.spatial_index_benchmark
+"""
+import random
+import time
+
+from utils.geo_util import SpatialIndex, haversine_distance
+
+INSURERS = ["GlobalCare", "AIA Philippines Life", "Insular Life Assurance Company"]
+LAT_RANGE = (5.0, 19.0)
+LNG_RANGE = (117.0, 127.0)
+
+
+def _make_hospitals(n: int, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "id": f"H{i:06d}",
+            "lat": rng.uniform(*LAT_RANGE),
+            "lng": rng.uniform(*LNG_RANGE),
+            "insurance_accepted": rng.sample(INSURERS, rng.randint(1, len(INSURERS))),
+        }
+        for i in range(n)
+    ]
+
+
+def _full_scan(hospitals, lat, lng, k, predicate):
+    ranked = sorted(
+        ((haversine_distance(lat, lng, h["lat"], h["lng"]), h) for h in hospitals if predicate(h)),
+        key=lambda x: x[0],
+    )
+    return ranked[:k]
+
+
+def run(n: int, queries: int = 200, k: int = 3, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    hospitals = _make_hospitals(n, rng)
+
+    started = time.perf_counter()
+    index = SpatialIndex(hospitals)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    points = [(rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE), rng.choice(INSURERS)) for _ in range(queries)]
+
+    def predicate_for(insurer):
+        return lambda h: insurer in h["insurance_accepted"]
+
+    started = time.perf_counter()
+    scan_results = [_full_scan(hospitals, lat, lng, k, predicate_for(ins)) for lat, lng, ins in points]
+    scan_ms = (time.perf_counter() - started) * 1000 / queries
+
+    started = time.perf_counter()
+    index_results = [index.nearest(lat, lng, k, predicate_for(ins)) for lat, lng, ins in points]
+    index_ms = (time.perf_counter() - started) * 1000 / queries
+
+    for expected, actual in zip(scan_results, index_results):
+        assert [round(d, 9) for d, _ in expected] == [round(d, 9) for d, _ in actual], "index disagrees with full scan"
+
+    print(
+        f"n={n:>7,}  build={build_ms:8.1f} ms  "
+        f"full scan={scan_ms:8.3f} ms/query  index={index_ms:7.3f} ms/query  "
+        f"speedup={scan_ms / index_ms:6.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    for size in (10_000, 100_000):
+        run(size)
@@ -0,0 +1,52 @@
+"""
+Benchmark: vectorized CoordinateArray ranking vs. the scalar haversine_distance
+reference (per-hospital Python loop + sort), for one and many patient points.
+Results are checked against the reference. Run from the repo root:
+
+    python -m benchmarks.vectorized_ranking_benchmark
+"""
+import random
+import time
+
+import numpy as np
+
+from utils.geo_util import CoordinateArray, haversine_distance
+
+LAT_RANGE = (5.0, 19.0)
+LNG_RANGE = (117.0, 127.0)
+
+
+def _reference(hospitals, lat, lng, k):
+    ranked = sorted(
+        ({"hospital": h, "distance_km": haversine_distance(lat, lng, h["lat"], h["lng"])} for h in hospitals),
+        key=lambda x: x["distance_km"],
+    )
+    return [r["distance_km"] for r in ranked[:k]]
+
+
+def run(candidates: int, points: int, k: int = 3, seed: int = 11) -> None:
+    rng = random.Random(seed)
+    hospitals = [{"lat": rng.uniform(*LAT_RANGE), "lng": rng.uniform(*LNG_RANGE)} for _ in range(candidates)]
+    lats = [rng.uniform(*LAT_RANGE) for _ in range(points)]
+    lngs = [rng.uniform(*LNG_RANGE) for _ in range(points)]
+    coords = CoordinateArray(hospitals)
+
+    started = time.perf_counter()
+    expected = [_reference(hospitals, lat, lng, k) for lat, lng in zip(lats, lngs)]
+    scalar_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    _, distances = coords.nearest(lats, lngs, k)
+    vector_ms = (time.perf_counter() - started) * 1000
+
+    assert np.allclose(distances, expected, rtol=0, atol=1e-9), "vectorized ranking disagrees with reference"
+
+    print(
+        f"candidates={candidates:>7,}  points={points:>5,}  "
+        f"scalar={scalar_ms:9.1f} ms  vectorized={vector_ms:8.1f} ms  speedup={scalar_ms / vector_ms:6.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    for candidates, points in ((1_000, 1), (10_000, 1), (10_000, 100), (100_000, 10), (5_000, 200)):
+        run(candidates, points)
@@ -0,0 +1,180 @@
+"""
+Live hospital capacity for MediRoute AI — ER load, bed and ICU availability
+and diversion status, as reported by the hospitals (POST /capacity), so
+matching stops sending patients to hospitals that would turn them away.
+
+    CAPACITY.update([{"hospital_id": "H001", "er_load": 0.97, "on_diversion": True}])
+    CAPACITY.admission_issue("H001", needs_icu=False)   # "is on ER diversion"
+
+A status older than CAPACITY_STALE_SECONDS counts as unknown: a hospital that
+stopped reporting is matched as if it never had. For local testing,
+data/capacity_simulator.py emits updates for the registry's hospitals.
+"""
+import os
+import threading
+import time
+
+from typing import Iterable, NamedTuple
+
+# At or above this ER load a hospital is ranked after ones that are not
+BUSY_ER_LOAD = float(os.getenv("CAPACITY_BUSY_ER_LOAD", "0.9"))
+
+# Reservable resources (data/reservations.py) → the status field reporting how many are free
+RESOURCES = {"bed": "beds_available", "icu_bed": "icu_beds_available"}
+
+# Fields a partial update may leave out
+_REPORTED = ("er_load", "beds_available", "icu_beds_available", "on_diversion")
+
+
+class HospitalStatus(NamedTuple):
+    hospital_id: str
+    reported_at: float                  # epoch seconds, as reported by the hospital (never after receipt)
+    er_load: float | None               # share of ER capacity in use; above 1 when overflowing
+    beds_available: int | None
+    icu_beds_available: int | None
+    on_diversion: bool | None           # ER closed to new ambulance patients
+
+    @classmethod
+    def from_update(cls, update: dict, now: float | None = None) -> "HospitalStatus":
+        """
+        From a feed update; fields not reported are None. A missing
+        reported_at is now, and one in the future (a skewed hospital clock)
+        is clamped to now, so it cannot shadow the updates after it.
+        """
+        now = now or time.time()
+        reported_at = update.get("reported_at")
+        on_diversion = update.get("on_diversion")
+        return cls(
+            hospital_id=str(update["hospital_id"]),
+            reported_at=min(float(reported_at), now) if reported_at is not None else now,
+            er_load=update.get("er_load"),
+            beds_available=update.get("beds_available"),
+            icu_beds_available=update.get("icu_beds_available"),
+            on_diversion=bool(on_diversion) if on_diversion is not None else None,
+        )
+
+    def merged(self, held: "HospitalStatus") -> "HospitalStatus":
+        """This status with the fields it does not report taken from the held one."""
+        missing = {f: getattr(held, f) for f in _REPORTED if getattr(self, f) is None}
+        return self._replace(**missing) if missing else self
+
+
+class CapacityStore:
+    """
+    Latest status per hospital, split into shards by hospital id.
+
+    Readers take no lock: a lookup is a single dict read and snapshot() a
+    single dict copy per shard, each atomic, so reads never wait for a writer
+    nor hold one up. Writers lock only the shard they update, to compare
+    reporting times: updates reported earlier than the status held, or
+    already stale on arrival, are dropped, so a delayed or replayed message
+    cannot roll a hospital back. An update carries only what it reports;
+    the rest is kept from the status held while that is not stale.
+    """
+
+    def __init__(self, shards: int = 64, stale_seconds: float = 15 * 60):
+        self._shards: list[dict[str, HospitalStatus]] = [{} for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self.stale_seconds = stale_seconds
+        self.applied = 0
+        self.dropped = 0
+
+    def _shard(self, hospital_id: str) -> int:
+        return hash(hospital_id) % len(self._shards)
+
+    def update(self, updates: Iterable[dict | HospitalStatus]) -> int:
+        """Applies feed updates; returns how many were fresh and newer than the status held."""
+        now = time.time()
+        cutoff = now - self.stale_seconds
+        received = 0
+        by_shard: dict[int, list[HospitalStatus]] = {}
+        for update in updates:
+            received += 1
+            status = update if isinstance(update, HospitalStatus) else HospitalStatus.from_update(update, now)
+            if status.reported_at < cutoff:     # stale on arrival: would only count as unknown
+                continue
+            by_shard.setdefault(self._shard(status.hospital_id), []).append(status)
+
+        applied = 0
+        for shard, statuses in by_shard.items():
+            held_statuses = self._shards[shard]
+            with self._locks[shard]:
+                for status in statuses:
+                    held = held_statuses.get(status.hospital_id)
+                    if held is None or status.reported_at >= held.reported_at:
+                        if held is not None and held.reported_at >= cutoff:
+                            status = status.merged(held)
+                        held_statuses[status.hospital_id] = status
+                        applied += 1
+
+        self.applied += applied
+        self.dropped += received - applied
+        return applied
+
+    def get(self, hospital_id: str) -> HospitalStatus | None:
+        """The hospital's latest status, unless stale."""
+        status = self._shards[self._shard(hospital_id)].get(hospital_id)
+        if status is None or time.time() - status.reported_at > self.stale_seconds:
+            return None
+        return status
+
+    def snapshot(self) -> dict[str, HospitalStatus]:
+        """Every hospital's latest status that is not stale."""
+        cutoff = time.time() - self.stale_seconds
+        return {
+            hospital_id: status
+            for shard in self._shards
+            for hospital_id, status in shard.copy().items()
+            if status.reported_at >= cutoff
+        }
+
+    def available(self, hospital_id: str, resource: str) -> int | None:
+        """Free beds of that kind (see RESOURCES) as last reported; None if unknown."""
+        status = self.get(hospital_id)
+        return getattr(status, RESOURCES[resource]) if status else None
+
+    def admission_issue(self, hospital_id: str, needs_icu: bool, held: dict[str, int] | None = None) -> str | None:
+        """
+        Why the hospital would turn the patient away right now; None if it
+        should not. `held` counts beds per resource already reserved for
+        patients on their way, which the hospital's report does not reflect yet.
+        """
+        status = self.get(hospital_id)
+        if status is None:
+            return None
+        held = held or {}
+        if status.on_diversion:
+            return "is on ER diversion"
+        if needs_icu and status.icu_beds_available is not None and status.icu_beds_available <= held.get("icu_bed", 0):
+            return "has no ICU bed available"
+        if status.beds_available is not None and status.beds_available <= held.get("bed", 0):
+            return "has no bed available"
+        return None
+
+    def busy(self, hospital_id: str) -> bool | None:
+        """Whether the ER load is at or above CAPACITY_BUSY_ER_LOAD; None if unknown."""
+        status = self.get(hospital_id)
+        if status is None or status.er_load is None:
+            return None
+        return status.er_load >= BUSY_ER_LOAD
+
+    def clear(self) -> None:
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                shard.clear()
+
+    def stats(self) -> dict:
+        statuses = self.snapshot()
+        return {
+            "hospitals_reporting": len(statuses),
+            "on_diversion": sum(bool(s.on_diversion) for s in statuses.values()),
+            "busy": sum(s.er_load is not None and s.er_load >= BUSY_ER_LOAD for s in statuses.values()),
+            "updates_applied": self.applied,
+            "updates_dropped": self.dropped,
+        }
+
+
+CAPACITY = CapacityStore(
+    shards=int(os.getenv("CAPACITY_SHARDS", "64")),
+    stale_seconds=float(os.getenv("CAPACITY_STALE_SECONDS", str(15 * 60))),
+)
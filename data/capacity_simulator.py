@@ -0,0 +1,108 @@
+"""
+Local simulator for the hospital capacity feed — emits status updates for
+the registry's hospitals (ER load drifting up and down, beds and ICU
+beds filling and freeing up, diversion switched on when an ER overflows), so
+capacity-aware matching can be exercised without real hospital systems. The
+hospitals are those of the configured data backend.
+
+    python -m data.capacity_simulator --url http://127.0.0.1:8000 --rate 200 --batch 50
+
+In-process:
+
+    simulator = CapacitySimulator([h["id"] for h in REFERENCE.get().hospitals], seed=1)
+    CAPACITY.update(simulator.updates(100))
+"""
+import argparse
+import logging
+import random
+import time
+
+import httpx
+
+from data.repositories import REPOSITORIES
+
+logger = logging.getLogger(__name__)
+
+
+class CapacitySimulator:
+    """Random-walk capacity per hospital; each update reports one hospital's current state."""
+
+    def __init__(self, hospital_ids: list[str], seed: int | None = None, diversion_rate: float = 0.2):
+        self._rng = random.Random(seed)
+        self._ids = list(hospital_ids)
+        self._diversion_rate = diversion_rate
+        self._state = {
+            hospital_id: {
+                "er_load": self._rng.uniform(0.3, 0.9),
+                "beds": (beds := self._rng.randint(50, 600)),
+                "beds_available": self._rng.randint(0, beds // 5),
+                "icu_beds": (icu := self._rng.randint(4, 40)),
+                "icu_beds_available": self._rng.randint(0, icu // 3),
+                "on_diversion": False,
+            }
+            for hospital_id in self._ids
+        }
+
+    def _step(self, hospital_id: str) -> dict:
+        rng = self._rng
+        state = self._state[hospital_id]
+        state["er_load"] = min(1.4, max(0.1, state["er_load"] + rng.gauss(0, 0.05)))
+        state["beds_available"] = min(state["beds"], max(0, state["beds_available"] + rng.randint(-3, 3)))
+        state["icu_beds_available"] = min(state["icu_beds"], max(0, state["icu_beds_available"] + rng.randint(-1, 1)))
+        # An overflowing ER may go on diversion; it comes off once the load eases
+        if state["er_load"] >= 1.0 and rng.random() < self._diversion_rate:
+            state["on_diversion"] = True
+        elif state["er_load"] < 0.8:
+            state["on_diversion"] = False
+        return {
+            "hospital_id": hospital_id,
+            "reported_at": time.time(),
+            "er_load": round(state["er_load"], 3),
+            "beds_available": state["beds_available"],
+            "icu_beds_available": state["icu_beds_available"],
+            "on_diversion": state["on_diversion"],
+        }
+
+    def updates(self, count: int) -> list[dict]:
+        """The next `count` updates, from hospitals picked at random."""
+        return [self._step(self._rng.choice(self._ids)) for _ in range(count)]
+
+
+def run(url: str, rate: float, batch: int, duration: float | None = None, seed: int | None = None) -> None:
+    """Posts `rate` updates per second to {url}/capacity in batches, for `duration` seconds (None = until interrupted)."""
+    simulator = CapacitySimulator([h["id"] for h in REPOSITORIES.hospitals.list_all()], seed)
+    interval = batch / rate
+    started = time.monotonic()
+    sent = 0
+    with httpx.Client(base_url=url, timeout=5.0) as client:
+        while duration is None or time.monotonic() - started < duration:
+            tick = time.monotonic()
+            try:
+                response = client.post("/capacity", json={"updates": simulator.updates(batch)})
+                response.raise_for_status()
+                sent += batch
+                if sent % (batch * 20) == 0:
+                    logger.info("%d updates sent (%.0f/s)", sent, sent / (time.monotonic() - started))
+            except httpx.HTTPError as e:
+                logger.warning("Capacity update not accepted: %s", e)
+            time.sleep(max(0.0, interval - (time.monotonic() - tick)))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Local simulator for the hospital capacity feed.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="MediRoute API base URL")
+    parser.add_argument("--rate", type=float, default=50.0, help="updates per second")
+    parser.add_argument("--batch", type=int, default=10, help="updates per request")
+    parser.add_argument("--duration", type=float, default=None, help="seconds to run (default: until interrupted)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    try:
+        run(args.url, args.rate, args.batch, args.duration, args.seed)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
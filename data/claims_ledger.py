@@ -0,0 +1,159 @@
+"""Claims ledger for MediRoute AI — approved claims per policy with running totals."""
+import os
+import threading
+import time
+
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Iterable, NamedTuple
+
+from data.repositories import REPOSITORIES, ClaimsRepository
+
+
+class BenefitUsage(NamedTuple):
+    claims: list[dict]      # approved claims in the window, by date
+    used: float             # PHP
+    remaining: float        # PHP, never negative
+
+
+class _PolicyClaims:
+    """One policy's approved claims sorted by date, with prefix sums in centavos
+    (integers, so window totals are exact however many claims are summed)."""
+
+    def __init__(self):
+        self.dates: list[str] = []          # ISO dates sort chronologically as strings
+        self.claims: list[dict] = []
+        self.prefix: list[int] = [0]        # prefix[i] = total of the first i claims
+
+    def add(self, claim_date: str, claim: dict, centavos: int) -> None:
+        if not self.dates or claim_date >= self.dates[-1]:
+            # Usual case, claims arrive in date order: O(1)
+            self.dates.append(claim_date)
+            self.claims.append(claim)
+            self.prefix.append(self.prefix[-1] + centavos)
+            return
+        # Backdated claim: insert in place and shift the running totals after it
+        i = bisect_right(self.dates, claim_date)
+        self.dates.insert(i, claim_date)
+        self.claims.insert(i, claim)
+        self.prefix.insert(i + 1, self.prefix[i] + centavos)
+        for j in range(i + 2, len(self.prefix)):
+            self.prefix[j] += centavos
+
+    def window(self, valid_from: str, valid_until: str) -> tuple[int, int]:
+        """Index range of the claims dated valid_from..valid_until, inclusive."""
+        return bisect_left(self.dates, valid_from), bisect_right(self.dates, valid_until)
+
+
+class ClaimsLedger:
+    """
+    Approved claims indexed by policy number. Usage for any validity window
+    is two binary searches plus a prefix-sum difference, O(log n) per policy
+    instead of a scan of every claim.
+
+    ingest() appends new claims and updates the running totals in place;
+    non-approved and already-ingested claims (by claim_id) are skipped. With
+    a repository, the ledger is loaded from it and new claims are written
+    back to it; a policy's claims are re-read from it (for_policy) when
+    looked up more than ttl_seconds after they were last read, so claims
+    written by the loader or another worker reach the benefit checks.
+    """
+
+    def __init__(
+        self,
+        claims: Iterable[dict] = (),
+        repository: ClaimsRepository | None = None,
+        ttl_seconds: float = 30.0,
+    ):
+        self._policies: dict[str, _PolicyClaims] = {}
+        self._claim_ids: set[str] = set()
+        self._lock = threading.Lock()
+        self._index(claims)
+        self._repository = repository
+        self._ttl_seconds = ttl_seconds
+        # policy number → when its claims were last read from the repository
+        self._read_at: dict[str, float] = dict.fromkeys(self._policies, time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._claim_ids)
+
+    def ingest(self, claims: Iterable[dict]) -> int:
+        """Adds approved claims (persisting them, with a repository); returns how many were new."""
+        added = self._index(claims)
+        if self._repository and added:
+            self._repository.upsert(added)
+        return len(added)
+
+    def _index(self, claims: Iterable[dict]) -> list[dict]:
+        added = []
+        with self._lock:
+            for claim in claims:
+                if claim["status"] != "APPROVED" or claim["claim_id"] in self._claim_ids:
+                    continue
+                claim_date = date.fromisoformat(claim["claim_date"]).isoformat()
+                centavos = round(claim["claim_amount"] * 100)
+                self._policies.setdefault(claim["policy_number"], _PolicyClaims()).add(
+                    claim_date, claim, centavos
+                )
+                self._claim_ids.add(claim["claim_id"])
+                added.append(claim)
+        return added
+
+    def _refresh(self, policy_number: str) -> None:
+        """Re-reads the policy's claims from the repository if last read more than ttl_seconds ago."""
+        if not self._repository:
+            return
+        now = time.monotonic()
+        if now - self._read_at.get(policy_number, -float("inf")) <= self._ttl_seconds:
+            return
+        # The query runs outside the lock; the rebuilt policy replaces the old one whole
+        policy = _PolicyClaims()
+        for claim in self._repository.for_policy(policy_number):
+            if claim["status"] == "APPROVED":
+                claim_date = date.fromisoformat(claim["claim_date"]).isoformat()
+                policy.add(claim_date, claim, round(claim["claim_amount"] * 100))
+        with self._lock:
+            old = self._policies.get(policy_number)
+            if old:
+                self._claim_ids.difference_update(c["claim_id"] for c in old.claims)
+            self._claim_ids.update(c["claim_id"] for c in policy.claims)
+            self._policies[policy_number] = policy
+            self._read_at[policy_number] = now
+
+    def claims(self, policy_number: str, valid_from: str, valid_until: str) -> list[dict]:
+        """Approved claims for the policy dated within valid_from..valid_until (ISO dates, inclusive)."""
+        return self.usage(policy_number, 0.0, valid_from, valid_until).claims
+
+    def used(self, policy_number: str, valid_from: str, valid_until: str) -> float:
+        """Total approved claim amount in the window, in PHP."""
+        self._refresh(policy_number)
+        with self._lock:
+            policy = self._policies.get(policy_number)
+            if not policy:
+                return 0.0
+            lo, hi = policy.window(valid_from, valid_until)
+            return (policy.prefix[hi] - policy.prefix[lo]) / 100
+
+    def usage(
+        self,
+        policy_number: str,
+        max_benefit_limit: float,
+        valid_from: str,
+        valid_until: str,
+    ) -> BenefitUsage:
+        """Claims, used and remaining benefits for the window in one lookup."""
+        self._refresh(policy_number)
+        with self._lock:
+            policy = self._policies.get(policy_number)
+            if not policy:
+                return BenefitUsage([], 0.0, max(0.0, max_benefit_limit))
+            lo, hi = policy.window(valid_from, valid_until)
+            used = (policy.prefix[hi] - policy.prefix[lo]) / 100
+            return BenefitUsage(policy.claims[lo:hi], used, max(0.0, max_benefit_limit - used))
+
+
+CLAIMS_LEDGER = ClaimsLedger(
+    REPOSITORIES.claims.list_all(),
+    REPOSITORIES.claims,
+    ttl_seconds=float(os.getenv("CLAIMS_LEDGER_TTL_SECONDS", "30")),
+)
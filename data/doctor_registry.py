@@ -0,0 +1,287 @@
+"""Doctor registry for MediRoute AI — owns the doctor roster, duty schedules and case loads."""
+import threading
+import time
+
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import NamedTuple
+
+from utils.interval_util import IntervalIndex
+
+# Shift times are Manila local time (no DST)
+ROSTER_TZ = timezone(timedelta(hours=8))
+
+_DAYS = ["MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"]
+_MINUTES_PER_WEEK = 7 * 24 * 60
+
+# Doctors without explicit "shifts" are on duty around the clock if
+# available_24h, else weekday office hours
+_ALL_WEEK = [{"day": day, "start": "00:00", "end": "24:00"} for day in _DAYS]
+_OFFICE_HOURS = [{"day": day, "start": "08:00", "end": "17:00"} for day in _DAYS[:5]]
+
+
+def _shifts(doctor: dict) -> list[dict]:
+    return doctor.get("shifts") or (_ALL_WEEK if doctor["available_24h"] else _OFFICE_HOURS)
+
+
+@lru_cache(maxsize=4096)  # rosters reuse a handful of shift boundaries
+def _minute_of_week(day: str, hhmm: str) -> int:
+    hours, minutes = hhmm.split(":")
+    return _DAYS.index(day) * 24 * 60 + int(hours) * 60 + int(minutes)
+
+
+def _duty_intervals(doctor: dict) -> list[tuple[int, int, dict]]:
+    """Shifts as [start, end) minute-of-week intervals; overnight shifts and
+    Sunday-into-Monday wrap around the week."""
+    intervals = []
+    for shift in _shifts(doctor):
+        start = _minute_of_week(shift["day"], shift["start"])
+        end = _minute_of_week(shift["day"], shift["end"])
+        if end <= start:
+            end += 24 * 60
+        if end > _MINUTES_PER_WEEK:
+            intervals.append((0, end - _MINUTES_PER_WEEK, doctor))
+            end = _MINUTES_PER_WEEK
+        intervals.append((start, end, doctor))
+    return intervals
+
+
+def _by_availability(doctors: list[dict]) -> tuple[dict, ...]:
+    """24h-available doctors first; roster order is kept within each group."""
+    return tuple(sorted(doctors, key=lambda d: not d["available_24h"]))
+
+
+def _duty_index(doctors: tuple[dict, ...]) -> IntervalIndex:
+    return IntervalIndex(interval for d in doctors for interval in _duty_intervals(d))
+
+
+def _duty_indexes(lists: dict, previous_lists: dict, previous_indexes: dict) -> dict:
+    """Interval index per key, reusing the previous roster's where the key's doctors are unchanged."""
+    return {
+        key: previous_indexes[key] if previous_lists.get(key) == ds else _duty_index(ds)
+        for key, ds in lists.items()
+    }
+
+
+class _Indexes(NamedTuple):
+    doctors: list[dict]
+    by_id: dict[str, dict]
+    by_hospital: dict[str, tuple[dict, ...]]
+    by_specialization: dict[tuple[str, str], tuple[dict, ...]]
+    on_duty_by_hospital: dict[str, IntervalIndex]
+    on_duty_by_specialization: dict[tuple[str, str], IntervalIndex]
+
+
+class CaseLoads:
+    """Active cases per doctor with per-hospital locks. Shared by every roster
+    version (see DoctorRegistry.with_roster), so loads survive reloads."""
+
+    def __init__(self):
+        self._cases: dict[str, dict[str, float]] = {}   # doctor id → case id → expiry
+        self._doctors: dict[str, str] = {}              # case id → doctor id
+        self._locks: dict[str, threading.Lock] = {}     # per hospital
+
+    def lock(self, hospital_id: str) -> threading.Lock:
+        lock = self._locks.get(hospital_id)
+        if lock is None:
+            lock = self._locks.setdefault(hospital_id, threading.Lock())
+        return lock
+
+    def load(self, doctor_id: str, now: float) -> int:
+        """Unexpired cases of the doctor; call under the hospital's lock."""
+        cases = self._cases.get(doctor_id)
+        if not cases:
+            return 0
+        for case_id in [c for c, expiry in cases.items() if expiry <= now]:
+            del cases[case_id]
+            self._doctors.pop(case_id, None)
+        return len(cases)
+
+    def add(self, doctor_id: str, case_id: str, until: float) -> None:
+        self._cases.setdefault(doctor_id, {})[case_id] = until
+        self._doctors[case_id] = doctor_id
+
+    def remove(self, doctor_id: str, case_id: str) -> None:
+        if self._cases.get(doctor_id, {}).pop(case_id, None) is not None:
+            self._doctors.pop(case_id, None)
+
+    def doctor_of(self, case_id: str) -> str | None:
+        return self._doctors.get(case_id)
+
+
+class DoctorRegistry:
+    """
+    Doctor roster plus dict indexes keyed by (hospital_id, specialization) and by
+    hospital, each list already ordered by availability, and per-key interval
+    indexes over the weekly duty schedule, so "who is on duty now" is a bisect.
+
+    The roster is immutable: a changed roster is a new registry from
+    with_roster(), built aside and published with the rest of the reference
+    data (see data/reference.py). Unchanged doctors and duty indexes are
+    shared with the previous roster, so a rebuild costs in proportion to
+    what changed.
+
+    Case loads (active LOAs per doctor) live in a CaseLoads shared with the
+    registries built from this one. assign() picks the least-loaded candidate
+    and records the case under a per-hospital lock, so concurrent LOAs spread
+    across doctors instead of all landing on the first one; cases drop off
+    when their LOA expires or on release().
+    """
+
+    def __init__(
+        self,
+        doctors: list[dict],
+        case_loads: CaseLoads | None = None,
+        previous: "DoctorRegistry | None" = None,
+    ):
+        self._case_loads = case_loads or CaseLoads()
+        old = previous._indexes if previous else _Indexes([], {}, {}, {}, {}, {})
+        # Equal records keep the previous object, so unchanged groups compare by identity
+        doctors = [
+            existing if (existing := old.by_id.get(doctor["id"])) == doctor else doctor
+            for doctor in doctors
+        ]
+        by_id: dict[str, dict] = {}
+        by_hospital: dict[str, list[dict]] = {}
+        by_specialization: dict[tuple[str, str], list[dict]] = {}
+
+        for doctor in doctors:
+            if doctor["id"] in by_id:
+                raise ValueError(f"Duplicate doctor id: {doctor['id']}")
+            by_id[doctor["id"]] = doctor
+            by_hospital.setdefault(doctor["hospital_id"], []).append(doctor)
+            by_specialization.setdefault(
+                (doctor["hospital_id"], doctor["specialization"]), []
+            ).append(doctor)
+
+        hospital_lists = {key: _by_availability(ds) for key, ds in by_hospital.items()}
+        specialization_lists = {key: _by_availability(ds) for key, ds in by_specialization.items()}
+        self._indexes = _Indexes(
+            doctors,
+            by_id,
+            hospital_lists,
+            specialization_lists,
+            _duty_indexes(hospital_lists, old.by_hospital, old.on_duty_by_hospital),
+            _duty_indexes(specialization_lists, old.by_specialization, old.on_duty_by_specialization),
+        )
+
+    def with_roster(self, doctors: list[dict]) -> "DoctorRegistry":
+        """A registry for a new roster that shares this one's case loads and unchanged indexes."""
+        return DoctorRegistry(doctors, self._case_loads, self)
+
+    def __len__(self) -> int:
+        return len(self._indexes.doctors)
+
+    def __iter__(self):
+        return iter(self._indexes.doctors)
+
+    def get(self, doctor_id: str) -> dict | None:
+        return self._indexes.by_id.get(doctor_id)
+
+    def at_hospital(self, hospital_id: str) -> tuple[dict, ...]:
+        """Every doctor at the hospital, 24h-available first."""
+        return self._indexes.by_hospital.get(hospital_id, ())
+
+    def specialists(self, hospital_id: str, specialization: str) -> tuple[dict, ...]:
+        """Doctors at the hospital with the specialization, 24h-available first."""
+        return self._indexes.by_specialization.get((hospital_id, specialization), ())
+
+    def on_duty(
+        self,
+        hospital_id: str,
+        specialization: str | None = None,
+        at: datetime | None = None,
+    ) -> tuple[dict, ...]:
+        """Doctors on shift at the hospital at the given time (default now), 24h-available first."""
+        if specialization is None:
+            index = self._indexes.on_duty_by_hospital.get(hospital_id)
+        else:
+            index = self._indexes.on_duty_by_specialization.get((hospital_id, specialization))
+        if index is None:
+            return ()
+        at = at or datetime.now(ROSTER_TZ)
+        if at.tzinfo is not None:
+            at = at.astimezone(ROSTER_TZ)
+        return index.at(at.weekday() * 24 * 60 + at.hour * 60 + at.minute)
+
+    # ── Assignment ────────────────────────────────────────────────────────────
+
+    def _candidates(self, hospital_id: str, specialization: str, at: datetime | None) -> tuple[dict, ...]:
+        """
+        On-duty specialists, else anyone on duty at the hospital. If nobody is
+        on shift, the whole roster for the hospital so an LOA still names an
+        attending doctor.
+        """
+        return (
+            self.on_duty(hospital_id, specialization, at)
+            or self.on_duty(hospital_id, None, at)
+            or self.specialists(hospital_id, specialization)
+            or self.at_hospital(hospital_id)
+        )
+
+    def _least_loaded(self, candidates: tuple[dict, ...], now: float) -> dict:
+        # min() keeps the first of equal loads, i.e. 24h-available, then roster order
+        return min(candidates, key=lambda d: self._case_loads.load(d["id"], now))
+
+    def load(self, doctor_id: str) -> int:
+        """Active (unexpired, unreleased) cases of the doctor."""
+        doctor = self.get(doctor_id)
+        if not doctor:
+            return 0
+        with self._case_loads.lock(doctor["hospital_id"]):
+            return self._case_loads.load(doctor_id, time.time())
+
+    def peek(self, hospital_id: str, specialization: str, at: datetime | None = None) -> dict | None:
+        """The doctor assign() would pick right now, without recording a case."""
+        candidates = self._candidates(hospital_id, specialization, at)
+        if not candidates:
+            return None
+        with self._case_loads.lock(hospital_id):
+            return self._least_loaded(candidates, time.time())
+
+    def assign(
+        self,
+        hospital_id: str,
+        specialization: str,
+        case_id: str,
+        until: float,
+        at: datetime | None = None,
+        prefer: dict | None = None,
+    ) -> dict | None:
+        """
+        Picks the least-loaded candidate (see _candidates) and records case_id
+        against them until the `until` timestamp. `prefer` — e.g. the doctor a
+        speculative LOA was drafted with — wins if still a candidate and no
+        more loaded than the best. None if the hospital has no doctors.
+        """
+        candidates = self._candidates(hospital_id, specialization, at)
+        if not candidates:
+            return None
+
+        loads = self._case_loads
+        with loads.lock(hospital_id):
+            now = time.time()
+            doctor = self._least_loaded(candidates, now)
+            if (
+                prefer and prefer is not doctor
+                and any(d["id"] == prefer["id"] for d in candidates)
+                and loads.load(prefer["id"], now) <= loads.load(doctor["id"], now)
+            ):
+                doctor = prefer
+            loads.add(doctor["id"], case_id, until)
+        return doctor
+
+    def release(self, doctor_id: str, case_id: str) -> None:
+        """Ends a case before its LOA expires (discharge, transfer, cancellation)."""
+        doctor = self.get(doctor_id)
+        if not doctor:
+            return
+        with self._case_loads.lock(doctor["hospital_id"]):
+            self._case_loads.remove(doctor_id, case_id)
+
+    def release_case(self, case_id: str) -> str | None:
+        """release() by case id alone; the doctor id the case was released from, if any."""
+        doctor_id = self._case_loads.doctor_of(case_id)
+        if doctor_id:
+            self.release(doctor_id, case_id)
+        return doctor_id
@@ -0,0 +1,235 @@
+"""
+Offline gazetteer for MediRoute AI — resolves free-text patient locations to
+coordinates without a geocoding service.
+
+    GAZETTEER.geocode("Brgy. San Isidro, Makati").coordinates
+
+Places (regions, provinces, cities/municipalities, districts, barangays and
+well-known areas) come from a CSV/JSON file in the data.loader format, with
+`parent` linking each place to the one containing it. The bundled
+data/gazetteer_ph.csv is a seed covering Metro Manila and the major
+provincial cities; point GAZETTEER_PATH at a full PSGC-derived file (tens of
+thousands of barangays) in production.
+
+Every name and alias is compiled into one Aho-Corasick automaton, so finding
+all place mentions is a single pass over the text however large the
+gazetteer. Mentions are then resolved against each other: the longest
+mention wins over names nested in it ("Quezon City" over "Quezon"), a place
+named together with one of its ancestors wins over its homonyms
+("San Isidro, Makati"), and the most specific place wins over the areas
+containing it.
+"""
+import logging
+import os
+
+from pathlib import Path
+from typing import NamedTuple
+
+from data.loader import read_records
+from utils.aho_corasick_util import AhoCorasick, normalize_text
+from utils.geo_util import haversine_distance
+
+logger = logging.getLogger(__name__)
+
+# Nesting depth per administrative level; deeper is more specific
+_LEVEL_DEPTH = {
+    "region": 0,
+    "province": 1,
+    "city": 2,
+    "municipality": 2,
+    "district": 3,
+    "barangay": 4,
+    "area": 4,
+}
+
+# Below this a geocode is ambiguous and the patient is asked to clarify
+GEOCODE_MIN_CONFIDENCE = float(os.getenv("GEOCODE_MIN_CONFIDENCE", "0.6"))
+
+# Candidates this close together are the same place for routing purposes
+_CLUSTER_KM = 3.0
+
+_MAX_CANDIDATES = 5
+
+
+class Geocode(NamedTuple):
+    place: dict | None       # most likely place; None if no place was mentioned
+    confidence: float        # 0..1
+    candidates: list[dict]   # competing places, most likely first; empty when resolved
+
+    @property
+    def resolved(self) -> bool:
+        return self.place is not None and self.confidence >= GEOCODE_MIN_CONFIDENCE
+
+    @property
+    def coordinates(self) -> tuple[float, float] | None:
+        return (self.place["lat"], self.place["lng"]) if self.resolved else None
+
+
+class _Candidate(NamedTuple):
+    place: dict
+    depth: int
+    ancestors: frozenset[str]
+
+
+class _Name(NamedTuple):
+    """Every place carrying one (normalized) name — homonyms share it."""
+    candidates: list[_Candidate]
+    ids: frozenset[str]
+    deepest: int
+
+
+def _names(place: dict) -> list[str]:
+    names = [place["name"], *place.get("aliases", [])]
+    if place["level"] == "city" and not place["name"].lower().endswith("city"):
+        names += [f"{place['name']} City", f"City of {place['name']}"]
+    return names
+
+
+def _weight(place: dict) -> int:
+    return place.get("population") or 1
+
+
+class Gazetteer:
+    """
+    Compiled gazetteer. Raises ValueError on duplicate ids, unknown levels
+    or parents that do not exist.
+    """
+
+    def __init__(self, places: list[dict]):
+        self.places = places
+        self._by_id: dict[str, dict] = {}
+        for place in places:
+            if place["id"] in self._by_id:
+                raise ValueError(f"Duplicate place id: {place['id']}")
+            if place["level"] not in _LEVEL_DEPTH:
+                raise ValueError(f"Place {place['id']}: unknown level '{place['level']}'")
+            self._by_id[place["id"]] = place
+
+        # Ancestor chains, nearest first
+        self._chains: dict[str, list[dict]] = {}
+        for place in places:
+            chain, parent_id = [], place.get("parent")
+            while parent_id:
+                parent = self._by_id.get(parent_id)
+                if parent is None:
+                    raise ValueError(f"Place {place['id']}: unknown parent '{parent_id}'")
+                if parent is place or len(chain) > len(_LEVEL_DEPTH):
+                    raise ValueError(f"Place {place['id']}: parent cycle")
+                chain.append(parent)
+                parent_id = parent.get("parent")
+            self._chains[place["id"]] = chain
+        self._ancestors = {
+            place_id: frozenset(p["id"] for p in chain) for place_id, chain in self._chains.items()
+        }
+
+        # Normalized name → every place carrying it (homonyms share an entry)
+        homonyms: dict[str, list[_Candidate]] = {}
+        for place in places:
+            candidate = _Candidate(place, _LEVEL_DEPTH[place["level"]], self._ancestors[place["id"]])
+            for name in {normalize_text(name) for name in _names(place)} - {""}:
+                homonyms.setdefault(name, []).append(candidate)
+        self._matcher = AhoCorasick({
+            name: _Name(candidates, frozenset(c.place["id"] for c in candidates), max(c.depth for c in candidates))
+            for name, candidates in homonyms.items()
+        })
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def label(self, place: dict) -> str:
+        """
+        Display name with the places containing it — 'Santa Cruz, Laguna',
+        'San Juan, Metro Manila' — naming the region only outside provinces.
+        """
+        chain = self._chains[place["id"]]
+        in_province = any(p["level"] == "province" for p in chain)
+        return ", ".join([place["name"]] + [
+            p["name"] for p in chain if p["level"] != "region" or not in_province
+        ])
+
+    def _mentions(self, text: str) -> list[_Name]:
+        """Distinct place names mentioned, dropping names nested inside longer ones."""
+        matches = sorted(self._matcher.iter_normalized(text), key=lambda m: (m.start, -m.end))
+        mentions: dict[str, _Name] = {}
+        covered_until = -1
+        for match in matches:
+            if match.end <= covered_until:
+                continue  # inside a longer mention ("manila" in "metro manila")
+            covered_until = match.end
+            mentions[match.pattern] = match.payload
+        return list(mentions.values())
+
+    def geocode(self, text: str | None) -> Geocode:
+        """Resolves the place mentioned in text — a location field or a whole message."""
+        mentions = self._mentions(normalize_text(text or ""))
+        if not mentions:
+            return Geocode(None, 0.0, [])
+
+        # Score each candidate against the other mentions: named ancestors
+        # support it, while a mention naming only larger areas that do not
+        # contain it contradicts it ("Poblacion" elsewhere vs. "..., Makati").
+        # Common names have thousands of homonyms, so other mentions are
+        # compared by their precomputed id set and deepest level.
+        scored: list[list[tuple[int, int, dict]]] = []  # per mention: (support, depth, place)
+        for i, mention in enumerate(mentions):
+            others = [(m.ids, m.deepest) for m in mentions[:i] + mentions[i + 1:]]
+            viable = []
+            for place, depth, ancestors in mention.candidates:
+                support = 0
+                for ids, deepest in others:
+                    if not ancestors.isdisjoint(ids):
+                        support += 1
+                    elif deepest < depth:
+                        break
+                else:
+                    viable.append((support, depth, place))
+            scored.append(viable)
+
+        if not any(scored):  # every reading contradicts another — ignore context
+            scored = [[(0, c.depth, c.place) for c in mention.candidates] for mention in mentions]
+
+        # The best-supported, most specific mention(s) name the place; within
+        # a mention, homonyms with less support drop out
+        keys = [max(viable, key=lambda v: v[:2])[:2] if viable else None for viable in scored]
+        best_key = max(key for key in keys if key)
+        tier = sorted(
+            (
+                (i, place)
+                for i, viable in enumerate(scored) if keys[i] == best_key
+                for support, _, place in viable if support == best_key[0]
+            ),
+            key=lambda entry: -_weight(entry[1]),
+        )
+        unique: dict[str, tuple[int, dict]] = {}  # the same place named twice ("BGC ... Bonifacio Global City")
+        for i, place in tier:
+            unique.setdefault(place["id"], (i, place))
+        tier = list(unique.values())
+        place = tier[0][1]
+
+        if len(tier) == 1:
+            return Geocode(place, 1.0, [])
+
+        if all(
+            haversine_distance(place["lat"], place["lng"], other["lat"], other["lng"]) <= _CLUSTER_KM
+            for _, other in tier[1:]
+        ):
+            return Geocode(place, 0.9, [])
+
+        # Homonyms of one mention compete by population; several distinct
+        # places named at the same level split the confidence between them
+        mention = tier[0][0]
+        rivals = [p for m, p in tier if m == mention]
+        share = _weight(place) / sum(_weight(p) for p in rivals)
+        confidence = round(share / len({m for m, _ in tier}), 2)
+
+        candidates = [] if confidence >= GEOCODE_MIN_CONFIDENCE else [p for _, p in tier[:_MAX_CANDIDATES]]
+        return Geocode(place, confidence, candidates)
+
+
+def load_gazetteer(path: str | Path) -> Gazetteer:
+    gazetteer = Gazetteer(read_records(path, "places"))
+    logger.info("Gazetteer loaded from %s: %d places", path, len(gazetteer))
+    return gazetteer
+
+
+GAZETTEER = load_gazetteer(os.getenv("GAZETTEER_PATH") or Path(__file__).with_name("gazetteer_ph.csv"))
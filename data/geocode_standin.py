@@ -0,0 +1,144 @@
+"""
+Local stand-in for the geocoding provider — serves the contract documented in
+data/geocoder.py from the gazetteer, with injectable latency and failures,
+so the geocoder can be exercised (tests, benchmarks, demos) without network
+access or API keys.
+
+    python -m data.geocode_standin --port 8765 --latency-ms 80 --fail-rate 0.05
+    GEOCODER_URL=http://127.0.0.1:8765 uvicorn main:app --reload
+
+In-process:
+
+    server, url = start_standin(latency_ms=50)
+    ...
+    server.shutdown()
+"""
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from data.gazetteer import GAZETTEER, Gazetteer
+
+logger = logging.getLogger(__name__)
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], gazetteer: Gazetteer, latency_ms: float, fail_rate: float):
+        super().__init__(address, _Handler)
+        self.gazetteer = gazetteer
+        self.latency_ms = latency_ms
+        self.fail_rate = fail_rate
+        self.requests = 0
+        self.queries = 0
+        self._rng = random.Random()
+
+    def results(self, query: str) -> list[dict]:
+        geocode = self.gazetteer.geocode(query)
+        if geocode.place is None:
+            return []
+        places = [geocode.place] + [p for p in geocode.candidates if p is not geocode.place]
+        return [
+            {
+                "id": place["id"],
+                "name": place["name"],
+                "label": self.gazetteer.label(place),
+                "level": place["level"],
+                "lat": place["lat"],
+                "lng": place["lng"],
+                "confidence": geocode.confidence if place is geocode.place else 0.0,
+            }
+            for place in places
+        ]
+
+    def should_fail(self) -> bool:
+        return self._rng.random() < self.fail_rate
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StandinServer
+
+    def _reply(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _serve(self, queries: list[str] | None, batch: bool) -> None:
+        server = self.server
+        server.requests += 1
+        time.sleep(server.latency_ms / 1000)
+        if queries is None:
+            self._reply(400, {"error": "missing query"})
+        elif server.should_fail():
+            self._reply(503, {"error": "injected failure"})
+        else:
+            server.queries += len(queries)
+            results = [server.results(q) for q in queries]
+            self._reply(200, {"results": results if batch else results[0]})
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._reply(200, {"status": "ok"})
+        elif url.path == "/geocode":
+            self._serve(parse_qs(url.query).get("q"), batch=False)
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        if urlparse(self.path).path != "/geocode/batch":
+            self._reply(404, {"error": "not found"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            queries = [str(q) for q in body["queries"]]
+        except (ValueError, KeyError, TypeError):
+            queries = None
+        self._serve(queries, batch=True)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def start_standin(
+    port: int = 0,
+    latency_ms: float = 0.0,
+    fail_rate: float = 0.0,
+    gazetteer: Gazetteer = GAZETTEER,
+) -> tuple[StandinServer, str]:
+    """Serves in a background thread; returns the server and its base URL (port 0 = any free port)."""
+    server = StandinServer(("127.0.0.1", port), gazetteer, latency_ms, fail_rate)
+    threading.Thread(target=server.serve_forever, name="geocode-standin", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the geocoding provider.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every request")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered 503")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    server = StandinServer(("127.0.0.1", args.port), GAZETTEER, args.latency_ms, args.fail_rate)
+    logger.info("Geocoding stand-in on http://127.0.0.1:%d", args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+Geocoding for MediRoute AI — an external geocoding provider behind a cache,
+with the offline gazetteer (data/gazetteer.py) as the fallback.
+
+    geocode = await GEOCODER.geocode("Brgy. San Isidro, Makati")
+    geocodes = await GEOCODER.geocode_many(addresses)
+
+Without GEOCODER_URL only the gazetteer is used. With it, lookups go to the
+provider, and:
+- results are cached per normalized query ("BGC, Taguig" = "bgc taguig")
+  in an LRU cache whose entries expire after GEOCODER_CACHE_TTL_SECONDS
+- concurrent lookups of the same query share one provider request
+- at most GEOCODER_MAX_CONCURRENCY provider requests are in flight
+- geocode_many() sends the uncached queries in batches of GEOCODER_BATCH_SIZE
+- a provider that errors or takes longer than GEOCODER_TIMEOUT_SECONDS
+  is answered from the gazetteer, and is skipped for GEOCODER_RETRY_SECONDS
+  after a failure so an outage does not cost a timeout per lookup
+
+Provider contract (HttpGeocodingProvider; data/geocode_standin.py serves it
+locally) — results best first, each {name, label, level, lat, lng, confidence}:
+
+    GET  /geocode?q=<text>                      → {"results": [...]}
+    POST /geocode/batch {"queries": [<text>]}   → {"results": [[...], ...]}
+"""
+import asyncio
+import logging
+import os
+import time
+
+from typing import Protocol
+
+import httpx
+
+from data.gazetteer import GAZETTEER, GEOCODE_MIN_CONFIDENCE, Gazetteer, Geocode
+from utils.aho_corasick_util import normalize_text
+from utils.cache_util import LRUCache
+
+logger = logging.getLogger(__name__)
+
+_MAX_CANDIDATES = 5
+
+_UNRESOLVED = Geocode(None, 0.0, [])
+
+
+# ── Providers ─────────────────────────────────────────────────────────────────
+
+class GeocodingProvider(Protocol):
+    async def geocode_many(self, queries: list[str]) -> list[list[dict]]: ...
+    async def aclose(self) -> None: ...
+
+
+class HttpGeocodingProvider:
+    """Geocoding API client over HTTP with pooled keep-alive connections."""
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str | None = None,
+        timeout_seconds: float = 2.0,
+        max_connections: int = 8,
+    ):
+        self._base_url = base_url.rstrip("/")
+        self._headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._timeout_seconds = timeout_seconds
+        self._max_connections = max_connections
+        self._client: httpx.AsyncClient | None = None
+
+    def _http(self) -> httpx.AsyncClient:
+        # Created on first use, inside the event loop that serves requests
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self._base_url,
+                headers=self._headers,
+                timeout=self._timeout_seconds,
+                limits=httpx.Limits(
+                    max_connections=self._max_connections,
+                    max_keepalive_connections=self._max_connections,
+                ),
+            )
+        return self._client
+
+    async def geocode_many(self, queries: list[str]) -> list[list[dict]]:
+        if len(queries) == 1:
+            response = await self._http().get("/geocode", params={"q": queries[0]})
+            response.raise_for_status()
+            return [response.json()["results"]]
+
+        response = await self._http().post("/geocode/batch", json={"queries": queries})
+        response.raise_for_status()
+        results = response.json()["results"]
+        if len(results) != len(queries):
+            raise ValueError(f"Geocoding batch: {len(results)} results for {len(queries)} queries")
+        return results
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def _from_results(results: list[dict]) -> Geocode | None:
+    """Provider results as a Geocode; None when the provider found nothing."""
+    if not results:
+        return None
+    places = [
+        {
+            "id": r.get("id") or f"geo:{float(r['lat']):.5f},{float(r['lng']):.5f}",
+            "name": r["name"],
+            "label": r.get("label") or r["name"],
+            "level": r.get("level", "area"),
+            "lat": float(r["lat"]),
+            "lng": float(r["lng"]),
+        }
+        for r in results
+    ]
+    confidence = float(results[0].get("confidence", 1.0))
+    candidates = [] if confidence >= GEOCODE_MIN_CONFIDENCE else places[:_MAX_CANDIDATES]
+    return Geocode(places[0], confidence, candidates)
+
+
+# ── Geocoder ──────────────────────────────────────────────────────────────────
+
+class Geocoder:
+    """
+    Async front for geocoding: cache, request coalescing, bounded concurrency
+    and batching in front of an optional provider, falling back to the
+    gazetteer. With no provider, lookups are answered by the gazetteer
+    directly (it is faster than a cache lookup would save).
+    """
+
+    def __init__(
+        self,
+        gazetteer: Gazetteer,
+        provider: GeocodingProvider | None = None,
+        cache_size: int = 10_000,
+        ttl_seconds: float = 24 * 3600,
+        timeout_seconds: float = 1.0,
+        max_concurrency: int = 8,
+        batch_size: int = 50,
+        retry_seconds: float = 30.0,
+    ):
+        self._gazetteer = gazetteer
+        self._provider = provider
+        self._cache = LRUCache(cache_size, ttl_seconds)
+        self._timeout_seconds = timeout_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._batch_size = max(1, batch_size)
+        self._retry_seconds = retry_seconds
+        self._inflight: dict[str, asyncio.Future] = {}  # normalized query → pending Geocode
+        self._tasks: set[asyncio.Task] = set()
+        self._down_until = 0.0
+        self._counts = {
+            "provider_requests": 0, "provider_failures": 0, "deadline_exceeded": 0, "fallbacks": 0, "coalesced": 0,
+        }
+
+    def label(self, place: dict) -> str:
+        """Display name for a place from either source."""
+        return place.get("label") or self._gazetteer.label(place)
+
+    async def geocode(self, query: str | None) -> Geocode:
+        return (await self.geocode_many([query]))[0]
+
+    async def geocode_many(self, queries: list[str | None]) -> list[Geocode]:
+        """Geocodes for the queries, in order; duplicates are looked up once."""
+        if self._provider is None:
+            return [self._gazetteer.geocode(query) for query in queries]
+
+        keys = [normalize_text(query or "") for query in queries]
+        results: dict[str, Geocode] = {"": _UNRESOLVED}
+        pending: dict[str, asyncio.Future] = {}
+        missing: list[str] = []
+        for key in dict.fromkeys(keys):
+            if key in results:
+                continue
+            cached = self._cache.get(key)
+            if cached is not None:
+                results[key] = cached
+            elif key in self._inflight:
+                pending[key] = self._inflight[key]
+                self._counts["coalesced"] += 1
+            else:
+                missing.append(key)
+
+        if missing:
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in missing}
+            self._inflight.update(futures)
+            pending.update(futures)
+            for start in range(0, len(missing), self._batch_size):
+                batch = {key: futures[key] for key in missing[start:start + self._batch_size]}
+                # A task, so a caller giving up does not fail lookups others share
+                task = asyncio.create_task(self._fetch(batch))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+        for key, future in pending.items():
+            results[key] = await asyncio.shield(future)
+        return [results[key] for key in keys]
+
+    async def _fetch(self, futures: dict[str, asyncio.Future]) -> None:
+        keys = list(futures)
+        answers: dict[str, Geocode] = {}
+        try:
+            if time.monotonic() >= self._down_until:
+                answers = await self._ask_provider(keys)
+        finally:
+            for key, future in futures.items():
+                geocode = answers.get(key)
+                if geocode is None:
+                    self._counts["fallbacks"] += 1
+                    geocode = self._gazetteer.geocode(key)
+                if not future.done():
+                    future.set_result(geocode)
+                self._inflight.pop(key, None)
+
+    async def _ask_provider(self, keys: list[str]) -> dict[str, Geocode]:
+        """
+        Provider answers per key, within timeout_seconds of the lookup
+        overall — waiting for a concurrency slot included; empty if the
+        provider failed or could not answer in time.
+        """
+        deadline = time.monotonic() + self._timeout_seconds
+        # A task, so the answer still fills the cache after the lookup gave up on it
+        call = asyncio.create_task(self._call_provider(keys, deadline))
+        self._tasks.add(call)
+        call.add_done_callback(self._tasks.discard)
+        try:
+            return await asyncio.wait_for(asyncio.shield(call), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:    # queued or slow: the gazetteer answers now
+            self._counts["deadline_exceeded"] += 1
+            return {}
+
+    async def _call_provider(self, keys: list[str], deadline: float) -> dict[str, Geocode]:
+        """Cached provider answers per key; only the provider call itself is timed and counts as a failure."""
+        async with self._semaphore:
+            # Went down, or the lookup gave up, while this batch waited for a slot
+            if time.monotonic() < self._down_until or time.monotonic() >= deadline:
+                return {}
+            self._counts["provider_requests"] += 1
+            try:
+                batches = await asyncio.wait_for(
+                    self._provider.geocode_many(keys), self._timeout_seconds
+                )
+            except Exception as e:  # timeout, HTTP or payload error — the gazetteer answers
+                self._counts["provider_failures"] += 1
+                self._down_until = time.monotonic() + self._retry_seconds
+                logger.warning(
+                    "Geocoding provider failed (%s) — using the gazetteer for %.0f s",
+                    e.__class__.__name__, self._retry_seconds
+                )
+                return {}
+
+        answers = {}
+        for key, results in zip(keys, batches):
+            # Nothing found by the provider: the gazetteer knows local names
+            # and aliases it may not ("BGC"), so it gets a say
+            geocode = _from_results(results) or self._gazetteer.geocode(key)
+            self._cache.put(key, geocode)
+            answers[key] = geocode
+        return answers
+
+    async def aclose(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._provider is not None:
+            await self._provider.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "provider": self._provider.__class__.__name__ if self._provider else None,
+            "provider_down": time.monotonic() < self._down_until,
+            **self._counts,
+            "cache": self._cache.stats(),
+        }
+
+
+def open_geocoder() -> Geocoder:
+    """The geocoder configured by GEOCODER_* (gazetteer only without GEOCODER_URL)."""
+    url = os.getenv("GEOCODER_URL", "").strip()
+    max_concurrency = int(os.getenv("GEOCODER_MAX_CONCURRENCY", "8"))
+    provider = HttpGeocodingProvider(
+        url,
+        api_key=os.getenv("GEOCODER_API_KEY") or None,
+        timeout_seconds=float(os.getenv("GEOCODER_TIMEOUT_SECONDS", "1.0")),
+        max_connections=max_concurrency,
+    ) if url else None
+    return Geocoder(
+        GAZETTEER,
+        provider,
+        cache_size=int(os.getenv("GEOCODER_CACHE_SIZE", "10000")),
+        ttl_seconds=float(os.getenv("GEOCODER_CACHE_TTL_SECONDS", str(24 * 3600))),
+        timeout_seconds=float(os.getenv("GEOCODER_TIMEOUT_SECONDS", "1.0")),
+        max_concurrency=max_concurrency,
+        batch_size=int(os.getenv("GEOCODER_BATCH_SIZE", "50")),
+        retry_seconds=float(os.getenv("GEOCODER_RETRY_SECONDS", "30")),
+    )
+
+
+GEOCODER = open_geocoder()
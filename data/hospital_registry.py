@@ -0,0 +1,146 @@
+"""Hospital registry for MediRoute AI — owns the hospital records and their lookup indexes."""
+from typing import NamedTuple
+
+from utils.aho_corasick_util import normalize_text
+from utils.fuzzy_util import TrigramIndex, FuzzyMatch, trigrams
+
+# Fuzzy name matches are accepted automatically only when confident and
+# clearly ahead of the next hospital ("general hospital" is not a name)
+NAME_MATCH_THRESHOLD = 0.65
+NAME_MATCH_MARGIN = 0.25
+# Lower bar for "did you mean" suggestions
+NAME_SUGGESTION_THRESHOLD = 0.4
+# A query word matches a word of the hospital's names at this trigram overlap
+# (misspellings pass, "qc" vs "bgc" does not)
+NAME_WORD_THRESHOLD = 0.5
+# Words that say nothing about which hospital or branch is meant
+GENERIC_NAME_WORDS = frozenset({
+    "the", "of", "and", "st", "saint", "hospital", "hosp", "medical", "center", "centre",
+    "general", "ng", "sa",
+})
+
+
+class NameResolution(NamedTuple):
+    hospital: dict | None       # accepted match, or None
+    confidence: float           # 1.0 for exact name/alias matches
+    candidates: list[FuzzyMatch]
+
+
+class HospitalRegistry:
+    """
+    Hospital records plus dict indexes built once, so every lookup the agents
+    make is O(1). Add new indexes in _build_indexes().
+
+    Names and aliases are matched after normalize_text() (case, punctuation and
+    apostrophes ignored), so "St Lukes BGC" finds "St. Luke's Medical Center - BGC";
+    resolve_name() falls back to a trigram index for misspellings.
+    """
+
+    def __init__(self, hospitals: list[dict]):
+        self._hospitals = list(hospitals)
+        self._build_indexes()
+
+    def _build_indexes(self) -> None:
+        self._by_id: dict[str, dict] = {}
+        self._by_name: dict[str, dict] = {}
+        self._by_insurer: dict[str, list[dict]] = {}
+        self._by_emergency_type: dict[str, list[dict]] = {}
+        self._by_insurer_and_type: dict[tuple[str, str], list[dict]] = {}
+        self._name_trigrams = TrigramIndex()
+        # hospital id → trigrams of each word of its name and aliases
+        self._name_words: dict[str, list[frozenset[str]]] = {}
+
+        for hospital in self._hospitals:
+            if hospital["id"] in self._by_id:
+                raise ValueError(f"Duplicate hospital id: {hospital['id']}")
+            self._by_id[hospital["id"]] = hospital
+
+            for name in [hospital["name"], *hospital.get("aliases", [])]:
+                key = normalize_text(name)
+                existing = self._by_name.setdefault(key, hospital)
+                if existing is not hospital:
+                    raise ValueError(
+                        f"Hospital name/alias '{name}' of {hospital['id']} "
+                        f"already refers to {existing['id']}"
+                    )
+                self._name_trigrams.add(name, hospital)
+                self._name_words.setdefault(hospital["id"], []).extend(
+                    trigrams(word) for word in key.split()
+                )
+
+            for emergency_type in hospital["emergency_types_supported"]:
+                self._by_emergency_type.setdefault(emergency_type, []).append(hospital)
+            for insurer in hospital["insurance_accepted"]:
+                self._by_insurer.setdefault(insurer, []).append(hospital)
+                for emergency_type in hospital["emergency_types_supported"]:
+                    self._by_insurer_and_type.setdefault((insurer, emergency_type), []).append(hospital)
+
+    def __len__(self) -> int:
+        return len(self._hospitals)
+
+    def __iter__(self):
+        return iter(self._hospitals)
+
+    @property
+    def hospitals(self) -> list[dict]:
+        """All records, in registry order."""
+        return self._hospitals
+
+    def get(self, hospital_id: str) -> dict | None:
+        return self._by_id.get(hospital_id)
+
+    def find_by_name(self, name: str) -> dict | None:
+        """Exact match on the normalized name or one of the aliases."""
+        return self._by_name.get(normalize_text(name)) if name else None
+
+    def resolve_name(self, name: str) -> NameResolution:
+        """
+        Exact name/alias match, else the best fuzzy match if it clears
+        NAME_MATCH_THRESHOLD, no other hospital scores within
+        NAME_MATCH_MARGIN of it and every distinctive query word is found in
+        its names ("St Lukes QC" is not St. Luke's BGC, however close the
+        score). Candidates are returned either way, for suggestions.
+        """
+        exact = self.find_by_name(name)
+        if exact:
+            return NameResolution(exact, 1.0, [])
+        if not name:
+            return NameResolution(None, 0.0, [])
+
+        # High thresholds keep these searches cheap; the low suggestion bar is
+        # only paid when nothing is accepted
+        best = self._name_trigrams.search(name, min_score=NAME_MATCH_THRESHOLD, limit=1)
+        if best:
+            contenders = self._name_trigrams.search(
+                name, min_score=best[0].score - NAME_MATCH_MARGIN, limit=3
+            )
+            accepted = best[0].payload
+            if len(contenders) > 1 or self._unmatched_words(name, accepted):
+                accepted = None
+            return NameResolution(accepted, best[0].score, contenders)
+
+        candidates = self._name_trigrams.search(name, min_score=NAME_SUGGESTION_THRESHOLD, limit=3)
+        return NameResolution(None, candidates[0].score if candidates else 0.0, candidates)
+
+    def _unmatched_words(self, name: str, hospital: dict) -> list[str]:
+        """Distinctive words of the query (a branch, a place) not found in the hospital's names."""
+        words = self._name_words[hospital["id"]]
+        unmatched = []
+        for word in normalize_text(name).split():
+            if word in GENERIC_NAME_WORDS:
+                continue
+            grams = trigrams(word)
+            if not any(2 * len(grams & w) / (len(grams) + len(w)) >= NAME_WORD_THRESHOLD for w in words):
+                unmatched.append(word)
+        return unmatched
+
+    def accepting(self, insurer: str) -> list[dict]:
+        return self._by_insurer.get(insurer, [])
+
+    def supporting(self, emergency_type: str) -> list[dict]:
+        return self._by_emergency_type.get(emergency_type, [])
+
+    def eligible(self, insurer: str, emergency_type: str) -> list[dict]:
+        """Hospitals that accept the insurer and support the emergency type."""
+        return self._by_insurer_and_type.get((insurer, emergency_type), [])
+
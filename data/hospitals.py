@@ -4,6 +4,7 @@ HOSPITALS = [
     {
         "id": "H001",
         "name": "St. Luke's Medical Center - BGC",
+        "aliases": ["St. Luke's BGC", "SLMC BGC", "St. Luke's Global City"],
         "address": (
             "Rizal Drive cor. 32nd St. and 5th Ave, "
             "Bonifacio Global City, Taguig, Metro Manila"
@@ -35,6 +36,7 @@ HOSPITALS = [
     {
         "id": "H002",
         "name": "Makati Medical Center",
+        "aliases": ["Makati Med", "MMC"],
         "address": "2 Amorsolo St, Legazpi Village, Makati, Metro Manila",
         "lat": 14.5567,
         "lng": 121.0150,
@@ -62,6 +64,7 @@ HOSPITALS = [
     {
         "id": "H003",
         "name": "Philippine General Hospital",
+        "aliases": ["PGH"],
         "address": "Taft Ave, Ermita, Manila, Metro Manila",
         "lat": 14.5765,
         "lng": 120.9822,
@@ -89,6 +92,7 @@ HOSPITALS = [
     {
         "id": "H004",
         "name": "The Medical City - Ortigas",
+        "aliases": ["The Medical City", "Medical City Ortigas", "TMC"],
         "address": "Ortigas Ave, Pasig, Metro Manila",
         "lat": 14.5872,
         "lng": 121.0674,
@@ -116,6 +120,7 @@ HOSPITALS = [
     {
         "id": "H005",
         "name": "Lung Center of the Philippines",
+        "aliases": ["Lung Center", "LCP"],
         "address": "Quezon Ave, Diliman, Quezon City, Metro Manila",
         "lat": 14.6488,
         "lng": 121.0498,
@@ -141,6 +146,7 @@ HOSPITALS = [
     {
         "id": "H006",
         "name": "National Kidney and Transplant Institute",
+        "aliases": ["NKTI", "National Kidney Institute"],
         "address": "East Ave, Diliman, Quezon City, Metro Manila",
         "lat": 14.6476,
         "lng": 121.0436,
@@ -163,6 +169,7 @@ HOSPITALS = [
     {
         "id": "H007",
         "name": "Quezon City General Hospital",
+        "aliases": ["QC General Hospital", "QCGH"],
         "address": "Seminary Rd, Diliman, Quezon City, Metro Manila",
         "lat": 14.6412,
         "lng": 121.0551,
@@ -189,6 +196,7 @@ HOSPITALS = [
     {
         "id": "H008",
         "name": "Asian Hospital and Medical Center",
+        "aliases": ["Asian Hospital", "AHMC"],
         "address": (
             "2205 Civic Drive, Filinvest Corporate City, "
             "Alabang, Muntinlupa"
@@ -219,6 +227,7 @@ HOSPITALS = [
     {
         "id": "H009",
         "name": "Ospital ng Maynila Medical Center",
+        "aliases": ["Ospital ng Maynila", "OMMC"],
         "address": "Roxas Blvd, Malate, Manila, Metro Manila",
         "lat": 14.5649,
         "lng": 120.9904,
@@ -243,6 +252,7 @@ HOSPITALS = [
     {
         "id": "H010",
         "name": "Cardinal Santos Medical Center",
+        "aliases": ["Cardinal Santos", "CSMC"],
         "address": "10 Wilson St, Greenhills, San Juan, Metro Manila",
         "lat": 14.5997,
         "lng": 121.0382,
@@ -1,10 +1,9 @@
 """Mock insurance claims history database for MediRoute AI hackathon."""
 
-from datetime import date
-
 # Mock claims history - tracks all claims made by patients within their policy period
 # Each claim has a date, amount, and description
 # The total of claims within the policy year is subtracted from max_benefit_limit
+# (indexed and summed by data/claims_ledger.py)
 
 INSURANCE_CLAIMS_HISTORY = [
     # Juan dela Cruz - Policy MAX-2024-00123
@@ -90,74 +89,3 @@ INSURANCE_CLAIMS_HISTORY = [
         "description": "Emergency appendectomy"
     },
 ]
-
-
-def get_claims_for_policy(policy_number: str, valid_from: str, valid_until: str) -> list[dict]:
-    """
-    Get all approved claims for a policy within its current validity period.
-    
-    Args:
-        policy_number: The insurance policy number
-        valid_from: Policy validity start date (ISO format: YYYY-MM-DD)
-        valid_until: Policy validity end date (ISO format: YYYY-MM-DD)
-    
-    Returns:
-        List of claim records within the policy period
-    """
-    from_date = date.fromisoformat(valid_from)
-    until_date = date.fromisoformat(valid_until)
-    
-    claims = []
-    for claim in INSURANCE_CLAIMS_HISTORY:
-        if claim["policy_number"] != policy_number:
-            continue
-        
-        if claim["status"] != "APPROVED":
-            continue
-            
-        claim_date = date.fromisoformat(claim["claim_date"])
-        
-        # Only include claims within the current policy period
-        if from_date <= claim_date <= until_date:
-            claims.append(claim)
-    
-    return claims
-
-
-def calculate_used_benefits(policy_number: str, valid_from: str, valid_until: str) -> float:
-    """
-    Calculate total approved claim amounts for a policy within its current validity period.
-    
-    Args:
-        policy_number: The insurance policy number
-        valid_from: Policy validity start date (ISO format: YYYY-MM-DD)
-        valid_until: Policy validity end date (ISO format: YYYY-MM-DD)
-    
-    Returns:
-        Total amount of approved claims in PHP
-    """
-    claims = get_claims_for_policy(policy_number, valid_from, valid_until)
-    return sum(claim["claim_amount"] for claim in claims)
-
-
-def calculate_remaining_benefits(
-    policy_number: str, 
-    max_benefit_limit: float,
-    valid_from: str, 
-    valid_until: str
-) -> float:
-    """
-    Calculate remaining benefit limit for a policy.
-    
-    Args:
-        policy_number: The insurance policy number
-        max_benefit_limit: Maximum benefit limit for the policy period
-        valid_from: Policy validity start date (ISO format: YYYY-MM-DD)
-        valid_until: Policy validity end date (ISO format: YYYY-MM-DD)
-    
-    Returns:
-        Remaining benefit amount in PHP
-    """
-    used = calculate_used_benefits(policy_number, valid_from, valid_until)
-    remaining = max_benefit_limit - used
-    return max(0.0, remaining)  # Cannot be negative
@@ -0,0 +1,111 @@
+"""
+Bulk loader for MediRoute AI reference data — imports CSV/JSON files into the repositories.
+
+    python -m data.loader --db mediroute.db --hospitals hospitals.csv --doctors doctors.json
+    python -m data.loader --db mediroute.db --mock      # the bundled mock data
+
+JSON files hold a list of records shaped like the mock data in data/*.py.
+CSV files have one record per row; list/dict fields (aliases, capabilities,
+dependents, shifts, ...) are JSON in their cell, and empty cells are omitted.
+"""
+import argparse
+import csv
+import json
+import logging
+
+from pathlib import Path
+from typing import Callable
+
+from data.repositories import Repositories, in_memory_repositories, sqlite_repositories
+
+logger = logging.getLogger(__name__)
+
+_KINDS = ("hospitals", "doctors", "policies", "claims")
+
+
+def _bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "y")
+
+
+# CSV cell converters per kind; unlisted fields stay strings
+_CSV_FIELDS: dict[str, dict[str, Callable[[str], object]]] = {
+    "hospitals": {
+        "lat": float, "lng": float, "aliases": json.loads, "capabilities": json.loads,
+        "insurance_accepted": json.loads, "emergency_types_supported": json.loads,
+    },
+    "doctors": {"available_24h": _bool, "shifts": json.loads},
+    "policies": {"max_benefit_limit": float, "room_and_board_limit": float, "dependents": json.loads},
+    "claims": {"claim_amount": float},
+    "places": {"lat": float, "lng": float, "population": int, "aliases": json.loads},
+}
+
+_REQUIRED_FIELDS = {
+    "hospitals": ("id", "name", "lat", "lng"),
+    "doctors": ("id", "hospital_id", "specialization", "available_24h"),
+    "policies": ("policy_number", "full_name", "status", "valid_from", "valid_until"),
+    "claims": ("claim_id", "policy_number", "claim_date", "claim_amount", "status"),
+    "places": ("id", "name", "level", "lat", "lng"),
+}
+
+
+def read_records(path: str | Path, kind: str) -> list[dict]:
+    """Records of the given kind from a .json or .csv file, validated."""
+    path = Path(path)
+    if path.suffix.lower() == ".json":
+        records = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(records, list):
+            raise ValueError(f"{path}: expected a JSON list of {kind}")
+    elif path.suffix.lower() == ".csv":
+        converters = _CSV_FIELDS[kind]
+        with path.open(newline="", encoding="utf-8") as f:
+            records = [
+                {
+                    field: converters.get(field, str)(value)
+                    for field, value in row.items() if value not in (None, "")
+                }
+                for row in csv.DictReader(f)
+            ]
+    else:
+        raise ValueError(f"{path}: unsupported file type (use .csv or .json)")
+
+    for i, record in enumerate(records, 1):
+        missing = [f for f in _REQUIRED_FIELDS[kind] if f not in record]
+        if missing:
+            raise ValueError(f"{path}: {kind} record {i} is missing {', '.join(missing)}")
+    return records
+
+
+def load(repositories: Repositories, kind: str, records: list[dict], batch_size: int = 10_000) -> int:
+    """Upserts records in batches (one transaction each); returns how many were written."""
+    repository = getattr(repositories, kind)
+    total = 0
+    for start in range(0, len(records), batch_size):
+        total += repository.upsert(records[start:start + batch_size])
+    logger.info("Loaded %d %s", total, kind)
+    return total
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Import reference data into a MediRoute SQLite database.")
+    parser.add_argument("--db", required=True, help="SQLite file (DATA_DB_PATH)")
+    parser.add_argument("--mock", action="store_true", help="import the bundled mock data")
+    for kind in _KINDS:
+        parser.add_argument(f"--{kind}", metavar="FILE", help=f"{kind} as .csv or .json")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    repositories = sqlite_repositories(args.db)
+
+    if args.mock:
+        mock = in_memory_repositories()
+        for kind in _KINDS:
+            load(repositories, kind, getattr(mock, kind).list_all())
+
+    for kind in _KINDS:
+        path = getattr(args, kind)
+        if path:
+            load(repositories, kind, read_records(path, kind))
+
+
+if __name__ == "__main__":
+    main()
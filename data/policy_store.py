@@ -0,0 +1,77 @@
+"""Insurance policy store for MediRoute AI — cached policy and member lookups over the policy repository."""
+import os
+
+from typing import Any, Callable, Iterable
+
+from data.repositories import REPOSITORIES, PolicyMatch, PolicyRepository
+from utils.aho_corasick_util import normalize_text
+from utils.cache_util import LRUCache
+
+
+class PolicyStore:
+    """
+    Policy lookups by policy number and by member name (+ date of birth),
+    principals and dependents alike, through an in-process LRU cache in front
+    of the policy repository. upsert() clears this process's cache; writes by
+    another process (the bulk loader, another worker) are seen once entries
+    expire: records after ttl_seconds, "not found" after the much shorter
+    miss_ttl_seconds, so a member just added is found almost at once.
+
+    With the SQLite backend a miss is an indexed query of tens of
+    microseconds; a cache hit takes a few.
+    """
+
+    def __init__(
+        self,
+        repository: PolicyRepository,
+        cache_size: int = 100_000,
+        ttl_seconds: float = 60.0,
+        miss_ttl_seconds: float = 5.0,
+    ):
+        self._repository = repository
+        self._cache = LRUCache(cache_size, ttl_seconds)
+        self._misses = LRUCache(cache_size, miss_ttl_seconds)
+
+    def upsert(self, records: Iterable[dict]) -> int:
+        count = self._repository.upsert(records)
+        self._cache.clear()
+        self._misses.clear()
+        return count
+
+    def _cached(self, key: tuple, load: Callable[[], Any]) -> Any:
+        """The cached value for key, else load() — kept in the cache for its hit or miss TTL."""
+        value = self._cache.get(key, key)
+        if value is key:
+            value = self._misses.get(key, key)
+        if value is key:
+            value = load()
+            (self._cache if value else self._misses).put(key, value)
+        return value
+
+    def get(self, policy_number: str) -> dict | None:
+        return self._cached(("policy", policy_number), lambda: self._repository.get(policy_number))
+
+    def find_members(self, full_name: str, date_of_birth: str | None = None) -> tuple[PolicyMatch, ...]:
+        """
+        Every policy the person is on, as principal or dependent. With a date
+        of birth, members recorded with a different one are excluded (members
+        with no recorded date of birth still match).
+        """
+        name_key = normalize_text(full_name or "")
+        if not name_key:
+            return ()
+        return self._cached(
+            ("member", name_key, date_of_birth),
+            lambda: self._repository.find_members(full_name, date_of_birth),
+        )
+
+    def cache_stats(self) -> dict:
+        return {**self._cache.stats(), "not_found": self._misses.stats()}
+
+
+POLICY_STORE = PolicyStore(
+    REPOSITORIES.policies,
+    int(os.getenv("POLICY_CACHE_SIZE", "100000")),
+    ttl_seconds=float(os.getenv("POLICY_CACHE_TTL_SECONDS", "60")),
+    miss_ttl_seconds=float(os.getenv("POLICY_CACHE_MISS_TTL_SECONDS", "5")),
+)
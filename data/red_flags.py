@@ -0,0 +1,79 @@
+"""Curated red-flag lexicon for rule-based triage in MediRoute AI."""
+
+# A phrase marks the case provisionally CRITICAL: it raises the LLM scheduling
+# priority and starts speculative matching, but the classification agent's LLM
+# severity stands. classification_type is the most likely emergency type for the
+# phrase, likewise only a provisional guess.
+# Phrases are matched case-insensitively on whole words, punctuation ignored, and
+# skipped when negated — keep them specific: a bare word that also reads as an
+# idiom or a history ("a stroke of luck", "fell from the stairs" last year) only
+# speculates in vain.
+RED_FLAG_LEXICON = {
+    # ── Airway / breathing ────────────────────────────────────────────────────
+    "not breathing": "RESPIRATORY",
+    "stopped breathing": "RESPIRATORY",
+    "cant breathe": "RESPIRATORY",
+    "cannot breathe": "RESPIRATORY",
+    "unable to breathe": "RESPIRATORY",
+    "is choking": "RESPIRATORY",
+    "turning blue": "RESPIRATORY",
+    "blue lips": "RESPIRATORY",
+    "gasping for air": "RESPIRATORY",
+    "hindi makahinga": "RESPIRATORY",
+    "hindi humihinga": "RESPIRATORY",
+
+    # ── Circulation / cardiac ─────────────────────────────────────────────────
+    "no pulse": "CARDIAC",
+    "cardiac arrest": "CARDIAC",
+    "heart attack": "CARDIAC",
+    "chest pain radiating": "CARDIAC",
+    "crushing chest pain": "CARDIAC",
+    "chest pain and sweating": "CARDIAC",
+
+    # ── Neurological ──────────────────────────────────────────────────────────
+    "unconscious": "NEUROLOGICAL",
+    "unresponsive": "NEUROLOGICAL",
+    "not responding": "NEUROLOGICAL",
+    "passed out": "NEUROLOGICAL",
+    "having a seizure": "NEUROLOGICAL",
+    "seizing": "NEUROLOGICAL",
+    "face drooping": "NEUROLOGICAL",
+    "slurred speech": "NEUROLOGICAL",
+    "sudden weakness on one side": "NEUROLOGICAL",
+    "having a stroke": "NEUROLOGICAL",
+    "walang malay": "NEUROLOGICAL",
+    "nawalan ng malay": "NEUROLOGICAL",
+
+    # ── Trauma ────────────────────────────────────────────────────────────────
+    "severe bleeding": "TRAUMA",
+    "heavy bleeding": "TRAUMA",
+    "bleeding heavily": "TRAUMA",
+    "wont stop bleeding": "TRAUMA",
+    "gunshot": "TRAUMA",
+    "gunshot wound": "TRAUMA",
+    "stab wound": "TRAUMA",
+    "stabbed": "TRAUMA",
+    "head injury": "TRAUMA",
+    "hit by a car": "TRAUMA",
+    "fell from a building": "TRAUMA",
+    "fell from the roof": "TRAUMA",
+    "open fracture": "TRAUMA",
+    "bone sticking out": "TRAUMA",
+    "maraming dugo": "TRAUMA",
+
+    # ── Burns ─────────────────────────────────────────────────────────────────
+    "severe burns": "BURNS",
+    "burned face": "BURNS",
+    "electrocuted": "BURNS",
+    "electrocution": "BURNS",
+    "chemical burn": "BURNS",
+
+    # ── General ───────────────────────────────────────────────────────────────
+    "anaphylaxis": "RESPIRATORY",
+    "throat swelling": "RESPIRATORY",
+    "drug overdose": "GENERAL",
+    "took an overdose": "GENERAL",
+    "poisoned": "GENERAL",
+    "vomiting blood": "GENERAL",
+    "drowning": "RESPIRATORY",
+}
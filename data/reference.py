@@ -0,0 +1,270 @@
+"""
+Reference data for MediRoute AI — versioned, immutable snapshots of the hospital
+and doctor registries, rebuilt in the background and swapped in atomically.
+
+    REFERENCE.get().hospitals.eligible(insurer, emergency_type)
+
+A graph run pins the version it started with (see agents/graph.py), so a
+reload mid-run never mixes two versions. Anything derived from the registries
+(spatial and eligibility indexes, ranking caches) is built per snapshot with
+derived() and dropped with it — a reload invalidates by version instead of
+flushing shared caches.
+"""
+import asyncio
+import contextvars
+import gc
+import logging
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from data.doctor_registry import DoctorRegistry
+from data.hospital_registry import HospitalRegistry
+from data.repositories import REPOSITORIES, off_loop, open_repositories
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class ReferenceSnapshot:
+    """
+    One version of the reference data: the registries with all their indexes,
+    plus values derived from them. Never changed once published, so readers
+    take no locks.
+    """
+
+    def __init__(self, version: int, hospitals: HospitalRegistry, doctors: DoctorRegistry):
+        self.version = version
+        self.hospitals = hospitals
+        self.doctors = doctors
+        self.created_at = time.time()
+        self._derived: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def derived(self, name: str, build: Callable[["ReferenceSnapshot"], Any]) -> Any:
+        """build(snapshot), computed at most once for this version."""
+        value = self._derived.get(name, _MISSING)
+        if value is _MISSING:
+            with self._lock:
+                value = self._derived.get(name, _MISSING)
+                if value is _MISSING:
+                    value = build(self)
+                    self._derived[name] = value
+        return value
+
+    def peek(self, name: str) -> Any:
+        """The derived value if already built for this version, else None (never builds)."""
+        return self._derived.get(name)
+
+    def retire(self) -> None:
+        """
+        Drops the derived values, the one place a snapshot may hold a
+        reference cycle, so reference counting frees the frozen snapshot once
+        no run holds it. A late reader rebuilds what it needs.
+        """
+        with self._lock:
+            self._derived = {}
+
+
+def _read_source() -> tuple[list[dict], list[dict]]:
+    """
+    Hospitals and doctors from the configured backend. A snapshot file is
+    replaced whole when rebuilt, so it is mapped anew; the old mapping stays
+    valid for whatever still reads it.
+    """
+    repositories = REPOSITORIES
+    if os.getenv("DATA_BACKEND", "memory").strip().lower() == "snapshot":
+        repositories = open_repositories()
+    return repositories.hospitals.list_all(), repositories.doctors.list_all()
+
+
+@contextmanager
+def _built_outside_collector() -> Iterator[None]:
+    """
+    Builds a snapshot with the cyclic collector paused, then freezes what is
+    alive — the snapshot above all — out of the collector's generations.
+    Otherwise the build's own allocations trigger full collections that
+    traverse every registry record and index, stalling the event loop for
+    hundreds of ms with a large roster, and so does every later one while
+    the snapshot is current or retained. gc.freeze() splices the young
+    generations into the permanent one without traversing them.
+
+    Frozen objects are only ever freed by reference counting: snapshots
+    hold no reference cycles once retired (see ReferenceSnapshot.retire()),
+    and cyclic garbage frozen along with one is limited to what the
+    process allocated during the build.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.freeze()
+        if enabled:
+            gc.enable()
+
+
+# The snapshot the current graph node runs against; unset outside graph runs
+_PINNED: contextvars.ContextVar[ReferenceSnapshot | None] = contextvars.ContextVar(
+    "reference_snapshot", default=None
+)
+
+
+class ReferenceData:
+    """
+    Holds the current ReferenceSnapshot and recently replaced ones.
+
+    reload() reads the source, builds a complete new snapshot aside — registries,
+    then every derived value registered with register() — and publishes it
+    with a single assignment, so requests never wait on a rebuild or hit a
+    cold index. An unchanged source keeps the current version; unchanged
+    parts of a changed roster are shared with the previous version.
+
+    Replaced snapshots are retained for `retention_seconds`, at most
+    `max_retained` of them, so runs pinned to them (suspended at hospital
+    selection, say) can finish on the data they started with. Snapshots are
+    kept out of the garbage collector's scans (see _built_outside_collector)
+    and retired explicitly.
+    """
+
+    def __init__(
+        self,
+        source: Callable[[], tuple[list[dict], list[dict]]] = _read_source,
+        retention_seconds: float = 30 * 60,
+        max_retained: int = 4,
+    ):
+        self._source = source
+        self._retention_seconds = retention_seconds
+        self._max_retained = max_retained
+        self._builders: dict[str, Callable[[ReferenceSnapshot], Any]] = {}
+        self._retired: dict[int, tuple[float, ReferenceSnapshot]] = {}  # version → (retired at, snapshot)
+        self._reload_lock = threading.Lock()
+        hospitals, doctors = source()
+        with _built_outside_collector():
+            self._current = self._build(1, hospitals, doctors, None)
+
+    def _build(
+        self,
+        version: int,
+        hospitals: list[dict],
+        doctors: list[dict],
+        previous: ReferenceSnapshot | None,
+    ) -> ReferenceSnapshot:
+        snapshot = ReferenceSnapshot(
+            version,
+            HospitalRegistry(hospitals),
+            previous.doctors.with_roster(doctors) if previous else DoctorRegistry(doctors),
+        )
+        for name, build in list(self._builders.items()):
+            snapshot.derived(name, build)
+        return snapshot
+
+    def current(self) -> ReferenceSnapshot:
+        return self._current
+
+    def get(self) -> ReferenceSnapshot:
+        """The snapshot pinned by the running graph node, else the current one."""
+        return _PINNED.get() or self._current
+
+    def version(self, version: int) -> ReferenceSnapshot | None:
+        """The snapshot of that version, if current or still retained."""
+        current = self._current
+        if version == current.version:
+            return current
+        retired_at, snapshot = self._retired.get(version, (0.0, None))
+        if snapshot and time.monotonic() - retired_at <= self._retention_seconds:
+            return snapshot
+        return None
+
+    @contextmanager
+    def pinned(self, version: int | None = None) -> Iterator[ReferenceSnapshot]:
+        """
+        Makes get() return the given version (default: the current one) in
+        this context and in tasks started from it. A version no longer
+        retained falls back to the current one.
+        """
+        snapshot = self.version(version) if version is not None else None
+        if snapshot is None:
+            snapshot = self._current
+            if version is not None:
+                logger.info("Reference data v%s no longer retained — continuing on v%s", version, snapshot.version)
+        token = _PINNED.set(snapshot)
+        try:
+            yield snapshot
+        finally:
+            _PINNED.reset(token)
+
+    def register(self, name: str, build: Callable[[ReferenceSnapshot], Any]) -> None:
+        """Declares a derived value to build ahead of publishing each new snapshot."""
+        self._builders[name] = build
+        self._current.derived(name, build)
+
+    def reload(self, force: bool = False) -> ReferenceSnapshot:
+        """
+        Rebuilds from the source and publishes the result; returns the
+        snapshot now current. Invalid data (e.g. duplicate ids) raises
+        ValueError and leaves the current snapshot in place.
+        """
+        with self._reload_lock:
+            started = time.perf_counter()
+            hospitals, doctors = self._source()
+            previous = self._current
+            unchanged = hospitals == previous.hospitals.hospitals and doctors == list(previous.doctors)
+            if unchanged and not force:
+                logger.debug("Reference data unchanged — keeping v%s", previous.version)
+                return previous
+
+            with _built_outside_collector():
+                snapshot = self._build(previous.version + 1, hospitals, doctors, previous)
+                self._current = snapshot
+
+            now = time.monotonic()
+            retired = {**self._retired, previous.version: (now, previous)}
+            kept = sorted(retired)[-self._max_retained:] if self._max_retained > 0 else []
+            self._retired = {
+                version: retired[version] for version in kept
+                if now - retired[version][0] <= self._retention_seconds
+            }
+            for version, (_, dropped) in retired.items():
+                if version not in self._retired:
+                    dropped.retire()
+
+        logger.info(
+            "Reference data v%s published: %d hospitals, %d doctors (built in %.0f ms)",
+            snapshot.version, len(snapshot.hospitals), len(snapshot.doctors),
+            (time.perf_counter() - started) * 1000,
+        )
+        return snapshot
+
+    async def reload_async(self, force: bool = False) -> ReferenceSnapshot:
+        """reload() in a worker thread, so the event loop keeps serving requests."""
+        return await off_loop(self.reload, force)
+
+    async def watch(self, interval_seconds: float) -> None:
+        """Reloads every interval_seconds until cancelled; unchanged data costs a read and a compare."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.reload_async()
+            except Exception as e:  # keep serving the current version
+                logger.error("Reference data reload failed: %s", e, exc_info=True)
+
+    def status(self) -> dict:
+        current = self._current
+        return {
+            "version": current.version,
+            "created_at": current.created_at,
+            "hospitals": len(current.hospitals),
+            "doctors": len(current.doctors),
+            "retained_versions": sorted(self._retired),
+        }
+
+
+REFERENCE = ReferenceData(
+    retention_seconds=float(os.getenv("REFERENCE_RETENTION_SECONDS", str(30 * 60))),
+    max_retained=int(os.getenv("REFERENCE_MAX_RETAINED", "4")),
+)
@@ -0,0 +1,394 @@
+"""
+Repositories for MediRoute AI reference data — hospitals, doctors, policies and claims.
+
+Each kind of record has a small repository interface with two backends:
+in-memory (the mock lists in data/*.py) and SQLite (a file loaded with
+`python -m data.loader`). DATA_BACKEND picks one for the whole app; the
+registries, policy store and claims ledger load through REPOSITORIES.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, NamedTuple, Protocol
+
+from utils.aho_corasick_util import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+class PolicyMatch(NamedTuple):
+    record: dict            # the policy; for dependents, the principal's policy
+    member_name: str
+    relation: str           # "PRINCIPAL" or "DEPENDENT"
+    date_of_birth: str | None
+
+
+def policy_members(record: dict) -> Iterable[tuple[str, str | None, str]]:
+    """(name, date_of_birth, relation) for the principal and each dependent.
+    Dependents are listed by name, or as {"full_name", "date_of_birth"}."""
+    yield record["full_name"], record.get("date_of_birth"), "PRINCIPAL"
+    for dependent in record.get("dependents", []):
+        if isinstance(dependent, dict):
+            yield dependent["full_name"], dependent.get("date_of_birth"), "DEPENDENT"
+        else:
+            yield dependent, None, "DEPENDENT"
+
+
+async def off_loop(fn: Callable, *args, **kwargs) -> Any:
+    """Runs a blocking repository call in a worker thread, off the event loop."""
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+# ── Interfaces ────────────────────────────────────────────────────────────────
+
+class HospitalRepository(Protocol):
+    def list_all(self) -> list[dict]: ...
+    def get(self, hospital_id: str) -> dict | None: ...
+    def upsert(self, hospitals: Iterable[dict]) -> int: ...
+
+
+class DoctorRepository(Protocol):
+    def list_all(self) -> list[dict]: ...
+    def get(self, doctor_id: str) -> dict | None: ...
+    def at_hospital(self, hospital_id: str) -> list[dict]: ...
+    def upsert(self, doctors: Iterable[dict]) -> int: ...
+
+
+class PolicyRepository(Protocol):
+    def list_all(self) -> list[dict]: ...
+    def get(self, policy_number: str) -> dict | None: ...
+    def find_members(self, full_name: str, date_of_birth: str | None = None) -> tuple[PolicyMatch, ...]: ...
+    def upsert(self, policies: Iterable[dict]) -> int: ...
+
+
+class ClaimsRepository(Protocol):
+    def list_all(self) -> list[dict]: ...
+    def for_policy(self, policy_number: str) -> list[dict]: ...
+    def upsert(self, claims: Iterable[dict]) -> int: ...
+
+
+# ── In-memory backend ─────────────────────────────────────────────────────────
+
+class _InMemoryRepository:
+    """Records in a dict by key, insertion-ordered; a lock guards writes."""
+
+    def __init__(self, records: Iterable[dict], key: str):
+        self._key = key
+        self._records: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.upsert(records)
+
+    def list_all(self) -> list[dict]:
+        return list(self._records.values())
+
+    def get(self, key: str) -> dict | None:
+        return self._records.get(key)
+
+    def upsert(self, records: Iterable[dict]) -> int:
+        count = 0
+        with self._lock:
+            for record in records:
+                self._records[record[self._key]] = record
+                count += 1
+        return count
+
+
+class InMemoryHospitalRepository(_InMemoryRepository):
+    def __init__(self, hospitals: Iterable[dict] = ()):
+        super().__init__(hospitals, "id")
+
+
+class InMemoryDoctorRepository(_InMemoryRepository):
+    def __init__(self, doctors: Iterable[dict] = ()):
+        super().__init__(doctors, "id")
+
+    def at_hospital(self, hospital_id: str) -> list[dict]:
+        return [d for d in self._records.values() if d["hospital_id"] == hospital_id]
+
+
+class InMemoryClaimsRepository(_InMemoryRepository):
+    def __init__(self, claims: Iterable[dict] = ()):
+        super().__init__(claims, "claim_id")
+
+    def for_policy(self, policy_number: str) -> list[dict]:
+        claims = [c for c in self._records.values() if c["policy_number"] == policy_number]
+        return sorted(claims, key=lambda c: c["claim_date"])
+
+
+class InMemoryPolicyRepository(_InMemoryRepository):
+    """Policies by number, plus a member-name index covering dependents."""
+
+    def __init__(self, policies: Iterable[dict] = ()):
+        self._members: dict[str, list[tuple[str, str, str, str | None]]] = {}
+        super().__init__(policies, "policy_number")
+
+    def upsert(self, policies: Iterable[dict]) -> int:
+        policies = list(policies)
+        with self._lock:
+            replaced = {p["policy_number"] for p in policies if p["policy_number"] in self._records}
+            if replaced:
+                for name_key, rows in list(self._members.items()):
+                    self._members[name_key] = [r for r in rows if r[0] not in replaced]
+            for policy in policies:
+                self._records[policy["policy_number"]] = policy
+                for name, dob, relation in policy_members(policy):
+                    self._members.setdefault(normalize_text(name), []).append(
+                        (policy["policy_number"], name, relation, dob)
+                    )
+        return len(policies)
+
+    def find_members(self, full_name: str, date_of_birth: str | None = None) -> tuple[PolicyMatch, ...]:
+        return tuple(
+            PolicyMatch(self._records[number], name, relation, dob)
+            for number, name, relation, dob in self._members.get(normalize_text(full_name or ""), ())
+            if not date_of_birth or dob in (None, date_of_birth)
+        )
+
+
+# ── SQLite backend ────────────────────────────────────────────────────────────
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hospitals (
+    id            TEXT PRIMARY KEY,
+    name          TEXT NOT NULL,
+    record        TEXT NOT NULL                  -- the full record as JSON
+);
+CREATE TABLE IF NOT EXISTS doctors (
+    id             TEXT PRIMARY KEY,
+    hospital_id    TEXT NOT NULL,
+    specialization TEXT NOT NULL,
+    record         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS doctors_by_hospital ON doctors(hospital_id, specialization);
+CREATE TABLE IF NOT EXISTS policies (
+    policy_number TEXT PRIMARY KEY,
+    record        TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS members (
+    name_key      TEXT NOT NULL,                 -- normalize_text(member_name)
+    date_of_birth TEXT,                          -- NULL when unknown (dependents listed by name)
+    policy_number TEXT NOT NULL REFERENCES policies(policy_number),
+    relation      TEXT NOT NULL,                 -- PRINCIPAL | DEPENDENT
+    member_name   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS members_by_name ON members(name_key, date_of_birth);
+CREATE INDEX IF NOT EXISTS members_by_policy ON members(policy_number);
+CREATE TABLE IF NOT EXISTS claims (
+    claim_id      TEXT PRIMARY KEY,
+    policy_number TEXT NOT NULL,
+    claim_date    TEXT NOT NULL,
+    record        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS claims_by_policy ON claims(policy_number, claim_date);
+"""
+
+_memory_db_ids = itertools.count()
+
+
+class SQLitePool:
+    """
+    Fixed pool of SQLite connections shared by the repositories. Each
+    connection keeps its own compiled-statement cache, so the constant,
+    parameterized SQL below is prepared once per connection.
+
+    Readers run concurrently (WAL for files); writes are serialized by a lock.
+    Blocking calls belong off the event loop — see off_loop().
+    """
+
+    def __init__(self, path: str, size: int = 4):
+        if path == ":memory:":
+            # A named shared-cache database, so every pooled connection sees it
+            path, uri = f"file:mediroute-{next(_memory_db_ids)}?mode=memory&cache=shared", True
+        else:
+            uri = path.startswith("file:")
+        self.path = path
+        self._idle: queue.Queue[sqlite3.Connection] = queue.Queue()
+        self._write_lock = threading.Lock()
+        for _ in range(max(1, size)):
+            conn = sqlite3.connect(path, uri=uri, check_same_thread=False, timeout=30, cached_statements=256)
+            self._idle.put(conn)
+
+        with self.connection() as conn:
+            if not uri:
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def connection(self):
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def write(self, statements: Iterable[tuple[str, list[tuple]]]) -> None:
+        """Runs (sql, rows) executemany batches in one transaction."""
+        with self._write_lock, self.connection() as conn, conn:
+            for sql, rows in statements:
+                conn.executemany(sql, rows)
+
+
+class _SQLiteRepository:
+    _table = ""
+    _key = ""
+
+    def __init__(self, pool: SQLitePool):
+        self._pool = pool
+
+    def list_all(self) -> list[dict]:
+        return [json.loads(r) for r, in self._pool.query(f"SELECT record FROM {self._table} ORDER BY rowid")]
+
+    def get(self, key: str) -> dict | None:
+        rows = self._pool.query(f"SELECT record FROM {self._table} WHERE {self._key} = ?", (key,))
+        return json.loads(rows[0][0]) if rows else None
+
+
+class SQLiteHospitalRepository(_SQLiteRepository):
+    _table, _key = "hospitals", "id"
+
+    def upsert(self, hospitals: Iterable[dict]) -> int:
+        rows = [(h["id"], h["name"], json.dumps(h)) for h in hospitals]
+        self._pool.write([("INSERT OR REPLACE INTO hospitals (id, name, record) VALUES (?, ?, ?)", rows)])
+        return len(rows)
+
+
+class SQLiteDoctorRepository(_SQLiteRepository):
+    _table, _key = "doctors", "id"
+
+    def at_hospital(self, hospital_id: str) -> list[dict]:
+        rows = self._pool.query("SELECT record FROM doctors WHERE hospital_id = ? ORDER BY rowid", (hospital_id,))
+        return [json.loads(r) for r, in rows]
+
+    def upsert(self, doctors: Iterable[dict]) -> int:
+        rows = [(d["id"], d["hospital_id"], d["specialization"], json.dumps(d)) for d in doctors]
+        self._pool.write([(
+            "INSERT OR REPLACE INTO doctors (id, hospital_id, specialization, record) VALUES (?, ?, ?, ?)", rows
+        )])
+        return len(rows)
+
+
+class SQLiteClaimsRepository(_SQLiteRepository):
+    _table, _key = "claims", "claim_id"
+
+    def for_policy(self, policy_number: str) -> list[dict]:
+        rows = self._pool.query(
+            "SELECT record FROM claims WHERE policy_number = ? ORDER BY claim_date", (policy_number,)
+        )
+        return [json.loads(r) for r, in rows]
+
+    def upsert(self, claims: Iterable[dict]) -> int:
+        rows = [(c["claim_id"], c["policy_number"], c["claim_date"], json.dumps(c)) for c in claims]
+        self._pool.write([(
+            "INSERT OR REPLACE INTO claims (claim_id, policy_number, claim_date, record) VALUES (?, ?, ?, ?)", rows
+        )])
+        return len(rows)
+
+
+class SQLitePolicyRepository(_SQLiteRepository):
+    _table, _key = "policies", "policy_number"
+
+    def find_members(self, full_name: str, date_of_birth: str | None = None) -> tuple[PolicyMatch, ...]:
+        name_key = normalize_text(full_name or "")
+        if not name_key:
+            return ()
+        query = (
+            "SELECT p.record, m.member_name, m.relation, m.date_of_birth "
+            "FROM members m JOIN policies p ON p.policy_number = m.policy_number "
+            "WHERE m.name_key = ?"
+        )
+        params: tuple = (name_key,)
+        if date_of_birth:
+            query += " AND (m.date_of_birth = ? OR m.date_of_birth IS NULL)"
+            params += (date_of_birth,)
+        return tuple(
+            PolicyMatch(json.loads(record), name, relation, dob)
+            for record, name, relation, dob in self._pool.query(query, params)
+        )
+
+    def upsert(self, policies: Iterable[dict]) -> int:
+        policies = list(policies)
+        self._pool.write([
+            ("DELETE FROM members WHERE policy_number = ?", [(p["policy_number"],) for p in policies]),
+            (
+                "INSERT OR REPLACE INTO policies (policy_number, record) VALUES (?, ?)",
+                [(p["policy_number"], json.dumps(p)) for p in policies],
+            ),
+            (
+                "INSERT INTO members (name_key, date_of_birth, policy_number, relation, member_name) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (normalize_text(name), dob, p["policy_number"], relation, name)
+                    for p in policies for name, dob, relation in policy_members(p)
+                ],
+            ),
+        ])
+        return len(policies)
+
+
+# ── Wiring ────────────────────────────────────────────────────────────────────
+
+class Repositories(NamedTuple):
+    hospitals: HospitalRepository
+    doctors: DoctorRepository
+    policies: PolicyRepository
+    claims: ClaimsRepository
+
+
+def in_memory_repositories() -> Repositories:
+    """The mock data bundled in data/*.py."""
+    from data.doctors import DOCTORS
+    from data.hospitals import HOSPITALS
+    from data.insurance import INSURANCE_RECORDS
+    from data.insurance_claims import INSURANCE_CLAIMS_HISTORY
+
+    return Repositories(
+        InMemoryHospitalRepository(HOSPITALS),
+        InMemoryDoctorRepository(DOCTORS),
+        InMemoryPolicyRepository(INSURANCE_RECORDS),
+        InMemoryClaimsRepository(INSURANCE_CLAIMS_HISTORY),
+    )
+
+
+def sqlite_repositories(path: str, pool_size: int = 4) -> Repositories:
+    pool = SQLitePool(path, pool_size)
+    return Repositories(
+        SQLiteHospitalRepository(pool),
+        SQLiteDoctorRepository(pool),
+        SQLitePolicyRepository(pool),
+        SQLiteClaimsRepository(pool),
+    )
+
+
+def open_repositories() -> Repositories:
+    """
+    DATA_BACKEND=memory (default), sqlite (at DATA_DB_PATH) or snapshot (a
+    read-only file built by `python -m data.snapshot`, at DATA_SNAPSHOT_PATH).
+    """
+    backend = os.getenv("DATA_BACKEND", "memory").strip().lower()
+    if backend == "snapshot":
+        from data.snapshot import snapshot_repositories
+
+        path = os.getenv("DATA_SNAPSHOT_PATH", "mediroute.snap")
+        logger.info("Reference data: snapshot at %s", path)
+        return snapshot_repositories(path)
+    if backend == "sqlite":
+        path = os.getenv("DATA_DB_PATH", "mediroute.db")
+        logger.info("Reference data: SQLite at %s", path)
+        return sqlite_repositories(path, int(os.getenv("DATA_DB_POOL_SIZE", "4")))
+    if backend != "memory":
+        raise ValueError(f"Unknown DATA_BACKEND '{backend}' (expected 'memory', 'sqlite' or 'snapshot')")
+    return in_memory_repositories()
+
+
+REPOSITORIES = open_repositories()
@@ -0,0 +1,174 @@
+"""
+Bed reservations for MediRoute AI — a bed (or ICU bed) held at the hospital
+for each patient an LOA is issued for, so concurrent LOAs cannot all count
+on the last one.
+
+    RESERVATIONS.reserve("LOA-20260101-1A2B3C4D", "H001", "icu_bed", expires_at, arrive_by)
+    RESERVATIONS.release("LOA-20260101-1A2B3C4D")   # the patient arrived, or the LOA was cancelled
+
+A reservation holds its bed until the patient arrives (released through
+POST /reservations/{id}/arrived), the LOA expires, or the patient has not
+arrived by `arrive_by` — whichever comes first. Beds held are subtracted
+from the hospitals' reported availability (data/capacity.py), so matching
+stops offering a hospital whose last beds are taken.
+"""
+import os
+import threading
+import time
+
+from typing import NamedTuple
+
+from data.capacity import CAPACITY, RESOURCES, CapacityStore
+
+# A held bed is released if the patient has not arrived this long after the
+# expected travel time
+ARRIVAL_GRACE_SECONDS = float(os.getenv("RESERVATION_ARRIVAL_GRACE_MINUTES", "120")) * 60
+
+
+class Reservation(NamedTuple):
+    reservation_id: str     # the LOA number
+    hospital_id: str
+    resource: str           # a key of data.capacity.RESOURCES
+    created_at: float       # epoch seconds
+    arrive_by: float        # released if the patient has not arrived by then
+    expires_at: float       # the LOA's valid_until
+
+    def active(self, now: float) -> bool:
+        return now < min(self.arrive_by, self.expires_at)
+
+
+class _Slot(NamedTuple):
+    version: int
+    holds: tuple[Reservation, ...]
+
+
+class ReservationLedger:
+    """
+    Reservations per (hospital, resource), with optimistic concurrency.
+
+    Each key's holds are an immutable _Slot with a version. A writer reads the
+    slot, drops expired holds, checks availability and builds the new slot
+    without any lock, then compare-and-swaps it in: the swap succeeds only if
+    the version is still the one it read, otherwise the writer retries on the
+    fresh slot. Only that compare-and-assign runs under a lock (one of a few
+    striped locks), so readers never block and writers to different keys
+    rarely meet.
+    """
+
+    def __init__(self, capacity: CapacityStore, stripes: int = 64):
+        self._capacity = capacity
+        self._slots: dict[tuple[str, str], _Slot] = {}
+        self._keys: dict[str, tuple[str, str]] = {}     # reservation id → key
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self.granted = 0
+        self.refused = 0
+        self.released = 0
+        self.conflicts = 0      # swaps lost to a concurrent writer, then retried
+
+    def _compare_and_swap(self, key: tuple[str, str], version: int, slot: _Slot) -> bool:
+        with self._stripes[hash(key) % len(self._stripes)]:
+            current = self._slots.get(key)
+            if (current.version if current else 0) != version:
+                return False
+            self._slots[key] = slot
+            return True
+
+    def _read(self, key: tuple[str, str], now: float) -> tuple[int, tuple[Reservation, ...]]:
+        """The key's version and its holds still active."""
+        slot = self._slots.get(key)
+        if slot is None:
+            return 0, ()
+        return slot.version, tuple(h for h in slot.holds if h.active(now))
+
+    def _swap(self, key: tuple[str, str], version: int, holds: tuple[Reservation, ...]) -> bool:
+        """Replaces the key's holds if still at `version`; forgets the ids of holds that lapsed."""
+        previous = self._slots.get(key)
+        if not self._compare_and_swap(key, version, _Slot(version + 1, holds)):
+            self.conflicts += 1
+            return False
+        for lapsed in set(previous.holds if previous else ()) - set(holds):
+            if self._keys.get(lapsed.reservation_id) == key:
+                del self._keys[lapsed.reservation_id]
+        return True
+
+    def reserve(
+        self,
+        reservation_id: str,
+        hospital_id: str,
+        resource: str,
+        expires_at: float,
+        arrive_by: float,
+    ) -> Reservation | None:
+        """
+        Holds one bed of that kind for the reservation; None if the hospital
+        has reported none left beyond those already held. A hospital that has
+        not reported is taken to have room. Reserving the same id again
+        returns the hold it already has.
+        """
+        if resource not in RESOURCES:
+            raise ValueError(f"Unknown resource {resource!r}; expected one of {sorted(RESOURCES)}")
+        key = (hospital_id, resource)
+        while True:
+            now = time.time()
+            version, holds = self._read(key, now)
+            held = next((h for h in holds if h.reservation_id == reservation_id), None)
+            if held:
+                return held
+
+            available = self._capacity.available(hospital_id, resource)
+            if available is not None and len(holds) >= available:
+                self.refused += 1
+                return None
+
+            reservation = Reservation(
+                reservation_id, hospital_id, resource, now, min(arrive_by, expires_at), expires_at
+            )
+            if self._swap(key, version, holds + (reservation,)):
+                self._keys[reservation_id] = key
+                self.granted += 1
+                return reservation
+
+    def release(self, reservation_id: str) -> Reservation | None:
+        """Ends the hold (patient arrived, LOA cancelled); returns it, or None if not held."""
+        key = self._keys.get(reservation_id)
+        if key is None:
+            return None
+        while True:
+            version, holds = self._read(key, time.time())
+            held = next((h for h in holds if h.reservation_id == reservation_id), None)
+            if held is None:
+                return None
+            if self._swap(key, version, tuple(h for h in holds if h is not held)):
+                self.released += 1
+                return held
+
+    def get(self, reservation_id: str) -> Reservation | None:
+        """The reservation, while it holds its bed."""
+        key = self._keys.get(reservation_id)
+        if key is None:
+            return None
+        _, holds = self._read(key, time.time())
+        return next((h for h in holds if h.reservation_id == reservation_id), None)
+
+    def held(self, hospital_id: str, resource: str) -> int:
+        """Beds of that kind held at the hospital right now."""
+        return len(self._read((hospital_id, resource), time.time())[1])
+
+    def admission_issue(self, hospital_id: str, needs_icu: bool) -> str | None:
+        """CapacityStore.admission_issue with the beds held here taken into account."""
+        return self._capacity.admission_issue(
+            hospital_id, needs_icu, {resource: self.held(hospital_id, resource) for resource in RESOURCES}
+        )
+
+    def stats(self) -> dict:
+        now = time.time()
+        return {
+            "held": sum(len(self._read(key, now)[1]) for key in list(self._slots)),
+            "granted": self.granted,
+            "refused": self.refused,
+            "released": self.released,
+            "conflicts": self.conflicts,
+        }
+
+
+RESERVATIONS = ReservationLedger(CAPACITY, stripes=int(os.getenv("RESERVATION_STRIPES", "64")))
@@ -0,0 +1,163 @@
+"""
+Road network for MediRoute AI — hospital ETAs by road instead of straight-line
+distance.
+
+    python -m data.road_network convert metro-manila.osm --out roads.npz
+    ROAD_GRAPH_PATH=roads.npz uvicorn main:app --reload
+
+`convert` reads an OpenStreetMap XML extract (e.g. cut with osmium from a
+Geofabrik PBF: `osmium cat philippines.osm.pbf -o ph.osm`), keeps the
+drivable roads (one-way streets respected), drops fragments that cannot be
+driven to and from the rest, and precomputes the ALT landmark distances
+(utils/routing_util.py) — loading the result needs no preprocessing.
+
+Speeds come from SPEED_PROFILE_PATH (default: data/speed_profile_ph.json):
+free-flow speeds per road class, slowed down per period of the day — the
+period is taken from the current hour in ROUTING_TIMEZONE. Hospitals more
+than ROUTING_MAX_MINUTES away are not searched for. Without ROAD_GRAPH_PATH,
+ROUTER is None and hospitals are ranked by distance.
+"""
+import argparse
+import logging
+import os
+import time
+import xml.etree.ElementTree as ET
+
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from utils.routing_util import RoadGraph, Router, SpeedProfile
+
+logger = logging.getLogger(__name__)
+
+# OSM highway=* values kept, by road class
+_HIGHWAY_CLASSES = {
+    "motorway": "motorway", "motorway_link": "motorway",
+    "trunk": "trunk", "trunk_link": "trunk",
+    "primary": "primary", "primary_link": "primary",
+    "secondary": "secondary", "secondary_link": "secondary",
+    "tertiary": "tertiary", "tertiary_link": "tertiary",
+    "unclassified": "residential", "residential": "residential", "living_street": "residential",
+    "service": "service",
+}
+ROAD_CLASSES = ["motorway", "trunk", "primary", "secondary", "tertiary", "residential", "service"]
+
+_TIMEZONE = ZoneInfo(os.getenv("ROUTING_TIMEZONE", "Asia/Manila"))
+
+MAX_ETA_SECONDS = float(os.getenv("ROUTING_MAX_MINUTES", "120")) * 60
+
+
+# ── OSM conversion ────────────────────────────────────────────────────────────
+
+def _ways(path: str):
+    """(node ids, class, direction) per drivable way; direction 1, -1 or 0 (both)."""
+    for _, element in ET.iterparse(path, events=("end",)):
+        if element.tag == "way":
+            tags = {t.get("k"): t.get("v") for t in element.iter("tag")}
+            road_class = _HIGHWAY_CLASSES.get(tags.get("highway"))
+            if road_class and tags.get("access") not in ("no", "private"):
+                oneway = tags.get("oneway", "")
+                if oneway in ("yes", "true", "1") or tags.get("junction") == "roundabout" or (
+                    tags["highway"] == "motorway" and oneway != "no"
+                ):
+                    direction = 1
+                else:
+                    direction = -1 if oneway == "-1" else 0
+                yield [int(n.get("ref")) for n in element.iter("nd")], road_class, direction
+        if element.tag in ("node", "way", "relation"):
+            element.clear()
+
+
+def convert_osm(path: str, profile: SpeedProfile, landmarks: int = 8) -> RoadGraph:
+    """Road graph from an OSM XML extract, restricted to its main connected network."""
+    started = time.perf_counter()
+    ways = list(_ways(path))
+    used = {node for refs, _, _ in ways for node in refs}
+
+    index, lats, lngs = {}, [], []
+    for _, element in ET.iterparse(path, events=("end",)):
+        if element.tag == "node":
+            osm_id = int(element.get("id"))
+            if osm_id in used:
+                index[osm_id] = len(lats)
+                lats.append(float(element.get("lat")))
+                lngs.append(float(element.get("lon")))
+        if element.tag in ("node", "way", "relation"):
+            element.clear()
+
+    tails, heads, classes = [], [], []
+    for refs, road_class, direction in ways:
+        nodes = [index[n] for n in refs if n in index]
+        code = ROAD_CLASSES.index(road_class)
+        for a, b in zip(nodes, nodes[1:]):
+            if direction >= 0:
+                tails.append(a)
+                heads.append(b)
+                classes.append(code)
+            if direction <= 0:
+                tails.append(b)
+                heads.append(a)
+                classes.append(code)
+
+    graph = RoadGraph.from_edges(lats, lngs, tails, heads, classes, ROAD_CLASSES)
+    connected = graph.largest_component()
+    logger.info(
+        "%s: %d ways, %d nodes / %d edges, %d nodes in the main network",
+        path, len(ways), len(graph), graph.edge_count, len(connected)
+    )
+    graph = connected.with_landmarks(profile, landmarks)
+    logger.info("Road graph built in %.1f s", time.perf_counter() - started)
+    return graph
+
+
+# ── Router ────────────────────────────────────────────────────────────────────
+
+def load_profile() -> SpeedProfile:
+    return SpeedProfile.load(os.getenv("SPEED_PROFILE_PATH") or Path(__file__).with_name("speed_profile_ph.json"))
+
+
+def current_period(router: Router) -> str:
+    """Speed profile period for the current local time."""
+    return router.profile.period(datetime.now(_TIMEZONE).hour)
+
+
+def load_router() -> Router | None:
+    """The router for ROAD_GRAPH_PATH; None if unset or unreadable (ranking falls back to distance)."""
+    path = os.getenv("ROAD_GRAPH_PATH", "").strip()
+    if not path:
+        return None
+    try:
+        graph = RoadGraph.load(path)
+    except (OSError, KeyError, ValueError) as e:
+        logger.error("Road graph %s not loaded (%s) — ranking hospitals by distance", path, e)
+        return None
+    router = Router(
+        graph,
+        load_profile(),
+        max_snap_m=float(os.getenv("ROUTING_MAX_SNAP_M", "500")),
+    )
+    logger.info("Road graph loaded from %s: %d nodes, %d edges", path, len(graph), graph.edge_count)
+    return router
+
+
+ROUTER = load_router()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Road network for hospital ETAs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("convert", help="build a road graph from an OSM XML extract")
+    convert.add_argument("osm", help="OpenStreetMap XML file")
+    convert.add_argument("--out", required=True, help="road graph file to write (.npz)")
+    convert.add_argument("--landmarks", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    graph = convert_osm(args.osm, load_profile(), args.landmarks)
+    graph.save(args.out)
+    logger.info("Written %s", args.out)
+
+
+if __name__ == "__main__":
+    main()
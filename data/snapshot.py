@@ -0,0 +1,398 @@
+"""
+Columnar reference-data snapshot for MediRoute AI — built once, memory-mapped read-only by every worker.
+
+    python -m data.snapshot --out mediroute.snap     # from the configured DATA_BACKEND
+    DATA_BACKEND=snapshot DATA_SNAPSHOT_PATH=mediroute.snap uvicorn main:app --workers 4
+
+The file is a small JSON header followed by aligned NumPy columns: floats
+and ints as-is, strings interned into one shared string table, string lists
+as offsets into an id array, flag dicts ({"icu": true, ...}) as bitmasks.
+Opening it parses only the header; columns are zero-copy views of the
+mapping, so workers share the pages through the OS page cache. A record is
+materialized as a dict only when asked for, and key lookups go through
+sorted 64-bit hash indexes stored in the file.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import struct
+
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+
+from data.repositories import PolicyMatch, Repositories, policy_members
+from utils.aho_corasick_util import normalize_text
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"MRSNAP01"
+_ALIGN = 64
+_RELATIONS = ["PRINCIPAL", "DEPENDENT"]
+
+# Primary key and secondary (non-unique) indexes per table
+_KEYS = {"hospitals": "id", "doctors": "id", "policies": "policy_number", "claims": "claim_id"}
+_SECONDARY = {"doctors": ["hospital_id"], "claims": ["policy_number"]}
+
+
+def _hash(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+# ── Writer ────────────────────────────────────────────────────────────────────
+
+class _Writer:
+    def __init__(self):
+        self.header: dict = {"tables": {}}
+        self.arrays: list[tuple[str, np.ndarray]] = []
+        self._strings: dict[str, int] = {}
+
+    def intern(self, text: str) -> int:
+        sid = self._strings.get(text)
+        if sid is None:
+            sid = self._strings[text] = len(self._strings)
+        return sid
+
+    def array(self, name: str, values) -> str:
+        self.arrays.append((name, np.ascontiguousarray(values)))
+        return name
+
+    def _column(self, prefix: str, values: list[Any]) -> dict:
+        """Encodes one field over all rows, picking the narrowest representation."""
+        present = [v is not None for v in values]
+        kinds = {type(v) for v in values if v is not None}
+        column: dict = {}
+        if not all(present):
+            column["present"] = self.array(f"{prefix}.present", np.array(present, dtype=np.bool_))
+
+        if kinds == {bool}:
+            column["type"] = "bool"
+            column["data"] = self.array(f"{prefix}.data", np.array([bool(v) for v in values], dtype=np.bool_))
+        elif kinds == {int}:
+            column["type"] = "int"
+            column["data"] = self.array(f"{prefix}.data", np.array([v or 0 for v in values], dtype=np.int64))
+        elif kinds and kinds <= {int, float}:
+            column["type"] = "float"
+            column["data"] = self.array(f"{prefix}.data", np.array([v or 0.0 for v in values], dtype=np.float64))
+        elif kinds == {str}:
+            column["type"] = "str"
+            column["data"] = self.array(
+                f"{prefix}.data", np.array([self.intern(v) if v is not None else -1 for v in values], dtype=np.int32)
+            )
+        elif kinds == {list} and all(isinstance(x, str) for v in values if v for x in v):
+            column["type"] = "strlist"
+            offsets = np.zeros(len(values) + 1, dtype=np.int64)
+            ids = []
+            for i, v in enumerate(values):
+                ids.extend(self.intern(x) for x in v or ())
+                offsets[i + 1] = len(ids)
+            column["offsets"] = self.array(f"{prefix}.offsets", offsets)
+            column["data"] = self.array(f"{prefix}.data", np.array(ids, dtype=np.int32))
+        elif kinds == {dict} and all(isinstance(x, bool) for v in values if v for x in v.values()):
+            column["type"] = "flags"
+            vocab = sorted({k for v in values if v for k in v})
+            bits = {k: i for i, k in enumerate(vocab)}
+            words = max(1, -(-len(vocab) // 64))
+            # Two masks: which flags are set, and which are true
+            keys = np.zeros((len(values), words), dtype=np.uint64)
+            true = np.zeros((len(values), words), dtype=np.uint64)
+            for i, v in enumerate(values):
+                for k, flag in (v or {}).items():
+                    word, bit = divmod(bits[k], 64)
+                    keys[i, word] |= np.uint64(1 << bit)
+                    if flag:
+                        true[i, word] |= np.uint64(1 << bit)
+            column["vocab"] = vocab
+            column["keys"] = self.array(f"{prefix}.keys", keys)
+            column["data"] = self.array(f"{prefix}.data", true)
+        else:
+            column["type"] = "json"
+            column["data"] = self.array(
+                f"{prefix}.data",
+                np.array([self.intern(json.dumps(v)) if v is not None else -1 for v in values], dtype=np.int32),
+            )
+        return column
+
+    def _hash_index(self, prefix: str, keys: list[str], order_by: list | None = None) -> tuple[dict, np.ndarray]:
+        """Rows sorted by key hash (then by order_by), for searchsorted lookups.
+        Returns the index spec and the row order."""
+        hashes = np.array([_hash(k) for k in keys], dtype=np.uint64)
+        if order_by is not None:
+            order = np.lexsort((np.array(order_by, dtype=str), hashes))
+        else:
+            order = np.argsort(hashes, kind="stable")
+        spec = {
+            "hashes": self.array(f"{prefix}.hashes", hashes[order]),
+            "rows": self.array(f"{prefix}.rows", order.astype(np.int64)),
+        }
+        return spec, order
+
+    def table(self, kind: str, records: list[dict]) -> None:
+        fields = list(dict.fromkeys(f for r in records for f in r))
+        table = {
+            "rows": len(records),
+            "fields": fields,
+            "columns": {f: self._column(f"{kind}.{f}", [r.get(f) for r in records]) for f in fields},
+            "key": self._hash_index(f"{kind}.key", [r[_KEYS[kind]] for r in records])[0],
+            "secondary": {
+                f: self._hash_index(
+                    f"{kind}.by_{f}", [r[f] for r in records],
+                    [r["claim_date"] for r in records] if kind == "claims" else None,
+                )[0]
+                for f in _SECONDARY.get(kind, [])
+            },
+        }
+        if kind == "policies":
+            members = [(normalize_text(name), dob, row, relation, name)
+                       for row, r in enumerate(records) for name, dob, relation in policy_members(r)]
+            index, order = self._hash_index("policies.members", [m[0] for m in members])
+            table["members"] = {
+                "hashes": index["hashes"],
+                "policy_rows": self.array("policies.members.policy_rows",
+                                          np.array([members[i][2] for i in order], dtype=np.int64)),
+                "names": self.array("policies.members.names",
+                                    np.array([self.intern(members[i][4]) for i in order], dtype=np.int32)),
+                "relations": self.array("policies.members.relations",
+                                        np.array([_RELATIONS.index(members[i][3]) for i in order], dtype=np.uint8)),
+                "dobs": self.array("policies.members.dobs", np.array(
+                    [self.intern(members[i][1]) if members[i][1] else -1 for i in order], dtype=np.int32)),
+            }
+        self.header["tables"][kind] = table
+
+    def write(self, path: Path) -> None:
+        blob = bytearray()
+        offsets = np.zeros(len(self._strings) + 1, dtype=np.int64)
+        for i, text in enumerate(self._strings):
+            blob += text.encode("utf-8")
+            offsets[i + 1] = len(blob)
+        self.array("strings.offsets", offsets)
+        self.array("strings.data", np.frombuffer(bytes(blob), dtype=np.uint8))
+
+        # Lay the arrays out after the header, each aligned
+        layout, position = {}, 0
+        for name, arr in self.arrays:
+            position = -(-position // _ALIGN) * _ALIGN
+            layout[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": position}
+            position += arr.nbytes
+        self.header["arrays"] = layout
+        header = json.dumps(self.header).encode("utf-8")
+        data_start = -(-(len(_MAGIC) + 8 + len(header)) // _ALIGN) * _ALIGN
+
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with tmp.open("wb") as f:
+            f.write(_MAGIC + struct.pack("<Q", len(header)) + header)
+            for name, arr in self.arrays:
+                f.seek(data_start + layout[name]["offset"])
+                f.write(arr.tobytes())
+            f.truncate(data_start + position)
+        tmp.replace(path)  # atomic, so running workers never map a half-written file
+
+
+def build_snapshot(repositories: Repositories, path: str | Path) -> Path:
+    """Compiles every table of the repositories into a snapshot file."""
+    path = Path(path)
+    writer = _Writer()
+    for kind in _KEYS:
+        records = getattr(repositories, kind).list_all()
+        writer.table(kind, records)
+        logger.info("Snapshot: %d %s", len(records), kind)
+    writer.write(path)
+    return path
+
+
+# ── Reader ────────────────────────────────────────────────────────────────────
+
+class Snapshot:
+    """A snapshot file mapped read-only; columns are zero-copy NumPy views."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{path} is not a MediRoute snapshot")
+        (header_len,) = struct.unpack_from("<Q", self._mmap, len(_MAGIC))
+        start = len(_MAGIC) + 8
+        self.header = json.loads(self._mmap[start:start + header_len])
+        self._data_start = -(-(start + header_len) // _ALIGN) * _ALIGN
+        self._string_offsets = self.array("strings.offsets")
+        self._string_data = self.array("strings.data")
+        self.tables = {kind: SnapshotTable(self, kind) for kind in self.header["tables"]}
+
+    def array(self, name: str) -> np.ndarray:
+        spec = self.header["arrays"][name]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"])) if spec["shape"] else 1
+        return np.frombuffer(
+            self._mmap, dtype=dtype, count=count, offset=self._data_start + spec["offset"]
+        ).reshape(spec["shape"])
+
+    def string(self, sid: int) -> str:
+        start, end = self._string_offsets[sid], self._string_offsets[sid + 1]
+        return self._string_data[start:end].tobytes().decode("utf-8")
+
+
+class SnapshotTable:
+    """One table of a snapshot: row lookups by key and lazy record materialization."""
+
+    def __init__(self, snapshot: Snapshot, kind: str):
+        self._snapshot = snapshot
+        spec = snapshot.header["tables"][kind]
+        self.kind = kind
+        self.rows = spec["rows"]
+        self._fields = spec["fields"]
+        self._columns = {
+            field: {k: (snapshot.array(v) if k in ("present", "data", "offsets", "keys") else v)
+                    for k, v in column.items()}
+            for field, column in spec["columns"].items()
+        }
+        self._key = {k: snapshot.array(v) for k, v in spec["key"].items()}
+        self._secondary = {f: {k: snapshot.array(v) for k, v in idx.items()} for f, idx in spec["secondary"].items()}
+        self.members = {k: snapshot.array(v) for k, v in spec.get("members", {}).items()}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, field: str) -> np.ndarray:
+        """Raw column data, e.g. the float64 "lat" column, without materializing records."""
+        return self._columns[field]["data"]
+
+    def _value(self, column: dict, row: int) -> Any:
+        data = column["data"]
+        kind = column["type"]
+        if kind == "str":
+            return self._snapshot.string(int(data[row]))
+        if kind == "float":
+            return float(data[row])
+        if kind == "int":
+            return int(data[row])
+        if kind == "bool":
+            return bool(data[row])
+        if kind == "strlist":
+            start, end = column["offsets"][row], column["offsets"][row + 1]
+            return [self._snapshot.string(int(s)) for s in data[start:end]]
+        if kind == "flags":
+            keys, true = column["keys"][row], data[row]
+            return {
+                name: bool((int(true[i // 64]) >> (i % 64)) & 1)
+                for i, name in enumerate(column["vocab"])
+                if (int(keys[i // 64]) >> (i % 64)) & 1
+            }
+        return json.loads(self._snapshot.string(int(data[row])))
+
+    def record(self, row: int) -> dict:
+        """Materializes one row as a dict shaped like the source record."""
+        record = {}
+        for field in self._fields:
+            column = self._columns[field]
+            if "present" in column and not column["present"][row]:
+                continue
+            record[field] = self._value(column, row)
+        return record
+
+    def __iter__(self) -> Iterator[dict]:
+        return (self.record(row) for row in range(self.rows))
+
+    @staticmethod
+    def _rows_for(index: dict, key: str) -> np.ndarray:
+        h = np.uint64(_hash(key))
+        lo = np.searchsorted(index["hashes"], h, side="left")
+        hi = np.searchsorted(index["hashes"], h, side="right")
+        return index["rows"][lo:hi]
+
+    def find(self, key: str) -> dict | None:
+        """Record by primary key."""
+        key_field = _KEYS[self.kind]
+        for row in self._rows_for(self._key, key):
+            record = self.record(int(row))
+            if record[key_field] == key:    # guard against hash collisions
+                return record
+        return None
+
+    def find_all(self, field: str, value: str) -> list[dict]:
+        """Records whose secondary-indexed field equals value."""
+        records = (self.record(int(row)) for row in self._rows_for(self._secondary[field], value))
+        return [r for r in records if r[field] == value]
+
+
+# ── Repositories ──────────────────────────────────────────────────────────────
+
+class _SnapshotRepository:
+    def __init__(self, table: SnapshotTable):
+        self._table = table
+
+    def list_all(self) -> list[dict]:
+        return list(self._table)
+
+    def get(self, key: str) -> dict | None:
+        return self._table.find(key)
+
+    def upsert(self, records: Iterable[dict]) -> int:
+        raise TypeError("Snapshot repositories are read-only; rebuild the snapshot with `python -m data.snapshot`")
+
+
+class SnapshotHospitalRepository(_SnapshotRepository):
+    pass
+
+
+class SnapshotDoctorRepository(_SnapshotRepository):
+    def at_hospital(self, hospital_id: str) -> list[dict]:
+        return self._table.find_all("hospital_id", hospital_id)
+
+
+class SnapshotClaimsRepository(_SnapshotRepository):
+    def for_policy(self, policy_number: str) -> list[dict]:
+        return self._table.find_all("policy_number", policy_number)
+
+
+class SnapshotPolicyRepository(_SnapshotRepository):
+    def find_members(self, full_name: str, date_of_birth: str | None = None) -> tuple[PolicyMatch, ...]:
+        name_key = normalize_text(full_name or "")
+        if not name_key:
+            return ()
+        members = self._table.members
+        h = np.uint64(_hash(name_key))
+        lo = int(np.searchsorted(members["hashes"], h, side="left"))
+        hi = int(np.searchsorted(members["hashes"], h, side="right"))
+        string = self._table._snapshot.string
+        matches = []
+        for i in range(lo, hi):
+            name = string(int(members["names"][i]))
+            if normalize_text(name) != name_key:
+                continue
+            dob = string(int(members["dobs"][i])) if members["dobs"][i] >= 0 else None
+            if date_of_birth and dob not in (None, date_of_birth):
+                continue
+            record = self._table.record(int(members["policy_rows"][i]))
+            matches.append(PolicyMatch(record, name, _RELATIONS[members["relations"][i]], dob))
+        return tuple(matches)
+
+
+def snapshot_repositories(path: str | Path) -> Repositories:
+    snapshot = Snapshot(path)
+    tables = snapshot.tables
+    return Repositories(
+        SnapshotHospitalRepository(tables["hospitals"]),
+        SnapshotDoctorRepository(tables["doctors"]),
+        SnapshotPolicyRepository(tables["policies"]),
+        SnapshotClaimsRepository(tables["claims"]),
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Compile reference data into a memory-mappable snapshot.")
+    parser.add_argument("--out", required=True, help="snapshot file (DATA_SNAPSHOT_PATH)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    from data.repositories import REPOSITORIES  # the configured source backend
+
+    path = build_snapshot(REPOSITORIES, args.out)
+    logger.info("Wrote %s (%.1f MB)", path, path.stat().st_size / 1e6)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,24 @@
 """FastAPI App Entry Point"""
+import asyncio
 import logging
+import os
 
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
 from routers.mediroute_router import router
 from routers.mediroute_streaming_router import router as streaming_router
 from routers.mediroute_chat_router import router as chat_router
 from routers.mediroute_chat_streaming_router import router as chat_streaming_router
+from routers.mass_casualty_router import router as mass_casualty_router
+from models.capacity_models import CapacityUpdateBatch
+from agents.graph import speculation_metrics
+from agents.nodes.match_agent import cell_cache_stats
+from data.capacity import CAPACITY
+from data.geocoder import GEOCODER
+from data.reference import REFERENCE
+from data.reservations import RESERVATIONS
 
 logging.basicConfig(
     level=logging.INFO,
@@ -20,10 +30,20 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     """Application lifespan handler for startup and shutdown events."""
+    # Each worker polls the reference data source; unchanged data is not rebuilt
+    reload_seconds = float(os.getenv("REFERENCE_RELOAD_SECONDS", "0"))
+    watcher = asyncio.create_task(REFERENCE.watch(reload_seconds)) if reload_seconds > 0 else None
+
     logger.info("MediRoute AI service started successfully")
     yield
     logger.info("MediRoute AI service shutting down...")
 
+    if watcher:
+        watcher.cancel()
+        with suppress(asyncio.CancelledError):
+            await watcher
+    await GEOCODER.aclose()
+
 app = FastAPI(
     title="MediRoute AI",
     description="Autonomous Medical Evacuation Decision Engine",
@@ -50,9 +70,95 @@ app.include_router(router)
 app.include_router(streaming_router)
 app.include_router(chat_router)
 app.include_router(chat_streaming_router)
+app.include_router(mass_casualty_router)
 
 @app.get("/health")
 async def health():
     """Health check endpoint"""
     logger.info("Health check endpoint called")
     return {"status": "ok", "service": "MediRoute AI"}
+
+@app.get("/metrics/speculation")
+async def speculation_metrics_endpoint():
+    """Hit rate and wasted work per graph-node speculation"""
+    return speculation_metrics()
+
+@app.get("/metrics/geocoder")
+async def geocoder_metrics_endpoint():
+    """Geocoding provider requests, fallbacks to the gazetteer and cache hit rate"""
+    return GEOCODER.stats()
+
+@app.get("/metrics/cell-cache")
+async def cell_cache_metrics_endpoint():
+    """Hit rate and size of the nearest-hospitals cache per grid cell"""
+    return cell_cache_stats()
+
+@app.post("/capacity")
+async def capacity_update(batch: CapacityUpdateBatch):
+    """Hospital status updates (ER load, beds, ICU beds, diversion) for capacity-aware matching"""
+    hospitals = REFERENCE.current().hospitals
+    known = [u for u in batch.updates if hospitals.get(u.hospital_id)]
+    applied = CAPACITY.update(u.as_update() for u in known)
+    return {
+        "applied": applied,
+        "outdated": len(known) - applied,
+        "unknown_hospitals": sorted({u.hospital_id for u in batch.updates} - {u.hospital_id for u in known}),
+    }
+
+@app.get("/capacity")
+async def capacity_status():
+    """Hospitals reporting, on diversion and busy; updates applied and dropped"""
+    return CAPACITY.stats()
+
+@app.get("/capacity/{hospital_id}")
+async def hospital_capacity(hospital_id: str):
+    """A hospital's latest reported status"""
+    status = CAPACITY.get(hospital_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="No recent status for this hospital")
+    return status._asdict()
+
+@app.get("/reservations")
+async def reservation_status():
+    """Beds held for patients on their way; reservations granted, refused, released and CAS conflicts"""
+    return RESERVATIONS.stats()
+
+@app.get("/reservations/{reservation_id}")
+async def reservation(reservation_id: str):
+    """The bed held for an LOA (reservation id = LOA number)"""
+    held = RESERVATIONS.get(reservation_id)
+    if held is None:
+        raise HTTPException(status_code=404, detail="No bed held for this LOA")
+    return held._asdict()
+
+def _release_loa(reservation_id: str) -> dict:
+    """Releases the bed held for an LOA and ends its doctor's case."""
+    released = RESERVATIONS.release(reservation_id)
+    doctor_id = REFERENCE.current().doctors.release_case(reservation_id)
+    if released is None and doctor_id is None:
+        raise HTTPException(status_code=404, detail="No bed held for this LOA")
+    return {**(released._asdict() if released else {}), "doctor_released": doctor_id}
+
+@app.post("/reservations/{reservation_id}/arrived")
+async def reservation_arrived(reservation_id: str):
+    """The patient arrived: the hospital's own bed counts and case list take over from the hold"""
+    return _release_loa(reservation_id)
+
+@app.delete("/reservations/{reservation_id}")
+async def reservation_cancel(reservation_id: str):
+    """Releases the bed held for a cancelled LOA and its attending doctor's case"""
+    return _release_loa(reservation_id)
+
+@app.get("/reference")
+async def reference_status():
+    """Current reference data version and the versions retained for in-flight runs"""
+    return REFERENCE.status()
+
+@app.post("/reference/reload")
+async def reference_reload(force: bool = False):
+    """Rebuilds hospitals and doctors from the data backend and swaps them in (this worker)"""
+    try:
+        await REFERENCE.reload_async(force)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    return REFERENCE.status()
@@ -0,0 +1,25 @@
+"""Models for the hospital capacity feed."""
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class HospitalStatusUpdate(BaseModel):
+    """One hospital's current capacity; fields left out keep their last reported value."""
+    hospital_id: str
+    reported_at: Optional[datetime] = None      # when the hospital measured it; default: on receipt
+    er_load: Optional[float] = Field(default=None, ge=0)    # share of ER capacity in use, >1 when overflowing
+    beds_available: Optional[int] = Field(default=None, ge=0)
+    icu_beds_available: Optional[int] = Field(default=None, ge=0)
+    on_diversion: Optional[bool] = None
+
+    def as_update(self) -> dict:
+        """The update for CapacityStore.update(), reported_at as epoch seconds."""
+        update = self.model_dump()
+        update["reported_at"] = self.reported_at.timestamp() if self.reported_at else None
+        return update
+
+
+class CapacityUpdateBatch(BaseModel):
+    """Request model for POST /capacity."""
+    updates: list[HospitalStatusUpdate] = Field(max_length=10_000)
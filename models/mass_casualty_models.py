@@ -0,0 +1,54 @@
+"""Models for mass-casualty assignment."""
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+
+from models.mediroute_chat_models import PatientCoordinates
+
+
+class MassCasualtyPatient(BaseModel):
+    """One patient of the incident, as triaged on scene."""
+    patient_id: str = Field(min_length=1, max_length=64)    # e.g. the triage tag number
+    # The policy holder or dependent; required to issue an LOA (the policy is verified)
+    patient_name: Optional[str] = Field(default=None, max_length=200)
+    date_of_birth: Optional[str] = None     # YYYY-MM-DD; tells apart members with the same name
+    severity: Literal["CRITICAL", "URGENT", "MODERATE"]
+    classification_type: Literal["CARDIAC", "TRAUMA", "NEUROLOGICAL", "RESPIRATORY", "BURNS", "GENERAL"] = "TRAUMA"
+    insurance_provider: str
+    needs_icu: Optional[bool] = None        # default: CRITICAL patients
+    symptoms: Optional[str] = Field(default=None, max_length=2000)
+    # Where the patient is picked up; default: the incident location
+    coordinates: Optional[PatientCoordinates] = None
+    location: Optional[str] = Field(default=None, max_length=200)
+
+
+class MassCasualtyRequest(BaseModel):
+    """Request model for POST /mass-casualty/assign."""
+    incident_location: Optional[str] = Field(default=None, max_length=200)
+    incident_coordinates: Optional[PatientCoordinates] = None
+    current_situation: Optional[str] = Field(default=None, max_length=2000)
+    patients: list[MassCasualtyPatient] = Field(min_length=1, max_length=2_000)
+    issue_loas: bool = True     # False: the assignment only, nothing reserved
+
+
+class MassCasualtyAssignment(BaseModel):
+    """The hospital assigned to one patient, and the LOA issued."""
+    patient_id: str
+    assigned: bool
+    hospital_id: Optional[str] = None
+    hospital_name: Optional[str] = None
+    distance_km: Optional[float] = None
+    eta_minutes: Optional[float] = None
+    er_busy: Optional[bool] = None
+    bed: Optional[str] = None               # "bed" / "icu_bed"
+    reason: Optional[str] = None            # why the patient is not assigned
+    policy_number: Optional[str] = None     # the policy verified for the LOA
+    remaining_benefits: Optional[float] = None
+    loa: Optional[dict] = None
+
+
+class MassCasualtyResponse(BaseModel):
+    """Response model for POST /mass-casualty/assign."""
+    assigned: int
+    unassigned: int
+    solve_ms: float
+    patients: list[MassCasualtyAssignment]
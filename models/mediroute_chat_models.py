@@ -1,19 +1,54 @@
 """Models for chat request and response."""
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 
-from agents.state import LOAOutput, ReportOutput
+from agents.state import LOAOutput, PatientIntake, ReportOutput
+
+
+class PatientCoordinates(BaseModel):
+    """Device location fix, e.g. from the browser or phone GPS."""
+    lat: float = Field(ge=-90, le=90)
+    lng: float = Field(ge=-180, le=180)
+    accuracy_m: Optional[float] = Field(default=None, ge=0)    # radius of the fix, meters
 
 
 class ChatRequest(BaseModel):
-    """Request model for chat interactions."""
+    """
+    Request model for chat interactions.
+
+    The intake fields are optional; whatever the client already knows
+    (device location, a form) is taken as given, so the assistant does not
+    spend turns asking for it.
+    """
     session_id: str
     patient_name: str
     user_input: str
+    date_of_birth: Optional[str] = None     # YYYY-MM-DD; tells apart members with the same name
+    # Intake
+    coordinates: Optional[PatientCoordinates] = None
+    location: Optional[str] = Field(default=None, max_length=200)
+    symptoms: Optional[str] = Field(default=None, max_length=2000)
+    preferred_hospital: Optional[str] = Field(default=None, max_length=200)   # "none" = no preference
+
+    @field_validator("location", "symptoms", "preferred_hospital")
+    @classmethod
+    def _blank_as_missing(cls, value: Optional[str]) -> Optional[str]:
+        return value.strip() or None if value is not None else None
+
+    def intake(self) -> PatientIntake:
+        """The intake fields that were provided."""
+        intake = PatientIntake()
+        if self.coordinates is not None:
+            intake["coordinates"] = self.coordinates.model_dump()
+        for field in ("location", "symptoms", "preferred_hospital"):
+            value = getattr(self, field)
+            if value is not None:
+                intake[field] = value
+        return intake
 
 
 class ChatResponse(BaseModel):
     """Response model for chat interactions."""
     session_id: str
     response: str
-    agent_name: Optional[str] = None
\ No newline at end of file
+    agent_name: Optional[str] = None
@@ -0,0 +1,37 @@
+"""FastAPI Router for mass-casualty assignment."""
+import logging
+
+from fastapi import APIRouter, HTTPException
+
+from models.mass_casualty_models import MassCasualtyRequest, MassCasualtyResponse
+from services.mass_casualty_service import mass_casualty_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/mass-casualty", tags=["MediRoute AI"])
+
+@router.post("/assign", response_model=MassCasualtyResponse)
+async def assign(request: MassCasualtyRequest):
+    """Assign hospitals to the patients of one incident within the beds free, and issue their LOAs."""
+
+    if len({p.patient_id for p in request.patients}) < len(request.patients):
+        raise HTTPException(status_code=400, detail="patient_id must be unique.")
+    if not (request.incident_location or request.incident_coordinates) and any(
+        not (p.location or p.coordinates) for p in request.patients
+    ):
+        raise HTTPException(status_code=400, detail="incident location required for patients without one.")
+
+    try:
+        result = await mass_casualty_service.process(
+            patients=[p.model_dump() for p in request.patients],
+            incident_location=request.incident_location,
+            incident_coordinates=request.incident_coordinates.model_dump() if request.incident_coordinates else None,
+            current_situation=request.current_situation,
+            issue_loas=request.issue_loas,
+        )
+
+        return MassCasualtyResponse(**result)
+
+    except Exception as e:
+        logger.error("Error processing mass-casualty assignment: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e)) from e
@@ -23,6 +23,7 @@ async def send_message(request: ChatRequest):
         result = await chat_service.process_message(
             session_id=request.session_id,
             user_input=request.user_input,
+            intake=request.intake(),
         )
 
         return ChatResponse(
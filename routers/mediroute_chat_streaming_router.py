@@ -24,6 +24,8 @@ async def send_message(request: ChatRequest):
             session_id=request.session_id,
             patient_name=request.patient_name,
             user_input=request.user_input,
+            date_of_birth=request.date_of_birth,
+            intake=request.intake(),
         )
         return ChatResponse(
             session_id=result["session_id"],
@@ -58,6 +60,8 @@ async def send_message_stream(request: ChatRequest):
             session_id=request.session_id,
             patient_name=request.patient_name,
             user_input=request.user_input,
+            date_of_birth=request.date_of_birth,
+            intake=request.intake(),
         ),
         media_type="text/event-stream",
         headers={
@@ -0,0 +1,368 @@
+"""
+Mass-casualty Service — hospitals for the patients of one incident, assigned
+together within the beds each hospital has free, then an LOA for each.
+
+Matched one by one, every patient of a bus crash would take the same nearest
+hospital. Here each patient's nearest hospitals that would take them are the
+candidates, and a min-cost flow (utils/assignment_util.py) picks among them:
+a hospital takes no more patients than it has beds free and not already held
+(ICU beds for patients needing intensive care), and the cost of a patient is
+their travel time weighted by severity — critical patients get the closest
+hospitals, and are placed first when beds run short. Before any bed is held,
+each patient's policy is verified as in the chat flow; a patient who fails
+verification is not assigned.
+"""
+import asyncio
+import logging
+import os
+import time
+
+import numpy as np
+
+from typing import Dict, List, Optional
+
+from agents.nodes.loa_agent import loa_agent_node
+from agents.nodes.match_agent import candidate_hospitals
+from agents.nodes.verification_agent import lookup_verification
+from data.capacity import CAPACITY
+from data.geocoder import GEOCODER
+from data.hospitals import EMERGENCY_LOA_SERVICES_MAP
+from data.reference import REFERENCE
+from data.repositories import off_loop
+from data.reservations import RESERVATIONS
+from utils.assignment_util import min_cost_transport
+from utils.llm_util import PRIORITY_CRITICAL, PRIORITY_NORMAL
+
+logger = logging.getLogger(__name__)
+
+# Nearest hospitals considered per patient; widened for patients they cannot all
+# take, up to _MAX_CANDIDATES (when beds are scarce, every row is left short)
+_CANDIDATES = int(os.getenv("MASS_CASUALTY_CANDIDATES", "20"))
+_MAX_CANDIDATES = max(_CANDIDATES, int(os.getenv("MASS_CASUALTY_MAX_CANDIDATES", "80")))
+
+# Beds taken to be free at a hospital that has not reported its capacity
+_UNREPORTED_BEDS = int(os.getenv("MASS_CASUALTY_UNREPORTED_BEDS", "10"))
+
+# A minute of travel counts this much more for a more severe patient
+_SEVERITY_WEIGHT = {"CRITICAL": 4.0, "URGENT": 2.0, "MODERATE": 1.0}
+
+# Travel minutes per straight-line km where there is no road ETA (40 km/h)
+_MINUTES_PER_KM = 60 / 40
+
+# Patients this close together (degrees, ~500 m) share travel times
+_SITE_DEG = 0.005
+
+# Assignment rounds: patients whose bed was taken meanwhile are assigned again
+_ROUNDS = 3
+
+_UNASSIGNED = {
+    "assigned": False,
+    "hospital_id": None,
+    "hospital_name": None,
+    "distance_km": None,
+    "eta_minutes": None,
+    "er_busy": None,
+    "bed": None,
+    "reason": None,
+    "loa": None,
+}
+
+
+def _loa_services(classification_type: str, needs_icu: bool) -> list[str]:
+    """Services to authorize: all for the emergency type, ICU admission only if needed."""
+    loa_map = EMERGENCY_LOA_SERVICES_MAP.get(classification_type, EMERGENCY_LOA_SERVICES_MAP["GENERAL"])
+    return [svc["label"] for svc in loa_map["services"] if needs_icu or svc["requires"] != "icu"]
+
+
+def _verification_issue(patient: Dict, lookup: Dict | None) -> str | None:
+    """Why the patient's policy does not back an LOA (see verification_agent_node); None if it does."""
+    if lookup is None:
+        return "patient_name is required to verify the policy"
+    record = lookup["record"]
+    if not record and lookup["candidates"]:
+        return "several policies match the patient's name; date_of_birth is required"
+    if not record:
+        return "no insurance record found for the patient"
+    if not lookup["is_valid"]:
+        return lookup["validity_reason"]
+    if record["insurance_provider"] != patient["insurance_provider"]:
+        return f"policy {record['policy_number']} is with {record['insurance_provider']}, not {patient['insurance_provider']}"
+    return None
+
+
+def _free_beds(hospital_id: str, resource: str) -> int:
+    """Beds of that kind reported free and not held for other patients."""
+    available = CAPACITY.available(hospital_id, resource)
+    if available is None:
+        available = _UNREPORTED_BEDS
+    return max(0, available - RESERVATIONS.held(hospital_id, resource))
+
+
+class MassCasualtyService:
+    """Service to assign and authorize many patients of one incident at once."""
+
+    async def process(
+        self,
+        patients: List[Dict],
+        incident_location: Optional[str] = None,
+        incident_coordinates: Optional[Dict] = None,
+        current_situation: Optional[str] = None,
+        issue_loas: bool = True,
+    ) -> Dict:
+        """
+        Assigns a hospital to each patient ({patient_id, patient_name,
+        date_of_birth, severity, classification_type, insurance_provider,
+        needs_icu, symptoms, coordinates, location}; coordinates and location
+        default to the incident's) and, if issue_loas, verifies their policies
+        and issues the verified patients' LOAs concurrently.
+        """
+        results = {
+            p["patient_id"]: {"patient_id": p["patient_id"], **_UNASSIGNED, "policy_number": None, "remaining_benefits": None}
+            for p in patients
+        }
+        chosen: Dict[str, Dict] = {}    # patient id → the candidate assigned
+
+        with REFERENCE.pinned():
+            pending = await self._locate(patients, incident_location, incident_coordinates, results)
+            if issue_loas:
+                pending = await self._verify(pending, results)
+
+            solve_ms = 0.0
+            for _ in range(_ROUNDS):
+                started = time.perf_counter()
+                # CPU-bound: solved in a worker thread, so other requests are served meanwhile
+                assignments = await asyncio.to_thread(self._assign, pending)
+                solve_ms += (time.perf_counter() - started) * 1000
+                for patient_id, (candidate, assignment) in assignments.items():
+                    chosen[patient_id] = candidate
+                    results[patient_id].update(assignment)
+
+                if not issue_loas:
+                    break
+                refused = await self._issue_loas(pending, results, chosen, current_situation)
+                pending = [p for p in pending if p["patient_id"] in refused]
+                if not pending:
+                    break
+                logger.info("%d beds taken meanwhile — assigning those patients again.", len(pending))
+
+        assigned = sum(r["assigned"] for r in results.values())
+        logger.info(
+            "Mass-casualty assignment: %d of %d patients placed, solved in %.0f ms",
+            assigned, len(results), solve_ms
+        )
+        return {
+            "assigned": assigned,
+            "unassigned": len(results) - assigned,
+            "solve_ms": round(solve_ms, 1),
+            "patients": list(results.values()),
+        }
+
+    @staticmethod
+    async def _locate(
+        patients: List[Dict],
+        incident_location: Optional[str],
+        incident_coordinates: Optional[Dict],
+        results: Dict[str, Dict],
+    ) -> List[Dict]:
+        """The patients with lat/lng; those that cannot be located are reported so."""
+        points = [
+            p.get("coordinates") or (None if p.get("location") else incident_coordinates)
+            for p in patients
+        ]
+        geocodes = await GEOCODER.geocode_many([
+            None if point else p.get("location") or incident_location
+            for p, point in zip(patients, points)
+        ])
+
+        located = []
+        for patient, point, geocode in zip(patients, points, geocodes):
+            if point:
+                lat, lng = point["lat"], point["lng"]
+            elif geocode.resolved:
+                lat, lng = geocode.coordinates
+            else:
+                results[patient["patient_id"]]["reason"] = "location could not be resolved"
+                continue
+            needs_icu = patient.get("needs_icu")
+            located.append({
+                **patient,
+                "lat": lat,
+                "lng": lng,
+                "needs_icu": patient["severity"] == "CRITICAL" if needs_icu is None else needs_icu,
+            })
+        return located
+
+    @staticmethod
+    async def _verify(patients: List[Dict], results: Dict[str, Dict]) -> List[Dict]:
+        """
+        The patients whose policy backs an LOA: found by name (and date of
+        birth), currently valid and with the insurer given, as the chat flow
+        verifies them. Benefit usage from the claims ledger is reported with
+        each; the others are reported unassigned with the reason.
+        """
+        # Policy and claims lookups may hit the database — one worker thread for all
+        lookups = await off_loop(lambda: [
+            lookup_verification(p["patient_name"], p.get("date_of_birth")) if p.get("patient_name") else None
+            for p in patients
+        ])
+
+        verified = []
+        for patient, lookup in zip(patients, lookups):
+            result = results[patient["patient_id"]]
+            reason = _verification_issue(patient, lookup)
+            if reason:
+                result["reason"] = f"policy not verified: {reason}"
+                continue
+            result["policy_number"] = lookup["record"]["policy_number"]
+            result["remaining_benefits"] = lookup["remaining_benefits"]
+            verified.append(patient)
+        return verified
+
+    @staticmethod
+    def _assign(patients: List[Dict]) -> Dict[str, tuple[Dict | None, Dict]]:
+        """
+        (candidate assigned, result fields) per patient id. Patients alike for
+        the purpose — same site, insurer, emergency type, ICU need and
+        severity — are one row of the flow; a row left short that filled all
+        its candidates gets twice as many, up to _MAX_CANDIDATES.
+        """
+        groups: Dict[tuple, List[Dict]] = {}
+        for p in patients:
+            key = (
+                round(p["lat"] / _SITE_DEG), round(p["lng"] / _SITE_DEG),
+                p["insurance_provider"], p["classification_type"], p["needs_icu"], p["severity"],
+            )
+            groups.setdefault(key, []).append(p)
+        # Rows are placed in order: the most severe first
+        keys = sorted(groups, key=lambda key: -_SEVERITY_WEIGHT.get(key[-1], 1.0))
+
+        k = {key: _CANDIDATES for key in keys}
+        candidates: Dict[tuple, List[Dict]] = {}
+        widen = keys
+        while True:
+            for key in widen:
+                first = groups[key][0]
+                candidates[key] = candidate_hospitals(
+                    first["lat"], first["lng"], k[key],
+                    first["insurance_provider"], first["classification_type"],
+                    ["icu"] if first["needs_icu"] else [], first["needs_icu"],
+                )
+
+            columns: Dict[tuple[str, str], int] = {}
+            for key in keys:
+                resource = "icu_bed" if key[4] else "bed"
+                for c in candidates[key]:
+                    columns.setdefault((c["hospital"]["id"], resource), len(columns))
+
+            costs = np.full((len(keys), len(columns)), np.inf)
+            for row, key in enumerate(keys):
+                resource = "icu_bed" if key[4] else "bed"
+                weight = _SEVERITY_WEIGHT.get(key[-1], 1.0)
+                for c in candidates[key]:
+                    minutes = c["eta_minutes"] if c["eta_minutes"] is not None else c["distance_km"] * _MINUTES_PER_KM
+                    costs[row, columns[(c["hospital"]["id"], resource)]] = weight * minutes
+            supply = np.array([len(groups[key]) for key in keys])
+            capacity = np.array([_free_beds(*column) for column in columns], dtype=np.int64)
+
+            flow = min_cost_transport(costs, supply, capacity)
+
+            # Widen the candidates of rows left short that had as many as asked
+            widen = [
+                key for row, key in enumerate(keys)
+                if flow[row].sum() < supply[row] and len(candidates[key]) == k[key] < _MAX_CANDIDATES
+            ]
+            if not widen:
+                break
+            for key in widen:
+                k[key] = min(2 * k[key], _MAX_CANDIDATES)
+
+        column_keys = list(columns)
+        assignments = {}
+        for row, key in enumerate(keys):
+            by_id = {c["hospital"]["id"]: c for c in candidates[key]}
+            unplaced = iter(groups[key])
+            for column in flow[row].nonzero()[0]:
+                hospital_id, resource = column_keys[column]
+                c = by_id[hospital_id]
+                for _ in range(flow[row, column]):
+                    patient = next(unplaced)
+                    assignments[patient["patient_id"]] = c, {
+                        "assigned": True,
+                        "hospital_id": hospital_id,
+                        "hospital_name": c["hospital"]["name"],
+                        "distance_km": c["distance_km"],
+                        "eta_minutes": c["eta_minutes"],
+                        "er_busy": c["er_busy"],
+                        "bed": resource,
+                        "reason": None,
+                    }
+            for patient in unplaced:
+                assignments[patient["patient_id"]] = None, {
+                    **_UNASSIGNED,
+                    "reason": (
+                        f"no hospital nearby with a free {'ICU bed' if key[4] else 'bed'} "
+                        f"that accepts {key[2]} and supports {key[3]} emergencies"
+                    ),
+                }
+        return assignments
+
+    @staticmethod
+    async def _issue_loas(
+        patients: List[Dict],
+        results: Dict[str, Dict],
+        chosen: Dict[str, Dict],
+        current_situation: Optional[str],
+    ) -> set:
+        """
+        Issues the assigned patients' LOAs concurrently; returns the ids whose
+        bed was taken meanwhile. Patients whose LOA failed are left unassigned.
+        """
+
+        async def issue(patient: Dict) -> None:
+            result = results[patient["patient_id"]]
+            c = chosen[patient["patient_id"]]
+            hospital = c["hospital"]
+            output = await loa_agent_node({
+                "classification_agent_output": {
+                    "classification_type": patient["classification_type"],
+                    "symptoms": patient.get("symptoms") or "unknown",
+                    "severity": patient["severity"],
+                    "recommended_action": "HOSPITAL_ADMISSION",
+                    "insurance_provider": patient["insurance_provider"],
+                },
+                "match_agent_output": {
+                    "matched": True,
+                    "hospital_id": hospital["id"],
+                    "hospital_name": hospital["name"],
+                    "address": hospital["address"],
+                    "contact": hospital["contact"],
+                    "emergency_contact": hospital["emergency_contact"],
+                    "distance_km": c["distance_km"],
+                    "eta_minutes": c["eta_minutes"],
+                    "hospital_raw": hospital,
+                    "preferred_hospital_used": False,
+                },
+                "selected_loa_services": _loa_services(patient["classification_type"], patient["needs_icu"]),
+                "current_situation": current_situation,
+                "triage_priority": PRIORITY_CRITICAL if patient["severity"] == "CRITICAL" else PRIORITY_NORMAL,
+            })
+            result["loa"] = output.get("loa_output")
+
+        assigned = [p for p in patients if results[p["patient_id"]]["assigned"]]
+        # One failed LOA (an LLM error, say) must not lose the others issued
+        outcomes = await asyncio.gather(*(issue(p) for p in assigned), return_exceptions=True)
+
+        refused = set()
+        for patient, outcome in zip(assigned, outcomes):
+            result = results[patient["patient_id"]]
+            if isinstance(outcome, BaseException):
+                logger.error("LOA for patient %s failed: %s", patient["patient_id"], outcome)
+                result.update(_UNASSIGNED, reason=f"the LOA could not be issued ({outcome.__class__.__name__})")
+            elif result["loa"] is None:
+                refused.add(patient["patient_id"])
+                bed = "ICU bed" if result["bed"] == "icu_bed" else "bed"
+                result.update(_UNASSIGNED, reason=f"the {bed} was taken meanwhile")
+        return refused
+
+# Singleton
+mass_casualty_service = MassCasualtyService()
@@ -3,9 +3,10 @@ import logging
 
 from typing import Dict, List
 from langchain_core.messages import HumanMessage, AIMessage
+from langgraph.types import Command
 
 from agents.graph import graph
-from agents.state import AgentState
+from agents.state import AgentState, PatientIntake
 
 logger = logging.getLogger(__name__)
 
@@ -13,19 +14,26 @@ logger = logging.getLogger(__name__)
 class ChatService:
     """Service to handle chat interactions and maintain session state."""
     def __init__(self):
-        # Store full AgentState per session
+        # Latest AgentState per session (authoritative copy lives in the graph checkpointer)
         self.sessions: Dict[str, AgentState] = {}
 
-    async def process_message(self, session_id: str, user_input: str) -> Dict:
+    async def process_message(
+        self, session_id: str, user_input: str, intake: PatientIntake | None = None
+    ) -> Dict:
         """Process user message and return response."""
 
+        config = {"configurable": {"thread_id": session_id}}
+        snapshot = await graph.aget_state(config)
+
         # Initialize session if not exist
-        if session_id not in self.sessions:
-            self.sessions[session_id] = AgentState(
-                messages=[],
+        if not snapshot.values:
+            graph_input = AgentState(
+                messages=[HumanMessage(content=user_input)],
+                intake=intake or {},
                 next_agent="",
                 classification_agent_output=None,
                 selected_loa_services=[],
+                rematch=False,
                 match_agent_output=None,
                 chosen_hospital=None,
                 loa_output=None,
@@ -33,28 +41,27 @@ class ChatService:
             )
             logger.info("NEW SESSION | Session: %s", session_id)
         else:
-            logger.info("EXISTING SESSION | Session: %s", session_id)
-
-        current_state = self.sessions[session_id]
-
-        # Append user message to session history
-        user_message = HumanMessage(content=user_input)
-        current_state["messages"].append(user_message)
+            # Intake fields sent on a later turn update the ones already known
+            update = {"intake": {**(snapshot.values.get("intake") or {}), **intake}} if intake else {}
+            if snapshot.interrupts:
+                # Run is suspended at hospital selection — resume it with this reply
+                graph_input = Command(resume=user_input, update=update or None)
+                logger.info("RESUMING SESSION | Session: %s", session_id)
+            else:
+                graph_input = {"messages": [HumanMessage(content=user_input)], **update}
+                logger.info("EXISTING SESSION | Session: %s", session_id)
 
         logger.info("USER: %s", user_input)
-        logger.info("Total messages in session: %s", len(current_state["messages"]))
 
         # --- Invoke Graph ---
-        final_state = await graph.ainvoke(current_state)
+        # State is persisted by the graph's checkpointer under the session's thread_id
+        await graph.ainvoke(graph_input, config)
 
-        # Merge final state safely
-        for key, value in final_state.items():
-            if value is not None:
-                current_state[key] = value
-
-        # Save updated state back
+        current_state = (await graph.aget_state(config)).values
         self.sessions[session_id] = current_state
 
+        logger.info("Total messages in session: %s", len(current_state["messages"]))
+
         final_messages = current_state.get("messages", [])
 
         # Get last AI message
@@ -4,9 +4,10 @@ import logging
 from typing import AsyncGenerator, Dict, List
 
 from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.types import Command
 
 from agents.graph import graph
-from agents.state import AgentState
+from agents.state import AgentState, PatientIntake
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +22,6 @@ NODE_STATUS_MESSAGES: Dict[str, str] = {
     "response_agent":       "💬 Preparing your response...",
 }
 
-# The top-level graph name emitted by LangGraph in astream_events
-# This is the event name for the full graph run finishing
-_GRAPH_ROOT_NAME = "LangGraph"
-
 
 class ChatService:
     """Service to handle chat interactions and maintain session state."""
@@ -32,40 +29,89 @@ class ChatService:
     def __init__(self):
         self.sessions: Dict[str, AgentState] = {}
 
-    def _get_or_create_session(self, session_id: str, patient_name: str = "") -> AgentState:
-        if session_id not in self.sessions:
-            self.sessions[session_id] = AgentState(
-                messages=[],
+    @staticmethod
+    def _config(session_id: str) -> dict:
+        return {"configurable": {"thread_id": session_id}}
+
+    async def _build_graph_input(
+        self,
+        session_id: str,
+        patient_name: str,
+        user_input: str,
+        date_of_birth: str | None = None,
+        intake: PatientIntake | None = None,
+    ):
+        """
+        Builds the graph input for this turn. State lives in the graph's checkpointer
+        under the session's thread_id, so only the new message is sent — or, when the
+        previous run is suspended at hospital selection, a resume command. Intake
+        fields sent on a later turn update the ones already known.
+        """
+        snapshot = await graph.aget_state(self._config(session_id))
+
+        if not snapshot.values:
+            logger.info("NEW SESSION | Session: %s | Patient: %s", session_id, patient_name)
+            if intake:
+                logger.info("Intake provided: %s", sorted(intake))
+            return AgentState(
+                messages=[HumanMessage(content=user_input)],
                 patient_name=patient_name,
+                date_of_birth=date_of_birth,
+                intake=intake or {},
                 next_agent="",
                 classification_agent_output=None,
                 selected_loa_services=[],
+                rematch=False,
                 match_agent_output=None,
                 chosen_hospital=None,
                 loa_output=None,
                 report_output=None,
             )
-            logger.info("NEW SESSION | Session: %s | Patient: %s", session_id, patient_name)
-        else:
-            logger.info("EXISTING SESSION | Session: %s", session_id)
-        return self.sessions[session_id]
+
+        update = {"intake": {**(snapshot.values.get("intake") or {}), **intake}} if intake else {}
+
+        if snapshot.interrupts:
+            logger.info("RESUMING SESSION | Session: %s", session_id)
+            return Command(resume=user_input, update=update or None)
+
+        logger.info("EXISTING SESSION | Session: %s", session_id)
+        return {"messages": [HumanMessage(content=user_input)], **update}
+
+    async def _load_state(self, session_id: str) -> AgentState:
+        """Reads the persisted state for the session and caches it locally."""
+        snapshot = await graph.aget_state(self._config(session_id))
+        self.sessions[session_id] = snapshot.values
+        return snapshot.values
 
     # ── Non-streaming (kept for backwards compat) ─────────────────────────────
-    async def process_message(self, session_id: str, patient_name: str, user_input: str) -> Dict:
+    async def process_message(
+        self,
+        session_id: str,
+        patient_name: str,
+        user_input: str,
+        date_of_birth: str | None = None,
+        intake: PatientIntake | None = None,
+    ) -> Dict:
         """Process a message and return the full final response (no streaming)."""
-        current_state = self._get_or_create_session(session_id, patient_name)
-        current_state["messages"].append(HumanMessage(content=user_input))
+        graph_input = await self._build_graph_input(
+            session_id, patient_name, user_input, date_of_birth, intake
+        )
         logger.info("USER: %s", user_input)
 
-        final_state = await graph.ainvoke(current_state)
-        self.sessions[session_id] = final_state
+        await graph.ainvoke(graph_input, self._config(session_id))
+        final_state = await self._load_state(session_id)
 
         return self._build_result(session_id, final_state)
 
 
     # ── Streaming ─────────────────────────────────────────────────────────────
     async def stream_message(
-        self, session_id: str, patient_name: str, user_input: str
+        self,
+        session_id: str,
+        patient_name: str,
+        user_input: str,
+        date_of_birth: str | None = None,
+        intake: PatientIntake | None = None,
     ) -> AsyncGenerator[str, None]:
         """
         Yields SSE-formatted strings as the graph executes.
@@ -76,23 +122,15 @@ class ChatService:
           • "final"        — graph is done; carries the full result payload
           • "error"        — something went wrong
         """
-        current_state = self._get_or_create_session(session_id, patient_name)
-
-        # Append user message ONCE before invoking — this becomes part of history
-        current_state["messages"].append(HumanMessage(content=user_input))
-        logger.info("USER (stream): %s", user_input)
-        logger.info(
-            "Messages in session before invoke: %d",
-            len(current_state["messages"])
+        graph_input = await self._build_graph_input(
+            session_id, patient_name, user_input, date_of_birth, intake
         )
-
-        # We'll capture the authoritative final state from the graph's own
-        # on_chain_end event, which contains the complete merged state
-        # including the full updated messages list.
-        final_state: AgentState | None = None
+        logger.info("USER (stream): %s", user_input)
 
         try:
-            async for event in graph.astream_events(current_state, version="v2"):
+            async for event in graph.astream_events(
+                graph_input, self._config(session_id), version="v2"
+            ):
                 event_name = event.get("event")
                 node_name  = event.get("name", "")
 
@@ -121,41 +159,21 @@ class ChatService:
                         },
                     )
 
-                # ── TOP-LEVEL GRAPH finished — capture authoritative state ────
-                #
-                # LangGraph emits an on_chain_end for the root graph itself.
-                # Its output IS the complete final state with all messages merged.
-                # This is the ONLY reliable place to get the full updated state.
-                elif event_name == "on_chain_end" and node_name == _GRAPH_ROOT_NAME:
-                    output = event.get("data", {}).get("output", {}) or {}
-                    if output:
-                        final_state = output
-                        logger.info(
-                            "Graph completed. Final message count: %d",
-                            len(final_state.get("messages", []))
-                        )
-
-            # ── Persist the authoritative final state ─────────────────────────
-            if final_state:
-                self.sessions[session_id] = final_state
-            else:
-                # Fallback: if we somehow missed the graph end event,
-                # keep current_state as-is (history is at least preserved
-                # because we appended the user message before invoking)
-                logger.warning(
-                    "Graph end event not captured for session %s. "
-                    "State may be incomplete.",
-                    session_id
-                )
-                self.sessions[session_id] = current_state
-
-            result = self._build_result(session_id, self.sessions[session_id])
+            # ── Read the authoritative final state from the checkpointer ──────
+            # This also covers runs that suspended at hospital selection,
+            # which do not emit a normal root on_chain_end.
+            final_state = await self._load_state(session_id)
+            logger.info(
+                "Graph completed. Final message count: %d",
+                len(final_state.get("messages", []))
+            )
+
+            result = self._build_result(session_id, final_state)
             yield self._sse("final", result)
 
         except Exception as exc:
             logger.error("Stream error for session %s: %s", session_id, exc, exc_info=True)
-            # Still persist whatever state we have so history isn't wiped
-            self.sessions[session_id] = current_state
+            # Checkpointer keeps the last completed step, so history isn't wiped
             yield self._sse("error", {"detail": str(exc)})
 
     # ── Helpers ───────────────────────────────────────────────────────────────
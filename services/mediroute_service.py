@@ -28,7 +28,8 @@ class MediRouteService:
                 "location": location,
                 "insurance": insurance,
                 "current_situation": current_situation,
-            }
+            },
+            {"configurable": {"thread_id": session_id}},
         )
 
         report_output = final_state.get("report_output")
@@ -72,7 +72,9 @@ class MediRouteStreamingService:
             final_state = None
 
             # Use astream to get updates as each node completes
-            async for chunk in graph.astream(input_data):
+            async for chunk in graph.astream(
+                input_data, {"configurable": {"thread_id": session_id}}
+            ):
                 logger.info(f"Received chunk: {chunk.keys()}")
                 
                 # chunk is a dict with node name as key
@@ -0,0 +1,105 @@
+"""
+Utils for multi-pattern matching (Aho-Corasick)
+"""
+import re
+
+from collections import deque
+from typing import Any, Iterator, NamedTuple
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercases and collapses everything that is not a letter or digit into single
+    spaces, so patterns and input are compared on the same footing.
+    """
+    text = text.lower().replace("'", "").replace("’", "")
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+
+class Match(NamedTuple):
+    start: int      # offset in the normalized text
+    end: int        # exclusive
+    pattern: str
+    payload: Any
+
+
+class AhoCorasick:
+    """
+    Compiled automaton over a fixed set of patterns. Matching is a single pass
+    over the text — O(len(text) + number of matches) regardless of pattern count.
+
+    Patterns and text are normalized with normalize_text(); matches are only
+    reported on whole-word boundaries.
+    """
+
+    def __init__(self, patterns: dict[str, Any]):
+        # Trie as parallel arrays: goto[state] = {char: next_state}
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # Output: (pattern length, pattern, payload) for every pattern ending at a state
+        self._out: list[list[tuple[int, str, Any]]] = [[]]
+        self._size = 0
+
+        for raw_pattern, payload in patterns.items():
+            pattern = normalize_text(raw_pattern)
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((len(pattern), pattern, payload))
+            self._size += 1
+
+        self._build_failure_links()
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(char, 0)
+                # Inherit outputs so each state reports every pattern that ends there
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def iter_normalized(self, text: str) -> Iterator[Match]:
+        """Yields whole-word matches in text that is already normalized."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        length = len(text)
+
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            if not out[state]:
+                continue
+
+            end = i + 1
+            if end < length and text[end] != " ":
+                continue
+            for size, pattern, payload in out[state]:
+                start = end - size
+                if start == 0 or text[start - 1] == " ":
+                    yield Match(start, end, pattern, payload)
+
+    def finditer(self, text: str) -> Iterator[Match]:
+        """Yields whole-word matches in raw text (normalized first)."""
+        return self.iter_normalized(normalize_text(text))
+
+    def findall(self, text: str) -> list[Match]:
+        return list(self.finditer(text))
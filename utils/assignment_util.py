@@ -0,0 +1,124 @@
+"""
+Utils for capacity-constrained assignment: the transportation problem —
+rows with a number of units to place (patients alike for the purpose), columns
+with a capacity (free beds), a cost per unit for each pair — solved as a
+min-cost flow by successive shortest paths.
+
+Patients that are interchangeable share a row, so a mass-casualty incident
+at a handful of sites is a small problem however many patients it has: an
+augmentation moves as many units as the path allows, not one.
+"""
+import numpy as np
+
+from math import inf
+
+
+def min_cost_transport(
+    costs: np.ndarray,
+    supply: np.ndarray,
+    capacity: np.ndarray,
+) -> np.ndarray:
+    """
+    Units of each row placed in each column, as a (rows, columns) int matrix.
+
+    costs[r, c] is the cost per unit (inf where the row cannot use the
+    column); supply[r] the units of row r; capacity[c] the units column c
+    takes. Rows are served in order: earlier rows are placed first and later
+    ones never displace them, only move them to other columns when that
+    lowers the total cost. Among all placements of the units placed, the total
+    cost is the lowest; units no free column is reachable for stay unplaced
+    (row sum < supply).
+
+    Each augmentation is a Dijkstra over the columns: from the row's own
+    costs, through units already placed (moving a unit of row q from column
+    a to b costs costs[q, b] - costs[q, a]) to a column with room. Column
+    potentials keep these edge costs non-negative (Johnson's reweighting).
+    When beds are scarce most rows cannot be placed at all: a row is skipped
+    when no column with room is reachable from it (a few boolean matrix
+    products, not a Dijkstra that settles every column to find nothing),
+    and the search stops once no column has room.
+    """
+    costs = np.asarray(costs, dtype=np.float64)
+    rows, columns = costs.shape
+    flow = np.zeros((rows, columns), dtype=np.int64)
+    if columns == 0:
+        return flow
+    remaining = np.asarray(supply, dtype=np.int64).copy()
+    room = np.asarray(capacity, dtype=np.int64).copy()
+    usable = np.isfinite(costs)
+    potential = np.zeros(columns)
+    sink_potential = 0.0
+    all_columns = np.arange(columns)
+
+    for row in range(rows):
+        if not room.any():
+            break
+        if remaining[row] > 0 and not _reaches_room(usable, flow, room, row):
+            continue
+        while remaining[row] > 0:
+            # Reduced distances from the row (open: not settled yet); pred_* rebuild the path
+            distance = costs[row] - potential
+            open_distance = distance.copy()
+            pred_column = np.full(columns, -1)
+            pred_row = np.full(columns, -1)
+            settled = np.zeros(columns, dtype=bool)
+            to_sink, end = inf, -1
+
+            while True:
+                column = int(open_distance.argmin())
+                d = float(open_distance[column])
+                if d >= to_sink:
+                    break
+                open_distance[column] = inf
+                settled[column] = True
+                reduced = d + potential[column]
+                if room[column] > 0 and reduced - sink_potential < to_sink:
+                    to_sink, end = reduced - sink_potential, column
+
+                # Units placed here may move elsewhere
+                placed = flow[:, column].nonzero()[0]
+                if placed.size:
+                    moved = reduced - potential + costs[placed] - costs[placed, column][:, None]
+                    best = moved.argmin(axis=0)
+                    best_distance = moved[best, all_columns]
+                    better = (best_distance < open_distance) & ~settled
+                    distance[better] = open_distance[better] = best_distance[better]
+                    pred_column[better] = column
+                    pred_row[better] = placed[best[better]]
+
+            if end < 0:     # no column with room is reachable; the rest stays unplaced
+                break
+
+            potential += np.minimum(distance, to_sink)
+            sink_potential += to_sink
+
+            # As many units as the path allows
+            amount = min(remaining[row], room[end])
+            column = end
+            while pred_column[column] >= 0:
+                amount = min(amount, flow[pred_row[column], pred_column[column]])
+                column = pred_column[column]
+
+            room[end] -= amount
+            column = end
+            while pred_column[column] >= 0:
+                flow[pred_row[column], pred_column[column]] -= amount
+                flow[pred_row[column], column] += amount
+                column = pred_column[column]
+            flow[row, column] += amount
+            remaining[row] -= amount
+
+    return flow
+
+
+def _reaches_room(usable: np.ndarray, flow: np.ndarray, room: np.ndarray, row: int) -> bool:
+    """Whether any column with room is reachable from the row, directly or by moving placed units."""
+    reached = usable[row].copy()
+    while not (room[reached] > 0).any():
+        # Rows with units in the columns reached can move them to any column they can use
+        movable = (flow[:, reached] > 0).any(axis=1)
+        wider = reached | usable[movable].any(axis=0)
+        if (wider == reached).all():
+            return False
+        reached = wider
+    return True
@@ -0,0 +1,69 @@
+"""
+Utils for bitset-encoded attribute sets
+"""
+from typing import Iterable
+
+import numpy as np
+
+_WORD_BITS = 64
+_WORD_MASK = (1 << _WORD_BITS) - 1
+
+
+class BitVocabulary:
+    """
+    Assigns one bit to each (category, name) pair, so a set of attributes — e.g.
+    the insurers, emergency types and capabilities of a hospital — becomes a
+    single int. "Has all of X" is then `mask & required == required`.
+    """
+
+    def __init__(self):
+        self._bits: dict[tuple[str, str], int] = {}
+        self._names: list[tuple[str, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, category: str, name: str) -> int:
+        """Returns the bit for (category, name), assigning the next free one if new."""
+        key = (category, name)
+        bit = self._bits.get(key)
+        if bit is None:
+            bit = self._bits[key] = 1 << len(self._names)
+            self._names.append(key)
+        return bit
+
+    def encode(self, pairs: Iterable[tuple[str, str]]) -> tuple[int, list[tuple[str, str]]]:
+        """
+        Mask for the given (category, name) pairs, plus the pairs that have no bit
+        (never registered, so no encoded set can contain them).
+        """
+        mask = 0
+        unknown = []
+        for pair in pairs:
+            bit = self._bits.get(pair)
+            if bit is None:
+                unknown.append(pair)
+            else:
+                mask |= bit
+        return mask, unknown
+
+    def decode(self, mask: int) -> set[tuple[str, str]]:
+        """(category, name) pairs whose bits are set in mask."""
+        pairs = set()
+        while mask:
+            low = mask & -mask
+            pairs.add(self._names[low.bit_length() - 1])
+            mask ^= low
+        return pairs
+
+    @property
+    def words(self) -> int:
+        """Number of 64-bit words needed to hold every assigned bit."""
+        return max(1, -(-len(self._names) // _WORD_BITS))
+
+    def to_words(self, mask: int) -> np.ndarray:
+        """Mask as a little-endian uint64 word array, for bulk NumPy comparisons."""
+        return np.array(
+            [(mask >> (_WORD_BITS * i)) & _WORD_MASK for i in range(self.words)],
+            dtype=np.uint64,
+        )
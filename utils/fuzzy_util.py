@@ -0,0 +1,114 @@
+"""
+Utils for fuzzy string lookup (trigram index)
+"""
+from math import log
+from typing import Any, NamedTuple
+
+from utils.aho_corasick_util import normalize_text
+
+
+def trigrams(text: str) -> frozenset[str]:
+    """
+    Word-bounded trigrams of the normalized text, pg_trgm style: each word is
+    padded with two leading spaces and one trailing space.
+    """
+    grams = set()
+    for word in normalize_text(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class FuzzyMatch(NamedTuple):
+    score: float    # IDF-weighted Dice coefficient of the trigram sets, 0..1
+    text: str       # the indexed text that matched
+    payload: Any
+
+
+class TrigramIndex:
+    """
+    Inverted index from trigram to the texts containing it, scored by Dice
+    coefficient with each trigram weighted by its IDF, so shared rare trigrams
+    count for more than shared "med"/"cen".
+
+    Searches with a minimum score only read the posting lists of the rarest
+    query trigrams (prefix filtering): any text scoring at least min_score
+    must share one of them. Common trigrams weigh little, so their long
+    posting lists are almost never scanned.
+    """
+
+    def __init__(self):
+        self._postings: dict[str, list[int]] = {}
+        self._grams: list[frozenset[str]] = []
+        self._texts: list[str] = []
+        self._payloads: list[Any] = []
+        # Total trigram weight per text; IDFs shift as texts are added, so
+        # recomputed in one pass on the first search after an add
+        self._doc_weights: list[float] | None = None
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, text: str, payload: Any) -> None:
+        grams = trigrams(text)
+        doc = len(self._texts)
+        self._grams.append(grams)
+        self._texts.append(text)
+        self._payloads.append(payload)
+        self._doc_weights = None
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(doc)
+
+    def _weight(self, gram: str) -> float:
+        return log(1 + len(self._texts) / max(1, len(self._postings.get(gram, ()))))
+
+    def _ensure_doc_weights(self) -> list[float]:
+        if self._doc_weights is None:
+            weights = {gram: self._weight(gram) for gram in self._postings}
+            self._doc_weights = [sum(weights[g] for g in grams) for grams in self._grams]
+        return self._doc_weights
+
+    def search(self, query: str, min_score: float = 0.5, limit: int = 5) -> list[FuzzyMatch]:
+        """
+        Best matches scoring at least min_score (0 < min_score <= 1), highest
+        first, at most one per payload.
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        weights = {gram: self._weight(gram) for gram in query_grams}
+        query_weight = sum(weights.values())
+
+        # Dice >= t needs a shared weight of at least t*w(Q) / (2 - t), so a match
+        # must contain one of the rarest query trigrams: scan their posting lists
+        # until the rest together weigh less than that, accumulating shared weight
+        min_overlap = min_score * query_weight / (2 - min_score)
+        remaining = query_weight
+        unscanned = set(query_grams)
+        shared_scanned: dict[int, float] = {}
+        for gram in sorted(query_grams, key=weights.get, reverse=True):
+            if remaining < min_overlap - 1e-9:
+                break
+            weight = weights[gram]
+            for doc in self._postings.get(gram, ()):
+                shared_scanned[doc] = shared_scanned.get(doc, 0.0) + weight
+            remaining -= weight
+            unscanned.discard(gram)
+
+        doc_weights = self._ensure_doc_weights()
+        best: dict[int, FuzzyMatch] = {}
+        for doc, shared in shared_scanned.items():
+            doc_weight = doc_weights[doc]
+            # Skip unless it could still pass with every unscanned trigram shared too
+            if 2 * (shared + remaining) < min_score * (query_weight + doc_weight) - 1e-9:
+                continue
+            shared += sum(weights[g] for g in self._grams[doc] & unscanned)
+            score = 2 * shared / (query_weight + doc_weight)
+            if score < min_score:
+                continue
+            key = id(self._payloads[doc])
+            if key not in best or score > best[key].score:
+                best[key] = FuzzyMatch(score, self._texts[doc], self._payloads[doc])
+
+        return sorted(best.values(), key=lambda m: -m.score)[:limit]
@@ -0,0 +1,298 @@
+"""
+Utils for geographic distance and nearest-neighbor search
+"""
+import heapq
+
+import numpy as np
+
+from math import radians, sin, cos, sqrt, asin, atan2, floor
+from typing import Any, Callable, Iterable, NamedTuple
+
+EARTH_RADIUS_KM = 6371
+
+
+def haversine_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Calculate distance in km between two coordinates."""
+    lat1, lng1, lat2, lng2 = map(radians, [lat1, lng1, lat2, lng2])
+    dlat = lat2 - lat1
+    dlng = lng2 - lng1
+    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlng/2)**2
+    return EARTH_RADIUS_KM * 2 * atan2(sqrt(a), sqrt(1 - a))
+
+
+def haversine_distances(lats1, lngs1, lats2, lngs2) -> np.ndarray:
+    """
+    Vectorized haversine_distance in km. Inputs broadcast against each other,
+    e.g. (P, 1) patient points against (N,) hospitals gives a (P, N) matrix.
+    """
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lats1, lngs1, lats2, lngs2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+class CoordinateArray:
+    """
+    Columnar, array-backed copy of item coordinates for ranking many candidates
+    (and many query points) in one call. haversine_distance stays the reference.
+    """
+
+    # Upper bound on the (points x items) distance matrix computed at once
+    _MAX_CHUNK_CELLS = 4_000_000
+
+    def __init__(
+        self,
+        items: Iterable[Any],
+        coords: Callable[[Any], tuple[float, float]] = lambda h: (h["lat"], h["lng"]),
+    ):
+        self.items = list(items)
+        latlng = np.array([coords(item) for item in self.items], dtype=np.float64).reshape(-1, 2)
+        self.lats = latlng[:, 0]
+        self.lngs = latlng[:, 1]
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def nearest(
+        self,
+        lats,
+        lngs,
+        k: int,
+        mask: np.ndarray | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        k nearest items for each query point, closest first.
+
+        lats/lngs are scalars or 1-D arrays of query points; mask is an optional
+        boolean array over items, (N,) or (P, N). Returns (indices, distances_km),
+        both shaped (P, min(k, N)); masked-out slots have distance inf.
+        """
+        lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+        lngs = np.atleast_1d(np.asarray(lngs, dtype=np.float64))
+        n = len(self.items)
+        k = min(k, n)
+        if k <= 0:
+            empty = np.empty((len(lats), 0))
+            return empty.astype(np.intp), empty
+
+        chunk = max(1, self._MAX_CHUNK_CELLS // n)
+        indices, distances = [], []
+
+        for start in range(0, len(lats), chunk):
+            stop = start + chunk
+            d = haversine_distances(lats[start:stop, None], lngs[start:stop, None], self.lats, self.lngs)
+            if mask is not None:
+                d = np.where(mask if mask.ndim == 1 else mask[start:stop], d, np.inf)
+
+            # argpartition brings the k smallest to the front in O(N); only they are sorted
+            part = np.argpartition(d, k - 1, axis=1)[:, :k] if k < n else np.tile(np.arange(n), (len(d), 1))
+            part_d = np.take_along_axis(d, part, axis=1)
+            order = np.argsort(part_d, axis=1, kind="stable")
+            indices.append(np.take_along_axis(part, order, axis=1))
+            distances.append(np.take_along_axis(part_d, order, axis=1))
+
+        return np.concatenate(indices), np.concatenate(distances)
+
+    def nearest_items(
+        self,
+        lat: float,
+        lng: float,
+        k: int,
+        mask: np.ndarray | None = None,
+    ) -> list[tuple[float, Any]]:
+        """Single-point convenience: up to k (distance_km, item) pairs, masked items dropped."""
+        indices, distances = self.nearest(lat, lng, k, mask)
+        return [
+            (float(d), self.items[i])
+            for i, d in zip(indices[0], distances[0])
+            if np.isfinite(d)
+        ]
+
+
+class SpatialIndex:
+    """
+    Fixed lat/lng grid over a set of items (geohash-style bucketing), built once.
+
+    nearest() searches rings of cells outward from the query cell and stops as
+    soon as no unvisited cell can hold anything closer than the k-th best
+    eligible item, so distances are exact haversine and results match a full
+    scan. Longitude does not wrap around the antimeridian.
+    """
+
+    def __init__(
+        self,
+        items: Iterable[Any],
+        cell_deg: float = 0.05,
+        coords: Callable[[Any], tuple[float, float]] = lambda h: (h["lat"], h["lng"]),
+    ):
+        self._cell_deg = cell_deg
+        self._cells: dict[tuple[int, int], list[tuple[float, float, Any]]] = {}
+        self._size = 0
+
+        for item in items:
+            lat, lng = coords(item)
+            self._cells.setdefault(self._cell_of(lat, lng), []).append((lat, lng, item))
+            self._size += 1
+
+        rows = [row for row, _ in self._cells] or [0]
+        cols = [col for _, col in self._cells] or [0]
+        self._row_range = (min(rows), max(rows))
+        self._col_range = (min(cols), max(cols))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _cell_of(self, lat: float, lng: float) -> tuple[int, int]:
+        return floor(lat / self._cell_deg), floor(lng / self._cell_deg)
+
+    def _ring(self, row: int, col: int, r: int) -> Iterable[tuple[int, int]]:
+        """Cells at Chebyshev distance exactly r from (row, col)."""
+        if r == 0:
+            yield row, col
+            return
+        for c in range(col - r, col + r + 1):
+            yield row - r, c
+            yield row + r, c
+        for rr in range(row - r + 1, row + r):
+            yield rr, col - r
+            yield rr, col + r
+
+    def _outside_bound_km(self, lat: float, lng: float, row: int, col: int, r: int) -> float:
+        """
+        Lower bound on the distance from (lat, lng) to any point outside the
+        (2r+1)x(2r+1) block of cells centered on (row, col).
+        """
+        size = self._cell_deg
+        lat_lo, lat_hi = (row - r) * size, (row + r + 1) * size
+        lng_lo, lng_hi = (col - r) * size, (col + r + 1) * size
+
+        # Points above/below the block differ in latitude by at least this much,
+        # and great-circle distance is never less than R * |Δlatitude|
+        dlat = min(lat - lat_lo, lat_hi - lat)
+        by_lat = EARTH_RADIUS_KM * radians(dlat)
+
+        # Points beside the block lie within its latitude band (others are covered
+        # above): hav(d) >= cos(lat1) * cos(lat2) * hav(Δlng), with cos(lat2) at
+        # its smallest over the band
+        dlng = min(lng - lng_lo, lng_hi - lng)
+        band_lat = max(abs(lat_lo), abs(lat_hi))
+        if band_lat >= 90 or dlng >= 180:
+            return by_lat
+        hav = cos(radians(lat)) * cos(radians(band_lat)) * sin(radians(dlng) / 2) ** 2
+        by_lng = EARTH_RADIUS_KM * 2 * asin(min(1.0, sqrt(hav)))
+
+        return min(by_lat, by_lng)
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        k: int,
+        predicate: Callable[[Any], bool] | None = None,
+    ) -> list[tuple[float, Any]]:
+        """
+        Returns up to k (distance_km, item) pairs closest to (lat, lng), closest
+        first, considering only items for which predicate(item) is true.
+        """
+        if k <= 0 or not self._cells:
+            return []
+
+        row, col = self._cell_of(lat, lng)
+        # Enough rings to reach every occupied cell from the query cell
+        max_r = max(
+            abs(row - self._row_range[0]), abs(row - self._row_range[1]),
+            abs(col - self._col_range[0]), abs(col - self._col_range[1]),
+        )
+
+        best: list[tuple[float, int, Any]] = []  # max-heap of (-distance, seq, item)
+        seq = 0
+        for r in range(max_r + 1):
+            for cell in self._ring(row, col, r):
+                for item_lat, item_lng, item in self._cells.get(cell, ()):
+                    if predicate and not predicate(item):
+                        continue
+                    distance = haversine_distance(lat, lng, item_lat, item_lng)
+                    seq += 1
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, seq, item))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, seq, item))
+
+            if len(best) == k and -best[0][0] <= self._outside_bound_km(lat, lng, row, col, r):
+                break
+
+        return [(-d, item) for d, _, item in sorted(best, key=lambda e: (-e[0], e[1]))]
+
+
+class CellShortlist(NamedTuple):
+    positions: np.ndarray   # item positions, nearest to the cell center first
+    complete: bool          # every item passing the mask, not just a shortlist
+
+
+class CellShortlists:
+    """
+    Candidate shortlists per lat/lng grid cell over a CoordinateArray, for
+    answering nearest-item queries from every point of a cell alike.
+
+    A cell's shortlist holds every item within (distance of the size-th
+    nearest item to the cell center) + (cell diameter) of the center. By the
+    triangle inequality that includes the `size` nearest items of any point
+    in the cell, so ranking the shortlist by exact distance from the point
+    gives the same result as a full scan, for up to `size` items.
+    """
+
+    def __init__(self, coords: CoordinateArray, cell_deg: float = 0.01, size: int = 12):
+        self.coords = coords
+        self.cell_deg = cell_deg
+        self.size = size
+
+    def cell_of(self, lat: float, lng: float) -> tuple[int, int]:
+        return floor(lat / self.cell_deg), floor(lng / self.cell_deg)
+
+    def shortlists(
+        self,
+        cells: list[tuple[int, int]],
+        mask: np.ndarray | None = None,
+    ) -> list[CellShortlist]:
+        """Shortlist per cell, considering only items where the boolean mask is true."""
+        n = len(self.coords)
+        eligible = n if mask is None else int(np.count_nonzero(mask))
+        rows = np.array([row for row, _ in cells], dtype=np.float64)
+        cols = np.array([col for _, col in cells], dtype=np.float64)
+        size = self.cell_deg
+        lats, lngs = (rows + 0.5) * size, (cols + 0.5) * size
+        # Farthest points of a cell from its center are its corners
+        radius = np.maximum(
+            haversine_distances(lats, lngs, rows * size, lngs + size / 2),
+            haversine_distances(lats, lngs, (rows + 1) * size, lngs + size / 2),
+        )
+
+        result = []
+        chunk = max(1, CoordinateArray._MAX_CHUNK_CELLS // max(n, 1))
+        for start in range(0, len(cells), chunk):
+            stop = start + chunk
+            d = haversine_distances(lats[start:stop, None], lngs[start:stop, None], self.coords.lats, self.coords.lngs)
+            if mask is not None:
+                d = np.where(mask, d, np.inf)
+            if eligible <= self.size:
+                reach = np.full(len(d), np.inf)
+            else:
+                # Slack for rounding, so ties at the boundary stay in
+                reach = np.partition(d, self.size - 1, axis=1)[:, self.size - 1] + 2 * radius[start:stop] + 1e-9
+            for row_d, row_reach in zip(d, reach):
+                selected = np.flatnonzero((row_d <= row_reach) & np.isfinite(row_d))
+                order = selected[np.argsort(row_d[selected], kind="stable")]
+                result.append(CellShortlist(order, eligible <= self.size))
+        return result
+
+    def nearest(self, shortlist: CellShortlist, lat: float, lng: float, k: int) -> list[tuple[float, Any]] | None:
+        """
+        Up to k (distance_km, item) pairs closest to (lat, lng), a point of the
+        shortlist's cell, closest first; None if k is more than the shortlist
+        covers.
+        """
+        if k > self.size and not shortlist.complete:
+            return None
+        positions = shortlist.positions
+        d = haversine_distances(lat, lng, self.coords.lats[positions], self.coords.lngs[positions])
+        order = np.argsort(d, kind="stable")[:k]
+        return [(float(d[i]), self.coords.items[positions[i]]) for i in order]
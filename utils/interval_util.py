@@ -0,0 +1,46 @@
+"""
+Utils for interval stabbing queries ("which intervals contain t?")
+"""
+from bisect import bisect_right
+from typing import Any, Iterable
+
+
+class IntervalIndex:
+    """
+    Static index over half-open [start, end) intervals, built once.
+
+    The interval endpoints split the line into elementary segments; each
+    segment stores the payloads of every interval covering it, in insertion
+    order. A stabbing query is then a bisect over the segment bounds, O(log n),
+    at the cost of memory proportional to segments x overlap — small for
+    schedules, where endpoints cluster on shift boundaries.
+    """
+
+    def __init__(self, intervals: Iterable[tuple[float, float, Any]]):
+        intervals = [(start, end, payload) for start, end, payload in intervals if start < end]
+        self._size = len(intervals)
+        self._bounds = sorted({p for start, end, _ in intervals for p in (start, end)})
+
+        starts: dict[float, list[int]] = {}
+        ends: dict[float, list[int]] = {}
+        for i, (start, end, _) in enumerate(intervals):
+            starts.setdefault(start, []).append(i)
+            ends.setdefault(end, []).append(i)
+
+        # Sweep the bounds left to right, snapshotting the active set per segment
+        active: dict[int, Any] = {}
+        self._segments: list[tuple[Any, ...]] = []
+        for bound in self._bounds:
+            for i in ends.get(bound, ()):
+                active.pop(i, None)
+            for i in starts.get(bound, ()):
+                active[i] = intervals[i][2]
+            self._segments.append(tuple(active[i] for i in sorted(active)))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def at(self, point: float) -> tuple[Any, ...]:
+        """Payloads of the intervals containing point, in insertion order."""
+        i = bisect_right(self._bounds, point) - 1
+        return self._segments[i] if i >= 0 else ()
@@ -1,6 +1,9 @@
 """
 Utils for LLM Calls
 """
+import asyncio
+import heapq
+import itertools
 import os
 import logging
 
@@ -49,16 +52,64 @@ def _get_model() -> str:
     return os.getenv("AZURE_OPENAI_DEPLOYMENT") or os.getenv("OPENAI_MODEL")
 
 
+# ── Priority scheduling ───────────────────────────────────────────────────────
+# Scheduling priorities for call_llm. Higher runs first when calls are queued.
+PRIORITY_SPECULATIVE = -1   # background work whose result may be discarded
+PRIORITY_NORMAL = 0
+PRIORITY_CRITICAL = 1       # red-flag triage hits
+
+
+class _PriorityGate:
+    """
+    Bounds the number of in-flight LLM calls. When the limit is reached, waiting
+    calls are admitted highest priority first (FIFO within a priority).
+    """
+
+    def __init__(self, limit: int):
+        self._limit = limit
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    async def acquire(self, priority: int) -> None:
+        if self._active < self._limit and not self._waiters:
+            self._active += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-priority, next(self._seq), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over just as we were cancelled — pass it on
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)  # hand the slot over directly
+                return
+        self._active -= 1
+
+
+_gate = _PriorityGate(int(os.getenv("LLM_MAX_CONCURRENCY", "8")))
+
+
 async def call_llm(
     messages: List[Dict[str, str]],
     tools: Optional[List[Dict[str, Any]]] = None,
     tool_choice: Optional[str | Dict[str, Any]] = None,
     response_format: Optional[Dict[str, Any]] = None,
     temperature: float = 0.3,
+    priority: int = PRIORITY_NORMAL,
 ):
     """
     Generic LLM caller that accepts fully constructed messages
-    and optional tool definitions.
+    and optional tool definitions. Calls are admitted by priority
+    when more than LLM_MAX_CONCURRENCY are in flight.
     """
     request_kwargs = {
         "model": _get_model(),
@@ -73,9 +124,14 @@ async def call_llm(
     if response_format:
         request_kwargs["response_format"] = response_format
 
+    await _gate.acquire(priority)
     try:
-        response = _client.chat.completions.create(**request_kwargs)
+        # The client is synchronous — run it in a worker thread so concurrent
+        # sessions and background tasks are not blocked on the event loop.
+        response = await asyncio.to_thread(_client.chat.completions.create, **request_kwargs)
         return response
     except Exception as e:
         logger.error("Error calling LLM: %s", e)
         raise
+    finally:
+        _gate.release()
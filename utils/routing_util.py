@@ -0,0 +1,472 @@
+"""
+Utils for road-network travel times: a directed road graph in compressed
+sparse row form, time-of-day speed profiles, and shortest-path searches.
+
+Edge weights are travel seconds for one period of the day ("am_peak"). The
+graph carries landmark distances (ALT: A*, landmarks, triangle inequality)
+precomputed per period of the profile it was built with. A search uses the
+set computed at speeds closest to the period's and scales it by the smallest
+ratio between the two, so the bounds hold under any profile — a changed
+profile only loosens them, where contraction hierarchies would have to be
+rebuilt.
+"""
+import heapq
+import json
+
+import numpy as np
+
+from math import inf
+from typing import Any, Callable, Iterable
+
+from utils.geo_util import SpatialIndex, haversine_distances
+
+FREE_FLOW = "free_flow"
+
+# Landmarks consulted per point-to-point search (those that bound it best)
+_ACTIVE_LANDMARKS = 4
+
+
+class SpeedProfile:
+    """
+    Road speeds by class and hour of the day: free-flow speeds in km/h, and
+    periods ({name, hours, factors}) that slow classes down by a factor in
+    (0, 1] — "*" covers classes not listed. Hours in no period run at free
+    flow.
+    """
+
+    def __init__(self, free_flow_kph: dict[str, float], periods: Iterable[dict] = ()):
+        if not free_flow_kph or min(free_flow_kph.values()) <= 0:
+            raise ValueError("Speed profile: free-flow speeds must be positive")
+        self.free_flow_kph = dict(free_flow_kph)
+        self._factors: dict[str, dict[str, float]] = {FREE_FLOW: {}}
+        self._period_of_hour = [FREE_FLOW] * 24
+        for period in periods:
+            factors = {c: float(f) for c, f in period.get("factors", {}).items()}
+            if any(not 0 < f <= 1 for f in factors.values()):
+                raise ValueError(f"Speed profile: factors of '{period['name']}' must be in (0, 1]")
+            self._factors[period["name"]] = factors
+            for hour in period["hours"]:
+                self._period_of_hour[int(hour) % 24] = period["name"]
+
+    @classmethod
+    def load(cls, path: str) -> "SpeedProfile":
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+        return cls(raw["free_flow_kph"], raw.get("periods", ()))
+
+    @property
+    def periods(self) -> list[str]:
+        return list(self._factors)
+
+    def period(self, hour: int) -> str:
+        return self._period_of_hour[hour % 24]
+
+    def speed_kph(self, road_class: str, period: str = FREE_FLOW) -> float:
+        free_flow = self.free_flow_kph.get(road_class, self.free_flow_kph.get("*", min(self.free_flow_kph.values())))
+        factors = self._factors[period]
+        return free_flow * factors.get(road_class, factors.get("*", 1.0))
+
+    def max_speed_kph(self, period: str = FREE_FLOW) -> float:
+        return max(self.speed_kph(c, period) for c in self.free_flow_kph)
+
+
+class RoadGraph:
+    """
+    Directed road graph: node coordinates, and the edges leaving node u at
+    heads[offsets[u]:offsets[u + 1]], with their lengths and road classes.
+    landmark_from[s, i, v] / landmark_to[s, i, v] are seconds from / to
+    landmark i (inf if unreachable) at the speeds by road class in
+    landmark_kph[s] — one set s per period of the profile.
+    """
+
+    def __init__(
+        self,
+        lats: np.ndarray,
+        lngs: np.ndarray,
+        offsets: np.ndarray,
+        heads: np.ndarray,
+        lengths_m: np.ndarray,
+        classes: np.ndarray,
+        class_names: list[str],
+        landmarks: np.ndarray | None = None,
+        landmark_from: np.ndarray | None = None,
+        landmark_to: np.ndarray | None = None,
+        landmark_kph: np.ndarray | None = None,
+    ):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lngs = np.asarray(lngs, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.heads = np.asarray(heads, dtype=np.int32)
+        self.lengths_m = np.asarray(lengths_m, dtype=np.float32)
+        self.classes = np.asarray(classes, dtype=np.uint8)
+        self.class_names = list(class_names)
+        empty = np.empty((0, 0, len(self.lats)), dtype=np.float32)
+        self.landmarks = np.asarray(landmarks if landmarks is not None else [], dtype=np.int32)
+        self.landmark_from = np.asarray(landmark_from if landmark_from is not None else empty, dtype=np.float32)
+        self.landmark_to = np.asarray(landmark_to if landmark_to is not None else empty, dtype=np.float32)
+        self.landmark_kph = np.asarray(
+            landmark_kph if landmark_kph is not None else np.empty((0, len(self.class_names))), dtype=np.float64
+        )
+        if len(self.offsets) != len(self.lats) + 1 or self.offsets[-1] != len(self.heads):
+            raise ValueError("Road graph: offsets do not match nodes and edges")
+
+    @classmethod
+    def from_edges(
+        cls,
+        lats: Iterable[float],
+        lngs: Iterable[float],
+        tails: Iterable[int],
+        heads: Iterable[int],
+        classes: Iterable[int],
+        class_names: list[str],
+        lengths_m: Iterable[float] | None = None,
+    ) -> "RoadGraph":
+        """Graph from an edge list; lengths default to the straight line between the ends."""
+        lats, lngs = np.asarray(lats, dtype=np.float64), np.asarray(lngs, dtype=np.float64)
+        tails, heads = np.asarray(tails, dtype=np.int64), np.asarray(heads, dtype=np.int64)
+        classes = np.asarray(classes, dtype=np.uint8)
+        if lengths_m is None:
+            lengths_m = haversine_distances(lats[tails], lngs[tails], lats[heads], lngs[heads]) * 1000
+        lengths_m = np.asarray(lengths_m, dtype=np.float32)
+
+        order = np.argsort(tails, kind="stable")
+        offsets = np.zeros(len(lats) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tails, minlength=len(lats)), out=offsets[1:])
+        return cls(lats, lngs, offsets, heads[order], lengths_m[order], classes[order], class_names)
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.heads)
+
+    def _tails(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.offsets))
+
+    def reversed(self) -> "RoadGraph":
+        """Same roads, every edge pointing the other way."""
+        return RoadGraph.from_edges(
+            self.lats, self.lngs, self.heads, self._tails(), self.classes, self.class_names, self.lengths_m
+        )
+
+    def subgraph(self, keep: np.ndarray) -> "RoadGraph":
+        """The graph induced by the nodes where keep is true, renumbered in order."""
+        index = np.full(len(self), -1, dtype=np.int64)
+        index[keep] = np.arange(int(keep.sum()))
+        tails, heads = index[self._tails()], index[self.heads]
+        edges = (tails >= 0) & (heads >= 0)
+        return RoadGraph.from_edges(
+            self.lats[keep], self.lngs[keep], tails[edges], heads[edges],
+            self.classes[edges], self.class_names, self.lengths_m[edges],
+        )
+
+    def weights(self, profile: SpeedProfile, period: str = FREE_FLOW) -> list[float]:
+        """Edge travel seconds in the period, as a list (what the search loops index fastest)."""
+        mps = np.array([profile.speed_kph(c, period) / 3.6 for c in self.class_names], dtype=np.float64)
+        return (self.lengths_m / mps[self.classes]).tolist()
+
+    # ── Preprocessing ─────────────────────────────────────────────────────────
+
+    def largest_component(self, seeds: int = 8) -> "RoadGraph":
+        """
+        The largest strongly connected part among those of a few seed nodes
+        (nodes reachable from a seed and back) — drops the parking lots and
+        fragments cut off by the extract boundary, so every kept node can
+        reach every other.
+        """
+        forward = _Adjacency(self, [1.0] * self.edge_count)
+        backward = _Adjacency(self.reversed(), [1.0] * self.edge_count)
+        rng = np.random.default_rng(0)
+        best = np.zeros(len(self), dtype=bool)
+        for seed in rng.choice(len(self), size=min(seeds, len(self)), replace=False):
+            if best[seed]:
+                continue
+            component = np.isfinite(forward.distances(int(seed))) & np.isfinite(backward.distances(int(seed)))
+            if component.sum() > best.sum():
+                best = component
+            if best.sum() * 2 > len(self):
+                break
+        return self if best.all() else self.subgraph(best)
+
+    def with_landmarks(self, profile: SpeedProfile, count: int = 8) -> "RoadGraph":
+        """
+        Chooses landmarks at the edge of the network (each the node farthest,
+        at free flow, from those chosen so far) and stores the seconds to and
+        from each in every period of the profile.
+        """
+        reverse = self.reversed()
+        forward = _Adjacency(self, self.weights(profile))
+
+        landmarks: list[int] = []
+        center = int(np.argmin(np.abs(self.lats - self.lats.mean()) + np.abs(self.lngs - self.lngs.mean())))
+        closest = forward.distances(center)
+        for _ in range(min(count, len(self))):
+            landmark = int(np.argmax(np.where(np.isfinite(closest), closest, -1.0)))
+            if landmark in landmarks:
+                break
+            landmarks.append(landmark)
+            from_landmark = forward.distances(landmark)
+            closest = np.minimum(closest, from_landmark) if len(landmarks) > 1 else from_landmark
+
+        landmark_from, landmark_to, landmark_kph = [], [], []
+        for period in profile.periods:
+            forward = _Adjacency(self, self.weights(profile, period))
+            backward = _Adjacency(reverse, reverse.weights(profile, period))
+            landmark_from.append([forward.distances(landmark) for landmark in landmarks])
+            landmark_to.append([backward.distances(landmark) for landmark in landmarks])
+            landmark_kph.append([profile.speed_kph(c, period) for c in self.class_names])
+
+        return RoadGraph(
+            self.lats, self.lngs, self.offsets, self.heads, self.lengths_m, self.classes, self.class_names,
+            np.array(landmarks, dtype=np.int32), np.array(landmark_from), np.array(landmark_to), np.array(landmark_kph),
+        )
+
+    # ── Storage ───────────────────────────────────────────────────────────────
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            lats=self.lats, lngs=self.lngs, offsets=self.offsets, heads=self.heads,
+            lengths_m=self.lengths_m, classes=self.classes, class_names=np.array(self.class_names),
+            landmarks=self.landmarks, landmark_from=self.landmark_from, landmark_to=self.landmark_to,
+            landmark_kph=self.landmark_kph,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "RoadGraph":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["lats"], data["lngs"], data["offsets"], data["heads"], data["lengths_m"],
+                data["classes"], [str(c) for c in data["class_names"]],
+                data["landmarks"], data["landmark_from"], data["landmark_to"], data["landmark_kph"],
+            )
+
+
+class _Adjacency:
+    """Plain-list CSR view of a graph with one set of edge weights, for searching."""
+
+    def __init__(self, graph: RoadGraph, weights: list[float]):
+        self.size = len(graph)
+        self.offsets = graph.offsets.tolist()
+        self.heads = graph.heads.tolist()
+        self.weights = weights
+
+    def distances(self, source: int) -> np.ndarray:
+        """Seconds from source to every node (inf if unreachable)."""
+        tree = ShortestPathTree(self, source)
+        tree.grow()
+        result = np.full(self.size, inf)
+        result[list(tree.settled)] = list(tree.settled.values())
+        return result
+
+
+class ShortestPathTree:
+    """
+    Dijkstra from one source, grown on demand: nodes are settled in order of
+    travel time, so the first targets settled are the fastest to reach, and a
+    later grow() continues where the last one stopped.
+    """
+
+    def __init__(self, adjacency: _Adjacency, source: int, start_seconds: float = 0.0):
+        self._adjacency = adjacency
+        self.settled: dict[int, float] = {}
+        self._best = {source: start_seconds}
+        self._heap = [(start_seconds, source)]
+
+    @property
+    def frontier(self) -> float:
+        """Lower bound on the travel time to any node not settled yet."""
+        return self._heap[0][0] if self._heap else inf
+
+    def grow(self, targets: set[int] | None = None, count: int = 0, max_seconds: float = inf) -> None:
+        """
+        Settles nodes until `count` of the targets are settled, the next node
+        is beyond max_seconds, or every reachable node is settled. Without
+        targets (None) the whole reachable graph is settled; an empty set has
+        nothing to find and settles nothing.
+        """
+        adjacency, settled, best, heap = self._adjacency, self.settled, self._best, self._heap
+        offsets, heads, weights = adjacency.offsets, adjacency.heads, adjacency.weights
+        found = sum(1 for t in targets if t in settled) if targets else 0
+        while heap and (targets is None or found < count):
+            seconds, node = heap[0]
+            if seconds > max_seconds:
+                break
+            heapq.heappop(heap)
+            if node in settled:
+                continue
+            settled[node] = seconds
+            if targets and node in targets:
+                found += 1
+            for e in range(offsets[node], offsets[node + 1]):
+                head = heads[e]
+                if head in settled:
+                    continue
+                t = seconds + weights[e]
+                if t < best.get(head, inf):
+                    best[head] = t
+                    heapq.heappush(heap, (t, head))
+
+
+class Router:
+    """
+    Travel times over a road graph under a speed profile: points are snapped
+    to the nearest node (within max_snap_m, covered at access_kph), then
+    searched one-to-many with Dijkstra or point-to-point with ALT A*.
+    """
+
+    def __init__(
+        self,
+        graph: RoadGraph,
+        profile: SpeedProfile,
+        max_snap_m: float = 500.0,
+        access_kph: float = 10.0,
+    ):
+        self.graph = graph
+        self.profile = profile
+        self.max_snap_m = max_snap_m
+        self._access_mps = access_kph / 3.6
+        self._nodes = SpatialIndex(range(len(graph)), cell_deg=0.01, coords=lambda i: (graph.lats[i], graph.lngs[i]))
+        self._adjacency: dict[str, _Adjacency] = {}
+        # Landmark distances by set and landmark, as flat views of the arrays
+        # (scalar reads from a memoryview are several times faster than NumPy's)
+        self._landmark_views = [
+            [(memoryview(graph.landmark_from[s, i]), memoryview(graph.landmark_to[s, i])) for i in range(len(graph.landmarks))]
+            for s in range(len(graph.landmark_kph))
+        ]
+
+    def adjacency(self, period: str) -> _Adjacency:
+        if period not in self._adjacency:
+            self._adjacency[period] = _Adjacency(self.graph, self.graph.weights(self.profile, period))
+        return self._adjacency[period]
+
+    def snap(self, lat: float, lng: float, max_snap_m: float | None = None) -> tuple[int, float] | None:
+        """(nearest node, seconds to reach it), or None if no road is within max_snap_m."""
+        nearest = self._nodes.nearest(lat, lng, 1)
+        if not nearest or nearest[0][0] * 1000 > (self.max_snap_m if max_snap_m is None else max_snap_m):
+            return None
+        distance_km, node = nearest[0]
+        return node, distance_km * 1000 / self._access_mps
+
+    def tree(self, snapped: tuple[int, float], period: str = FREE_FLOW) -> ShortestPathTree:
+        node, access_seconds = snapped
+        return ShortestPathTree(self.adjacency(period), node, access_seconds)
+
+    def lower_bound_seconds(self, distance_km: float, period: str = FREE_FLOW) -> float:
+        """No route covers a straight-line distance faster than this."""
+        return distance_km * 1000 / (max(self.profile.max_speed_kph(period), self._access_mps * 3.6) / 3.6)
+
+    def fastest(
+        self,
+        source: tuple[int, float],
+        k: int,
+        shortlist: Callable[[int], list[tuple[float, Any]]],
+        snapped: Callable[[Any], tuple[int, float]],
+        period: str = FREE_FLOW,
+        max_seconds: float = inf,
+        widen: int = 4,
+    ) -> tuple[list[tuple[float, float, Any]], ShortestPathTree]:
+        """
+        Up to k (seconds, distance_km, item) reached soonest from source, and
+        the search tree. shortlist(n) gives the n nearest items by straight
+        line, nearest first; they are searched by road from the source, and
+        the shortlist is widened until no item outside it could be reached
+        sooner than the k-th found — a straight line at top speed is a lower
+        bound on any route.
+        """
+        tree = self.tree(source, period)
+
+        def by_eta(candidates: list[tuple[float, Any]]) -> list[tuple[float, float, Any]]:
+            etas = []
+            for distance_km, item in candidates:
+                node, access_seconds = snapped(item)
+                if node in tree.settled:
+                    etas.append((tree.settled[node] + access_seconds, distance_km, item))
+            return sorted(etas, key=lambda e: e[0])
+
+        size = k * widen
+        while True:
+            candidates = shortlist(size)
+            if not candidates:      # nothing eligible: no reason to search the graph
+                return [], tree
+            targets = {snapped(item)[0] for _, item in candidates}
+            tree.grow(targets, min(k, len(targets)), max_seconds)
+            etas = by_eta(candidates)
+            kth = etas[k - 1][0] if len(etas) >= k else max_seconds
+            # Items are reached from their node: one not settled yet can still
+            # beat the k-th while the search frontier is below it
+            if tree.frontier < kth:
+                tree.grow(targets, len(targets), kth)
+                etas = by_eta(candidates)
+                kth = etas[k - 1][0] if len(etas) >= k else max_seconds
+            if len(candidates) < size or kth <= self.lower_bound_seconds(candidates[-1][0], period):
+                return etas[:k], tree
+            size *= widen
+
+    def _landmark_set(self, period: str) -> tuple[int, float]:
+        """
+        The landmark set whose speeds are most nearly proportional to the
+        period's, and the factor that makes its seconds a lower bound.
+        """
+        speeds = np.array([self.profile.speed_kph(c, period) for c in self.graph.class_names])
+        ratios = self.graph.landmark_kph / speeds
+        best = int(np.argmin(ratios.max(axis=1) / ratios.min(axis=1)))
+        return best, float(ratios[best].min())
+
+    def _landmark_bound(self, source: int, target: int, period: str) -> Callable[[int], float]:
+        """
+        Lower bound on the seconds from a node to target, from the few
+        landmarks that bound source → target best:
+        d(v, t) >= d(L, t) - d(L, v)  and  d(v, t) >= d(v, L) - d(t, L).
+        """
+        graph = self.graph
+        landmark_set, scale = self._landmark_set(period)
+        from_l, to_l = graph.landmark_from[landmark_set], graph.landmark_to[landmark_set]
+        with np.errstate(invalid="ignore"):
+            spread = np.maximum(from_l[:, target] - from_l[:, source], to_l[:, source] - to_l[:, target])
+        active = [
+            int(i) for i in np.argsort(-np.nan_to_num(spread, nan=-inf))[:_ACTIVE_LANDMARKS]
+            if np.isfinite(from_l[i, target]) and np.isfinite(to_l[i, target])
+        ]
+        terms = [
+            (*self._landmark_views[landmark_set][i], float(from_l[i, target]), float(to_l[i, target]))
+            for i in active
+        ]
+
+        def bound(node: int) -> float:
+            best = 0.0
+            for from_landmark, to_landmark, landmark_to_target, target_to_landmark in terms:
+                ahead = max(landmark_to_target - from_landmark[node], to_landmark[node] - target_to_landmark)
+                if ahead > best:
+                    best = ahead
+            return best * scale
+
+        return bound
+
+    def travel_time(self, source: tuple[int, float], target: tuple[int, float], period: str = FREE_FLOW) -> float | None:
+        """Seconds between two snapped points (ALT A*), or None if unreachable."""
+        (start, start_seconds), (goal, goal_seconds) = source, target
+        adjacency = self.adjacency(period)
+        offsets, heads, weights = adjacency.offsets, adjacency.heads, adjacency.weights
+        bound = self._landmark_bound(start, goal, period) if len(self.graph.landmarks) else (lambda node: 0.0)
+
+        best = {start: 0.0}
+        closed = set()
+        heap = [(bound(start), start)]
+        while heap:
+            _, node = heapq.heappop(heap)
+            if node == goal:
+                return start_seconds + best[node] + goal_seconds
+            if node in closed:
+                continue
+            closed.add(node)
+            seconds = best[node]
+            for e in range(offsets[node], offsets[node + 1]):
+                head = heads[e]
+                t = seconds + weights[e]
+                if head not in closed and t < best.get(head, inf):
+                    best[head] = t
+                    heapq.heappush(heap, (t + bound(head), head))
+        return None
+